@@ -1,14 +1,17 @@
-import numpy as np
-import pandas as pd
 import os
-from flask import Flask, request, render_template, jsonify, url_for
-from sklearn.preprocessing import StandardScaler
+from flask import Flask, request, render_template, jsonify, url_for, g
 import sys
-import os
+import time
+import threading
 sys.path.append(os.path.join(os.path.dirname(__file__), 'src'))
 
-from src.student_performance.pipeline.prediction_pipeline import CustomData, PredictPipeline
-from src.student_performance import logger
+from src.student_performance.pipeline.prediction_pipeline import PredictionRecord, PredictPipeline
+from src.student_performance.pipeline.micro_batching import MicroBatcher
+from src.student_performance.utils.artifact_cache import artifact_cache
+from src.student_performance.utils.metrics import (metrics, render_artifact_cache, render_micro_batching,
+                                                   render_prediction_cache)
+from src.student_performance.utils.async_logging import configure_async_logging
+from src.student_performance import logger, serving_logger
 
 # Initialize Flask app with static folder configuration
 application = Flask(__name__, 
@@ -25,12 +28,106 @@ if not secret_key:
 app.config['SECRET_KEY'] = secret_key
 app.config['DEBUG'] = True
 
+# Shared across requests so the model and preprocessor are unpickled once per process
+predict_pipeline = PredictPipeline()
+
+def configure_logging():
+    """Queue log records to a background writer and sample the per-request lines"""
+    logging_config = predict_pipeline.config.logging
+    configure_async_logging(
+        enabled=logging_config['async_enabled'],
+        queue_size=logging_config['queue_size'],
+        sample_rates=logging_config['sample_rates']
+    )
+
+configure_logging()
+
+# Flipped by warm_up(); /ready reports it so load balancers skip cold processes
+readiness = {
+    'ready': False,
+    'started': False,
+    'version': None,
+    'load_seconds': None,
+    'warmup_seconds': None,
+    'warmup_requests': 0,
+    'error': None
+}
+readiness_lock = threading.Lock()
+
+def preload_artifacts():
+    """Load the model and preprocessor in this process, e.g. the gunicorn master before it forks"""
+    try:
+        _, _, version = predict_pipeline.load_artifacts()
+        logger.info(f"Preloaded artifacts version {version}")
+        return version
+    except FileNotFoundError:
+        logger.warning("Artifacts not found; workers will load them on the first request")
+        return None
+
+# Optional coalescing of concurrent /api/predict calls into vectorized batches.
+# The batcher is created per process on first use: one created in the gunicorn
+# master would reach the workers without its worker thread, which does not
+# survive fork, and nothing would ever drain its queue
+micro_batcher = None
+micro_batcher_pid = None
+micro_batcher_lock = threading.Lock()
+
+def get_micro_batcher():
+    """This process's MicroBatcher, or None when micro-batching is disabled"""
+    global micro_batcher, micro_batcher_pid
+    micro_batching = predict_pipeline.config.micro_batching
+    if not micro_batching["enabled"]:
+        return None
+    if micro_batcher_pid != os.getpid():
+        with micro_batcher_lock:
+            if micro_batcher_pid != os.getpid():
+                micro_batcher = MicroBatcher(
+                    predict_pipeline.predict_records,
+                    max_batch_size=micro_batching["max_batch_size"],
+                    window_ms=micro_batching["window_ms"],
+                    latency_target_ms=micro_batching["latency_target_ms"]
+                )
+                micro_batcher_pid = os.getpid()
+    return micro_batcher
+
+def reset_micro_batcher():
+    """Drop the batcher inherited from the parent process, e.g. in gunicorn's post_fork"""
+    global micro_batcher, micro_batcher_pid, micro_batcher_lock
+    micro_batcher = None
+    micro_batcher_pid = None
+    micro_batcher_lock = threading.Lock()
+
+def predict_one(record):
+    """Score one record through the micro-batcher when enabled, directly otherwise"""
+    batcher = get_micro_batcher()
+    if batcher is None:
+        return predict_pipeline.predict_record(record)
+    timeout_ms = predict_pipeline.config.micro_batching.get("timeout_ms", 1000)
+    try:
+        return batcher.predict(record, timeout=timeout_ms / 1000)
+    except TimeoutError:
+        logger.warning(f"Micro-batch did not answer within {timeout_ms} ms; scoring the record directly")
+        return predict_pipeline.predict_record(record)
+
+@app.before_request
+def start_request_metrics():
+    """Count the request as in flight under its route template"""
+    g.metrics_route = request.url_rule.rule if request.url_rule is not None else 'unmatched'
+    g.metrics_start = metrics.start_request(g.metrics_route)
+
+@app.after_request
+def end_request_metrics(response):
+    """Record status and end-to-end latency; also runs for error handler responses"""
+    if 'metrics_start' in g:
+        metrics.end_request(g.metrics_route, g.metrics_start, response.status_code)
+    return response
+
 # Route for home page
 @app.route('/')
 def index():
     """Render the main landing page with advanced UI"""
     try:
-        logger.info("Rendering index page")
+        serving_logger.info("Rendering index page")
         return render_template('index.html')
     except Exception:
         # Log full exception details server-side without exposing them to the client
@@ -42,7 +139,7 @@ def index():
 def simple_index():
     """Render the simple landing page for interviews"""
     try:
-        logger.info("Rendering simple index page")
+        serving_logger.info("Rendering simple index page")
         return render_template('simple_index.html')
     except Exception:
         # Log full exception details server-side without exposing them to the client
@@ -55,78 +152,53 @@ def simple_predict():
     """Simple prediction interface for interviews"""
     if request.method == 'GET':
         try:
-            logger.info("Rendering simple prediction form")
+            serving_logger.info("Rendering simple prediction form")
             return render_template('simple_home.html')
         except Exception:
             logger.exception("Error rendering simple prediction form")
             return "An internal error occurred while loading the prediction form.", 500
     else:
         try:
-            logger.info("Processing simple prediction request")
+            serving_logger.info("Processing simple prediction request")
             
-            # Extract form data with validation
-            form_data = {
-                'gender': request.form.get('gender'),
-                'race_ethnicity': request.form.get('ethnicity'),
-                'parental_level_of_education': request.form.get('parental_level_of_education'),
-                'lunch': request.form.get('lunch'),
-                'test_preparation_course': request.form.get('test_preparation_course'),
-                'reading_score': request.form.get('reading_score'),
-                'writing_score': request.form.get('writing_score')
-            }
-            
-            # Validate required fields
-            missing_fields = [key for key, value in form_data.items() if not value]
-            if missing_fields:
-                error_msg = f"Missing required fields: {', '.join(missing_fields)}"
-                logger.error(error_msg)
-                return render_template('simple_home.html', error=error_msg)
-            
-            # Validate numeric fields
-            try:
-                reading_score = float(form_data['reading_score'])
-                writing_score = float(form_data['writing_score'])
+            with metrics.stage('parse'):
+                # Extract form data with validation
+                form_data = {
+                    'gender': request.form.get('gender'),
+                    'race_ethnicity': request.form.get('ethnicity'),
+                    'parental_level_of_education': request.form.get('parental_level_of_education'),
+                    'lunch': request.form.get('lunch'),
+                    'test_preparation_course': request.form.get('test_preparation_course'),
+                    'reading_score': request.form.get('reading_score'),
+                    'writing_score': request.form.get('writing_score')
+                }
                 
-                if not (0 <= reading_score <= 100) or not (0 <= writing_score <= 100):
-                    error_msg = "Scores must be between 0 and 100"
+                # Validate and build the request record
+                try:
+                    record = PredictionRecord.from_mapping(form_data)
+                except ValueError as e:
+                    error_msg = str(e)
                     logger.error(error_msg)
                     return render_template('simple_home.html', error=error_msg)
-                    
-            except ValueError:
-                error_msg = "Invalid score values. Please enter numeric values."
-                logger.error(error_msg)
-                return render_template('simple_home.html', error=error_msg)
             
-            # Create custom data object
-            data = CustomData(
-                gender=form_data['gender'],
-                race_ethnicity=form_data['race_ethnicity'],
-                parental_level_of_education=form_data['parental_level_of_education'],
-                lunch=form_data['lunch'],
-                test_preparation_course=form_data['test_preparation_course'],
-                reading_score=reading_score,
-                writing_score=writing_score
-            )
-            
-            # Get prediction dataframe
-            pred_df = data.get_data_as_data_frame()
-            logger.info(f"Input data shape: {pred_df.shape}")
-            logger.info(f"Input data: {pred_df.to_dict('records')[0]}")
+            with metrics.stage('log'):
+                serving_logger.info("Input data: %s", record)
 
             # Make prediction
-            predict_pipeline = PredictPipeline()
-            results = predict_pipeline.predict(pred_df)
-            
-            prediction_score = float(results[0])
-            logger.info(f"Prediction result: {prediction_score}")
+            with metrics.stage('predict'):
+                prediction_score = predict_pipeline.predict_record(record)
+            with metrics.stage('log'):
+                serving_logger.info("Prediction result: %s", prediction_score)
             
             # Return result with enhanced data
-            return render_template('simple_home.html', 
-                                 results=prediction_score,
-                                 input_data=form_data,
-                                 success=True)
+            with metrics.stage('render'):
+                return render_template('simple_home.html', 
+                                     results=prediction_score,
+                                     input_data=form_data,
+                                     success=True)
             
         except Exception as e:
+            metrics.mark_error()
             error_msg = f"Prediction error: {str(e)}"
             logger.error(error_msg)
             return render_template('simple_home.html', 
@@ -138,78 +210,53 @@ def predict_datapoint():
     """Handle prediction requests with enhanced error handling"""
     if request.method == 'GET':
         try:
-            logger.info("Rendering prediction form")
+            serving_logger.info("Rendering prediction form")
             return render_template('home.html')
         except Exception as e:
             logger.error(f"Error rendering prediction form: {str(e)}")
             return "An internal error occurred while loading the prediction form.", 500
     else:
         try:
-            logger.info("Processing prediction request")
-            
-            # Extract form data with validation
-            form_data = {
-                'gender': request.form.get('gender'),
-                'race_ethnicity': request.form.get('ethnicity'),
-                'parental_level_of_education': request.form.get('parental_level_of_education'),
-                'lunch': request.form.get('lunch'),
-                'test_preparation_course': request.form.get('test_preparation_course'),
-                'reading_score': request.form.get('reading_score'),
-                'writing_score': request.form.get('writing_score')
-            }
+            serving_logger.info("Processing prediction request")
             
-            # Validate required fields
-            missing_fields = [key for key, value in form_data.items() if not value]
-            if missing_fields:
-                error_msg = f"Missing required fields: {', '.join(missing_fields)}"
-                logger.error(error_msg)
-                return render_template('home.html', error=error_msg)
-            
-            # Validate numeric fields
-            try:
-                reading_score = float(form_data['reading_score'])
-                writing_score = float(form_data['writing_score'])
+            with metrics.stage('parse'):
+                # Extract form data with validation
+                form_data = {
+                    'gender': request.form.get('gender'),
+                    'race_ethnicity': request.form.get('ethnicity'),
+                    'parental_level_of_education': request.form.get('parental_level_of_education'),
+                    'lunch': request.form.get('lunch'),
+                    'test_preparation_course': request.form.get('test_preparation_course'),
+                    'reading_score': request.form.get('reading_score'),
+                    'writing_score': request.form.get('writing_score')
+                }
                 
-                if not (0 <= reading_score <= 100) or not (0 <= writing_score <= 100):
-                    error_msg = "Scores must be between 0 and 100"
+                # Validate and build the request record
+                try:
+                    record = PredictionRecord.from_mapping(form_data)
+                except ValueError as e:
+                    error_msg = str(e)
                     logger.error(error_msg)
                     return render_template('home.html', error=error_msg)
-                    
-            except ValueError:
-                error_msg = "Invalid score values. Please enter numeric values."
-                logger.error(error_msg)
-                return render_template('home.html', error=error_msg)
             
-            # Create custom data object
-            data = CustomData(
-                gender=form_data['gender'],
-                race_ethnicity=form_data['race_ethnicity'],
-                parental_level_of_education=form_data['parental_level_of_education'],
-                lunch=form_data['lunch'],
-                test_preparation_course=form_data['test_preparation_course'],
-                reading_score=reading_score,
-                writing_score=writing_score
-            )
-            
-            # Get prediction dataframe
-            pred_df = data.get_data_as_data_frame()
-            logger.info(f"Input data shape: {pred_df.shape}")
-            logger.info(f"Input data: {pred_df.to_dict('records')[0]}")
+            with metrics.stage('log'):
+                serving_logger.info("Input data: %s", record)
 
             # Make prediction
-            predict_pipeline = PredictPipeline()
-            results = predict_pipeline.predict(pred_df)
-            
-            prediction_score = float(results[0])
-            logger.info(f"Prediction result: {prediction_score}")
+            with metrics.stage('predict'):
+                prediction_score = predict_pipeline.predict_record(record)
+            with metrics.stage('log'):
+                serving_logger.info("Prediction result: %s", prediction_score)
             
             # Return result with enhanced data
-            return render_template('home.html', 
-                                 results=prediction_score,
-                                 input_data=form_data,
-                                 success=True)
+            with metrics.stage('render'):
+                return render_template('home.html', 
+                                     results=prediction_score,
+                                     input_data=form_data,
+                                     success=True)
             
         except Exception as e:
+            metrics.mark_error()
             error_msg = f"Prediction error: {str(e)}"
             logger.error(error_msg)
             return render_template('home.html', 
@@ -220,35 +267,42 @@ def predict_datapoint():
 def api_predict():
     """API endpoint for programmatic predictions"""
     try:
-        data = request.get_json()
-        
-        # Validate JSON data
-        required_fields = ['gender', 'race_ethnicity', 'parental_level_of_education', 
-                          'lunch', 'test_preparation_course', 'reading_score', 'writing_score']
-        
-        missing_fields = [field for field in required_fields if field not in data]
-        if missing_fields:
-            return jsonify({
-                'error': f'Missing required fields: {", ".join(missing_fields)}',
-                'success': False
-            }), 400
+        with metrics.stage('parse'):
+            data = request.get_json()
+            
+            # Validate JSON data
+            try:
+                record = PredictionRecord.from_mapping(data)
+            except ValueError as e:
+                return jsonify({
+                    'error': str(e),
+                    'success': False
+                }), 400
         
         # Create prediction
-        custom_data = CustomData(**data)
-        pred_df = custom_data.get_data_as_data_frame()
-        
-        predict_pipeline = PredictPipeline()
-        results = predict_pipeline.predict(pred_df)
+        with metrics.stage('predict'):
+            prediction = predict_one(record)
         
-        return jsonify({
-            'prediction': float(results[0]),
+        response = {
+            'prediction': prediction,
             'success': True,
             'model_info': {
                 'accuracy': '87%',
                 'r2_score': 0.89,
                 'model_type': 'Ensemble (Multiple Algorithms)'
             }
-        })
+        }
+
+        # Per-feature contributions come for free when a linear model is folded;
+        # other models still return their prediction, with the reason instead
+        if request.args.get('explain', '').lower() in ('1', 'true', 'yes'):
+            try:
+                response['contributions'] = predict_pipeline.explain_record(record)['contributions']
+            except ValueError as e:
+                response['contributions_unavailable'] = str(e)
+
+        with metrics.stage('render'):
+            return jsonify(response)
         
     except Exception as e:
         logger.error(f"API prediction error: {str(e)}")
@@ -257,6 +311,151 @@ def api_predict():
             'success': False
         }), 500
 
+@app.route('/api/predict/batch', methods=['POST'])
+def api_predict_batch():
+    """API endpoint for scoring many records in one request"""
+    try:
+        with metrics.stage('parse'):
+            data = request.get_json(silent=True)
+            records = data.get('records') if isinstance(data, dict) else data
+
+        if not isinstance(records, list) or not records:
+            return jsonify({
+                'error': 'Request body must be a non-empty list of records or {"records": [...]}',
+                'success': False
+            }), 400
+
+        max_batch_size = predict_pipeline.config.max_batch_size
+        if len(records) > max_batch_size:
+            return jsonify({
+                'error': f'Batch size {len(records)} exceeds the limit of {max_batch_size}',
+                'success': False
+            }), 413
+
+        with metrics.stage('predict'):
+            results = predict_pipeline.predict_batch(records)
+        error_count = sum(1 for result in results if not result['success'])
+
+        with metrics.stage('render'):
+            return jsonify({
+                'results': results,
+                'count': len(results),
+                'error_count': error_count,
+                'success': True
+            })
+
+    except Exception as e:
+        logger.error(f"API batch prediction error: {str(e)}")
+        return jsonify({
+            'error': 'An internal error occurred while processing the batch prediction request.',
+            'success': False
+        }), 500
+
+def warm_up_requests(client, records, rounds):
+    """
+    Send each warm-up record through both forms and the JSON API, then all of
+    them through the batch API, rounds times
+
+    Returns:
+        int: Number of requests sent
+    """
+    count = 0
+    for _ in range(rounds):
+        for record in records:
+            form = dict(record)
+            form['ethnicity'] = form.pop('race_ethnicity')
+            responses = [
+                client.post('/predictdata', data=form),
+                client.post('/simple-predict', data=form),
+                client.post('/api/predict', json=record),
+            ]
+            for response in responses:
+                if response.status_code != 200:
+                    raise RuntimeError(f"Warm-up request failed with status {response.status_code}")
+            count += len(responses)
+        response = client.post('/api/predict/batch', json={'records': records})
+        if response.status_code != 200:
+            raise RuntimeError(f"Warm-up batch request failed with status {response.status_code}")
+        count += 1
+    return count
+
+def warm_up():
+    """
+    Load the artifacts and push synthetic requests through every serving path
+    (both HTML forms, the JSON API and the batch API) before reporting ready
+
+    The prediction cache is bypassed meanwhile, so every round reaches the
+    preprocessor and the model, and the warm-up requests are dropped from
+    /metrics afterwards.
+    """
+    with readiness_lock:
+        if readiness['started']:
+            return readiness['ready']
+        readiness['started'] = True
+
+    try:
+        start = time.perf_counter()
+        version = preload_artifacts()
+        if version is None:
+            raise FileNotFoundError("Model artifacts are not available")
+        readiness['version'] = version
+        readiness['load_seconds'] = round(time.perf_counter() - start, 4)
+
+        warmup = predict_pipeline.config.warmup
+        records = list(warmup['records'])
+        client = app.test_client()
+        start = time.perf_counter()
+        # /ready answers 503 until this finishes, so no real traffic misses the cache meanwhile
+        prediction_cache, predict_pipeline.prediction_cache = predict_pipeline.prediction_cache, None
+        try:
+            count = warm_up_requests(client, records, warmup['rounds'])
+        finally:
+            predict_pipeline.prediction_cache = prediction_cache
+            metrics.reset()
+
+        readiness['warmup_seconds'] = round(time.perf_counter() - start, 4)
+        readiness['warmup_requests'] = count
+        readiness['error'] = None
+        readiness['ready'] = True
+        logger.info(f"Warm-up finished: {count} requests in {readiness['warmup_seconds']}s")
+    except Exception as e:
+        logger.error(f"Warm-up failed: {str(e)}")
+        readiness['error'] = str(e)
+        # Allow a later /ready probe to retry, e.g. once training has produced the artifacts
+        readiness['started'] = False
+    return readiness['ready']
+
+def start_warm_up():
+    """Run warm_up in a background thread so the server can answer /ready meanwhile"""
+    thread = threading.Thread(target=warm_up, name="warm-up", daemon=True)
+    thread.start()
+    return thread
+
+@app.route('/ready')
+def readiness_check():
+    """Readiness endpoint: 503 until the artifacts are loaded and every serving path is warm"""
+    if not readiness['ready'] and not readiness['started']:
+        start_warm_up()
+
+    status = {key: value for key, value in readiness.items() if key != 'started'}
+    return jsonify(status), (200 if readiness['ready'] else 503)
+
+@app.route('/metrics')
+def metrics_endpoint():
+    """
+    Prometheus scrape endpoint with per-route counters and per-stage latency
+    histograms, plus the artifact cache, prediction cache and micro-batching
+    numbers of this process
+    """
+    body = metrics.render()
+    body += render_artifact_cache(artifact_cache.stats(), metrics.prefix)
+    if predict_pipeline.prediction_cache is not None:
+        body += render_prediction_cache(predict_pipeline.prediction_cache.stats(), metrics.prefix)
+    # Only a batcher this process created; scraping should not start one
+    if micro_batcher is not None and micro_batcher_pid == os.getpid():
+        body += render_micro_batching(micro_batcher.stats(), metrics.prefix)
+    return body, 200, {'Content-Type': 'text/plain; version=0.0.4; charset=utf-8'}
+
 @app.route('/health')
 def health_check():
     """Health check endpoint for monitoring"""
@@ -300,4 +499,5 @@ if __name__ == "__main__":
     logger.info("Features: Advanced UI, 3D Effects, Animations, Real-time Predictions")
     logger.info("Access the application at: http://localhost:5000")
     
+    start_warm_up()
     app.run(host="0.0.0.0", port=5000, debug=debug_mode)
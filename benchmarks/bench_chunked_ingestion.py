@@ -0,0 +1,100 @@
+"""Peak memory of whole-file vs chunked ingestion and train/test splitting.
+
+Tiles data/student-scores.xlsx into a CSV of --rows rows, then runs each mode
+in a fresh interpreter and reports its wall time and peak RSS:
+
+  whole:   read_table + write_table, then an in-memory train_test_split
+  chunked: iter_table_chunks + PartitionedWriter, then the streamed hash split
+
+The interpreter's baseline RSS (after imports) is reported separately so the
+numbers show what the data itself costs. Results are kept in
+benchmarks/chunked_ingestion.json.
+
+Run with:
+  PYTHONPATH=$PWD python benchmarks/bench_chunked_ingestion.py            # print
+  PYTHONPATH=$PWD python benchmarks/bench_chunked_ingestion.py --write    # update chunked_ingestion.json
+"""
+import sys
+import json
+import argparse
+import tempfile
+import subprocess
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+RESULTS_PATH = Path(__file__).with_name("chunked_ingestion.json")
+
+RUNNER = """
+import sys, time, resource
+from pathlib import Path
+from src.student_performance.components.data_transformation import DataTransformation
+from src.student_performance.entity.config_entity import DataTransformationConfig
+from src.student_performance.utils.columnar_store import PartitionedWriter, iter_table_chunks, read_table, write_table
+
+mode, source, out, chunk_rows = sys.argv[1], Path(sys.argv[2]), Path(sys.argv[3]), int(sys.argv[4])
+baseline = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+start = time.perf_counter()
+data_file = out / "data.parquet"
+split = {"method": "hash" if mode == "chunked" else "random", "key_column": "id", "test_size": 0.2, "seed": 42}
+if mode == "chunked":
+    with PartitionedWriter(data_file) as writer:
+        for chunk in iter_table_chunks(source, chunk_rows):
+            writer.write(chunk)
+elif mode == "whole":
+    write_table(read_table(source), data_file)
+if mode != "baseline":
+    config = DataTransformationConfig(root_dir=out, data_path=data_file, preprocessor_obj_file_path=out / "p.pkl",
+                                      chunk_rows=chunk_rows, split=split)
+    transformation = DataTransformation(config)
+    if mode == "chunked":
+        transformation.hash_split_to_store(split)
+    else:
+        from sklearn.model_selection import train_test_split
+        train, test = train_test_split(read_table(data_file), test_size=0.2, random_state=42)
+        for frame, path in zip((train, test), transformation.split_paths()):
+            write_table(frame, path)
+print(time.perf_counter() - start, baseline, resource.getrusage(resource.RUSAGE_SELF).ru_maxrss)
+"""
+
+
+def run(mode, source, chunk_rows):
+    with tempfile.TemporaryDirectory() as out:
+        result = subprocess.run([sys.executable, "-c", RUNNER, mode, str(source), out, str(chunk_rows)],
+                                cwd=ROOT, capture_output=True, text=True, check=True)
+    # The package logger also writes to stdout; the measurements are the last line
+    seconds, baseline_kb, peak_kb = result.stdout.splitlines()[-1].split()
+    return {"seconds": round(float(seconds), 2), "baseline_rss_mb": round(int(baseline_kb) / 1024, 1),
+            "peak_rss_mb": round(int(peak_kb) / 1024, 1)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1_000_000, help="Rows in the generated CSV")
+    parser.add_argument("--chunk-rows", type=int, default=100_000, help="Rows per chunk in chunked mode")
+    parser.add_argument("--write", action="store_true", help=f"Store the results in {RESULTS_PATH.name}")
+    args = parser.parse_args()
+
+    import numpy as np
+    import pandas as pd
+
+    source = pd.read_excel(ROOT / "data" / "student-scores.xlsx")
+    frame = pd.concat([source] * -(-args.rows // len(source)), ignore_index=True).iloc[:args.rows]
+    frame["id"] = np.arange(1, len(frame) + 1)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        csv_path = Path(tmp) / "data.csv"
+        frame.to_csv(csv_path, index=False)
+        del frame
+        results = {"rows": args.rows, "chunk_rows": args.chunk_rows,
+                   "csv_mb": round(csv_path.stat().st_size / 1e6, 1)}
+        for mode in ("baseline", "whole", "chunked"):
+            results[mode] = run(mode, csv_path, args.chunk_rows)
+            print(f"{mode:9s} {results[mode]['seconds']:7.2f} s  peak RSS {results[mode]['peak_rss_mb']:8.1f} MB")
+
+    if args.write:
+        RESULTS_PATH.write_text(json.dumps(results, indent=2) + "\n")
+        print(f"Wrote {RESULTS_PATH}")
+
+
+if __name__ == "__main__":
+    main()
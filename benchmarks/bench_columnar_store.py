@@ -0,0 +1,83 @@
+"""Parse time and on-disk size of the training data: Excel and CSV vs the Parquet store.
+
+Reads data/student-scores.xlsx once, then tiles it to --rows rows (the
+sample workbook is too small to time the text formats reliably) and writes
+it as CSV and as schema-typed Parquet. For each format the fastest of
+--repeat full reads is kept, plus a two-column Parquet read, which is what
+column pruning buys a stage that needs only a few features. Results are kept
+in benchmarks/columnar_store.json.
+
+Run with:
+  PYTHONPATH=$PWD python benchmarks/bench_columnar_store.py            # print
+  PYTHONPATH=$PWD python benchmarks/bench_columnar_store.py --write    # update columnar_store.json
+"""
+import json
+import time
+import argparse
+import tempfile
+from pathlib import Path
+
+import pandas as pd
+
+from src.student_performance.constants import SCHEMA_FILE_PATH
+from src.student_performance.utils.common import read_yaml
+from src.student_performance.utils.columnar_store import read_table, schema_dtypes, write_table
+
+ROOT = Path(__file__).resolve().parents[1]
+SOURCE = ROOT / "data" / "student-scores.xlsx"
+RESULTS_PATH = Path(__file__).with_name("columnar_store.json")
+
+
+def best_of(repeat, fn):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=200_000, help="Rows in the tiled CSV/Parquet tables")
+    parser.add_argument("--repeat", type=int, default=3, help="Reads per format; the fastest is kept")
+    parser.add_argument("--write", action="store_true", help=f"Store the results in {RESULTS_PATH.name}")
+    args = parser.parse_args()
+
+    dtypes = schema_dtypes(read_yaml(SCHEMA_FILE_PATH))
+    source_seconds = best_of(args.repeat, lambda: pd.read_excel(SOURCE))
+    source = pd.read_excel(SOURCE)
+    frame = pd.concat([source] * -(-args.rows // len(source)), ignore_index=True).iloc[:args.rows]
+
+    results = {
+        "source_xlsx": {"rows": len(source), "bytes": SOURCE.stat().st_size,
+                        "read_ms": round(source_seconds * 1000, 1),
+                        "read_us_per_row": round(source_seconds * 1e6 / len(source), 2)},
+    }
+    with tempfile.TemporaryDirectory() as tmp:
+        csv_path, parquet_path = Path(tmp) / "data.csv", Path(tmp) / "data.parquet"
+        write_table(frame, csv_path)
+        write_table(frame.copy(), parquet_path, dtypes=dtypes)
+
+        cases = {
+            "csv": (csv_path, lambda: read_table(csv_path, dtypes=dtypes)),
+            "parquet": (parquet_path, lambda: read_table(parquet_path)),
+            "parquet_2_columns": (parquet_path, lambda: read_table(parquet_path, columns=["gender", "math_score"])),
+        }
+        for name, (path, read) in cases.items():
+            seconds = best_of(args.repeat, read)
+            results[name] = {"rows": len(frame), "bytes": path.stat().st_size,
+                             "read_ms": round(seconds * 1000, 1),
+                             "read_us_per_row": round(seconds * 1e6 / len(frame), 2)}
+
+    for name, report in results.items():
+        print(f"{name:18s} {report['rows']:>8d} rows  {report['bytes'] / 1e6:8.2f} MB  "
+              f"{report['read_ms']:9.1f} ms  {report['read_us_per_row']:7.2f} us/row")
+
+    if args.write:
+        RESULTS_PATH.write_text(json.dumps(results, indent=2) + "\n")
+        print(f"Wrote {RESULTS_PATH}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+"""Throughput and peak memory of the schema validation stage on a large synthetic data file.
+
+Generates --rows rows shaped like the student data as a partitioned Parquet
+table (one part per million rows, with about 0.1% of rows pushed out of
+their domain or range), then runs each mode in a fresh interpreter with the
+schema.yaml rules and reports its rows/second and peak RSS:
+
+  in_memory: read_table of the whole data file, then validation of that frame
+             (how the stage read its input before it streamed)
+  streamed:  DataValidation reading the data file chunk_rows rows at a time
+
+The interpreter's baseline RSS (after imports) is reported separately so the
+numbers show what the data itself costs. Results are kept in
+benchmarks/data_validation.json.
+
+Run with (Linux only, reads /proc):
+  PYTHONPATH=$PWD python benchmarks/bench_data_validation.py            # print
+  PYTHONPATH=$PWD python benchmarks/bench_data_validation.py --write    # update data_validation.json
+"""
+import sys
+import json
+import argparse
+import tempfile
+import subprocess
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from src.student_performance.constants import SCHEMA_FILE_PATH
+from src.student_performance.utils.common import read_yaml
+from src.student_performance.utils.columnar_store import PartitionedWriter, apply_schema, schema_dtypes
+
+ROOT = Path(__file__).resolve().parents[1]
+RESULTS_PATH = Path(__file__).with_name("data_validation.json")
+PART_ROWS = 1_000_000
+
+# Peak RSS is read from VmHWM, which starts afresh in the new interpreter; ru_maxrss
+# would carry over the parent's peak from generating the data
+RUNNER = """
+import sys, json, time
+from pathlib import Path
+from src.student_performance.constants import SCHEMA_FILE_PATH
+from src.student_performance.components.data_validation import DataValidation
+from src.student_performance.entity.config_entity import DataValidationConfig
+from src.student_performance.utils.common import read_yaml
+from src.student_performance.utils.columnar_store import read_table
+
+def peak_kb():
+    with open("/proc/self/status") as f:
+        return next(int(line.split()[1]) for line in f if line.startswith("VmHWM:"))
+
+mode, data_path, out, chunk_rows = sys.argv[1], Path(sys.argv[2]), Path(sys.argv[3]), int(sys.argv[4])
+schema = read_yaml(SCHEMA_FILE_PATH)
+config = DataValidationConfig(root_dir=out, STATUS_FILE=str(out / "status.txt"), unzip_data_dir=data_path,
+                              all_schema=schema.COLUMNS, domain_values=schema.DOMAIN_VALUE,
+                              validation_rules=schema.VALIDATION_RULES, report_file=out / "report.json",
+                              chunk_rows=chunk_rows)
+baseline = peak_kb()
+start = time.perf_counter()
+rows, violations = 0, {}
+if mode != "baseline":
+    DataValidation(config).validate_all_columns(read_table(data_path) if mode == "in_memory" else None)
+    report = json.loads((out / "report.json").read_text())
+    rows, violations = report["rows"], {name: entry["violations"] for name, entry in report["violations"].items()}
+print(json.dumps({"seconds": time.perf_counter() - start, "baseline_kb": baseline,
+                  "peak_kb": peak_kb(),
+                  "rows": rows, "violations": violations}))
+"""
+
+
+def synthetic_part(schema, start, n_rows, rng):
+    part = {}
+    for column, dtype in schema.COLUMNS.items():
+        if column in schema.DOMAIN_VALUE:
+            part[column] = rng.choice([str(v) for v in schema.DOMAIN_VALUE[column]], n_rows)
+        elif dtype == "object":
+            part[column] = rng.choice(["a", "b", "c", None], n_rows)
+        else:
+            part[column] = rng.integers(0, 21, n_rows).astype(dtype)
+    df = pd.DataFrame(part)
+    df["id"] = np.arange(start, start + n_rows)
+    bad = rng.random(n_rows) < 0.001
+    df.loc[bad, "math_score"] = 150
+    df.loc[bad, "career_aspiration"] = "Astronaut"
+    return df
+
+
+def run(mode, data_path, chunk_rows):
+    with tempfile.TemporaryDirectory() as out:
+        result = subprocess.run([sys.executable, "-c", RUNNER, mode, str(data_path), out, str(chunk_rows)],
+                                cwd=ROOT, capture_output=True, text=True, check=True)
+    # The package logger also writes to stdout; the measurements are the last line
+    measured = json.loads(result.stdout.splitlines()[-1])
+    summary = {"seconds": round(measured["seconds"], 2),
+               "baseline_rss_mb": round(measured["baseline_kb"] / 1024, 1),
+               "peak_rss_mb": round(measured["peak_kb"] / 1024, 1)}
+    if mode != "baseline":
+        summary["rows_per_second"] = round(measured["rows"] / measured["seconds"])
+    return summary, measured
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=10_000_000, help="Rows in the synthetic data file")
+    parser.add_argument("--chunk-rows", type=int, default=100_000, help="Rows validated at a time")
+    parser.add_argument("--write", action="store_true", help=f"Store the results in {RESULTS_PATH.name}")
+    args = parser.parse_args()
+
+    schema = read_yaml(SCHEMA_FILE_PATH)
+    dtypes = schema_dtypes(schema)
+    rng = np.random.default_rng(0)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        data_path = Path(tmp) / "data.parquet"
+        with PartitionedWriter(data_path) as writer:
+            for start in range(0, args.rows, PART_ROWS):
+                n_rows = min(PART_ROWS, args.rows - start)
+                writer.write(apply_schema(synthetic_part(schema, start, n_rows, rng), dtypes))
+
+        results = {"rows": args.rows, "chunk_rows": args.chunk_rows}
+        for mode in ("baseline", "in_memory", "streamed"):
+            results[mode], measured = run(mode, data_path, args.chunk_rows)
+            print(f"{mode:9s} {results[mode]['seconds']:7.2f} s  peak RSS {results[mode]['peak_rss_mb']:8.1f} MB")
+        results["violations"] = measured["violations"]
+
+    if args.write:
+        RESULTS_PATH.write_text(json.dumps(results, indent=2) + "\n")
+        print(f"Wrote {RESULTS_PATH}")
+
+
+if __name__ == "__main__":
+    main()
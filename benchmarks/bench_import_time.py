@@ -0,0 +1,88 @@
+"""Cold-start import cost of the serving and CLI entry points.
+
+Runs each entry point in a fresh interpreter under `python -X importtime`,
+attributes every module's self time to its top-level package and prints the
+heaviest packages. Results are kept in benchmarks/import_time.json so a
+change that drags sklearn/pandas/xgboost back into the serving import graph
+shows up in review.
+
+Run with:
+  PYTHONPATH=$PWD python benchmarks/bench_import_time.py            # print
+  PYTHONPATH=$PWD python benchmarks/bench_import_time.py --write    # update import_time.json
+"""
+import re
+import sys
+import json
+import argparse
+import subprocess
+from collections import Counter
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+RESULTS_PATH = Path(__file__).with_name("import_time.json")
+
+ENTRY_POINTS = {
+    "web app": "app",
+    "prediction pipeline": "src.student_performance.pipeline.prediction_pipeline",
+    "bulk scoring CLI": "src.student_performance.pipeline.bulk_scoring_pipeline",
+    "training pipeline": "src.student_performance.pipeline.training_pipeline",
+}
+
+# Packages the serving path should only load once an artifact needs them
+HEAVY_PACKAGES = ("sklearn", "scipy", "pandas", "joblib", "xgboost", "catboost", "mlflow")
+
+LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|(\s*)(\S+)")
+
+
+def profile(module, repeat=3):
+    """
+    Import module in fresh interpreters and keep the fastest run
+
+    Returns:
+        dict: total milliseconds, milliseconds per top-level package and heavy packages loaded
+    """
+    best = None
+    for _ in range(repeat):
+        result = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                                cwd=ROOT, capture_output=True, text=True)
+        if result.returncode != 0:
+            return {"error": result.stderr.strip().splitlines()[-1]}
+
+        packages = Counter()
+        for line in result.stderr.splitlines():
+            match = LINE.match(line)
+            if match:
+                packages[match.group(4).split(".")[0]] += int(match.group(1))
+        total = sum(packages.values()) / 1000
+        if best is None or total < best["total_ms"]:
+            best = {
+                "total_ms": round(total, 1),
+                "packages_ms": {name: round(us / 1000, 1) for name, us in packages.most_common(8)},
+                "heavy_packages": sorted(name for name in packages if name in HEAVY_PACKAGES),
+            }
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per entry point; the fastest is kept")
+    parser.add_argument("--write", action="store_true", help=f"Store the results in {RESULTS_PATH.name}")
+    args = parser.parse_args()
+
+    results = {}
+    for label, module in ENTRY_POINTS.items():
+        results[label] = profile(module, args.repeat)
+        report = results[label]
+        if "error" in report:
+            print(f"{label:22s} failed: {report['error']}")
+            continue
+        top = ", ".join(f"{name} {ms}" for name, ms in report["packages_ms"].items())
+        print(f"{label:22s} {report['total_ms']:8.1f} ms  heavy={report['heavy_packages']}  [{top}]")
+
+    if args.write:
+        RESULTS_PATH.write_text(json.dumps(results, indent=2) + "\n")
+        print(f"Wrote {RESULTS_PATH}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+"""Per-worker memory of a large model artifact, copied vs memory-mapped.
+
+Forks N workers the way gunicorn does and reports each worker's RSS and PSS
+(proportional set size: shared pages are split between the processes that
+map them) after loading the artifact and scoring one batch. Results are kept
+in benchmarks/shared_artifacts.json.
+
+Run with (Linux only, reads /proc):
+  PYTHONPATH=$PWD python benchmarks/bench_shared_artifacts.py --workers 4            # print
+  PYTHONPATH=$PWD python benchmarks/bench_shared_artifacts.py --workers 4 --write    # update shared_artifacts.json
+"""
+import gc
+import os
+import sys
+import json
+import argparse
+import tempfile
+import multiprocessing
+from pathlib import Path
+
+import numpy as np
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from sklearn.ensemble import RandomForestRegressor
+
+from src.student_performance.utils.common import load_bin, save_bin
+from src.student_performance.utils.tree_engine import export_tree_ensemble
+
+RESULTS_PATH = Path(__file__).with_name("shared_artifacts.json")
+
+
+def memory_mb():
+    usage = {}
+    with open("/proc/self/smaps_rollup") as f:
+        for line in f:
+            parts = line.split()
+            if parts[0] in ("Rss:", "Pss:"):
+                usage[parts[0][:-1]] = int(parts[1]) / 1024
+    return usage
+
+
+def worker(path, mmap_mode, preloaded, X, barrier, queue):
+    model = preloaded if preloaded is not None else load_bin(path, mmap_mode=mmap_mode)
+    model.predict(X)
+    # Measure only once every worker holds the model, so PSS reflects the sharing
+    barrier.wait()
+    queue.put(memory_mb())
+    barrier.wait()
+
+
+def run(path, mmap_mode, preload, workers, X):
+    preloaded = load_bin(path, mmap_mode=mmap_mode) if preload else None
+    context = multiprocessing.get_context("fork")
+    barrier = context.Barrier(workers)
+    queue = context.Queue()
+    processes = [context.Process(target=worker, args=(path, mmap_mode, preloaded, X, barrier, queue))
+                 for _ in range(workers)]
+    for process in processes:
+        process.start()
+    results = [queue.get() for _ in processes]
+    for process in processes:
+        process.join()
+    return results
+
+
+def build_artifact(path, trees):
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(50000, 28))
+    y = X[:, 0] * 3 + rng.normal(size=len(X))
+    model = RandomForestRegressor(n_estimators=trees, n_jobs=-1, random_state=0).fit(X, y)
+    save_bin(export_tree_ensemble(model), path)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--trees", type=int, default=200)
+    parser.add_argument("--write", action="store_true", help=f"Store the results in {RESULTS_PATH.name}")
+    args = parser.parse_args()
+
+    X = np.random.default_rng(1).normal(size=(100, 28))
+    modes = [
+        ("copy", None, False),
+        ("preload", None, True),
+        ("mmap", "c", False),
+        ("preload+mmap", "c", True),
+    ]
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = os.path.join(tmp_dir, "tree_model.pkl")
+        build_artifact(path, args.trees)
+        gc.collect()
+
+        summary = {"artifact_mb": round(os.path.getsize(path) / 2**20, 1), "workers": args.workers,
+                   "trees": args.trees}
+        print(f"artifact size: {summary['artifact_mb']} MB, workers: {args.workers}")
+        print(f"{'mode':<14}{'RSS/worker MB':>16}{'PSS/worker MB':>16}{'PSS total MB':>15}")
+        for name, mmap_mode, preload in modes:
+            results = run(path, mmap_mode, preload, args.workers, X)
+            rss = np.mean([r["Rss"] for r in results])
+            pss = np.mean([r["Pss"] for r in results])
+            total = sum(r["Pss"] for r in results)
+            print(f"{name:<14}{rss:>16.1f}{pss:>16.1f}{total:>15.1f}")
+            summary[name] = {"rss_per_worker_mb": round(float(rss), 1), "pss_per_worker_mb": round(float(pss), 1),
+                             "pss_total_mb": round(float(total), 1)}
+            gc.collect()
+
+    if args.write:
+        RESULTS_PATH.write_text(json.dumps(summary, indent=2) + "\n")
+        print(f"Wrote {RESULTS_PATH}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""Latency of the NumPy tree engine against each library's own predict.
+
+The engine targets online batch sizes (1-100 rows), where it avoids the
+per-call overhead of sklearn/xgboost/catboost. Large offline batches are
+still faster through the native predict. Results are kept in
+benchmarks/tree_engine.json.
+
+Run with:
+  PYTHONPATH=$PWD python benchmarks/bench_tree_engine.py            # print
+  PYTHONPATH=$PWD python benchmarks/bench_tree_engine.py --write    # update tree_engine.json
+"""
+import sys
+import json
+import timeit
+import argparse
+from pathlib import Path
+
+import numpy as np
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from catboost import CatBoostRegressor
+from sklearn.ensemble import AdaBoostRegressor, GradientBoostingRegressor, RandomForestRegressor
+from xgboost import XGBRegressor
+
+from src.student_performance.utils.tree_engine import export_tree_ensemble, verify_tree_ensemble
+
+RESULTS_PATH = Path(__file__).with_name("tree_engine.json")
+BATCH_SIZES = [1, 100, 10000]
+
+
+def make_features(n_rows, seed):
+    rng = np.random.default_rng(seed)
+    X = rng.normal(size=(n_rows, 28))
+    X[:, 10:] = (X[:, 10:] > 0) * 1.7
+    y = 3 * X[:, 0] + 2 * X[:, 12] - X[:, 3] + rng.normal(size=n_rows)
+    return X, y
+
+
+def best_of(fn, repeat=5):
+    number = max(1, int(0.2 / max(timeit.timeit(fn, number=1), 1e-6)))
+    return min(timeit.repeat(fn, number=number, repeat=repeat)) / number
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--write", action="store_true", help=f"Store the results in {RESULTS_PATH.name}")
+    args = parser.parse_args()
+
+    X_train, y_train = make_features(2000, seed=0)
+    models = {
+        "Random Forest": RandomForestRegressor(n_estimators=128, random_state=0),
+        "Gradient Boosting": GradientBoostingRegressor(n_estimators=128, random_state=0),
+        "AdaBoost Regressor": AdaBoostRegressor(n_estimators=128, random_state=0),
+        "XGBRegressor": XGBRegressor(n_estimators=128),
+        "CatBoosting Regressor": CatBoostRegressor(iterations=100, depth=6, verbose=False,
+                                                   allow_writing_files=False),
+    }
+
+    results = {}
+    print(f"{'model':<24}{'batch':>8}{'native ms':>12}{'numpy ms':>12}{'speedup':>10}")
+    for name, model in models.items():
+        model.fit(X_train, y_train)
+        engine = export_tree_ensemble(model)
+        for batch_size in BATCH_SIZES:
+            X, _ = make_features(batch_size, seed=batch_size)
+            verify_tree_ensemble(engine, model, X)
+            native = best_of(lambda: model.predict(X))
+            numpy = best_of(lambda: engine.predict(X))
+            print(f"{name:<24}{batch_size:>8}{1000 * native:>12.3f}{1000 * numpy:>12.3f}{native / numpy:>9.1f}x")
+            results.setdefault(name, {})[str(batch_size)] = {
+                "native_ms": round(1000 * native, 3),
+                "numpy_ms": round(1000 * numpy, 3),
+                "speedup": round(native / numpy, 1),
+            }
+
+    if args.write:
+        RESULTS_PATH.write_text(json.dumps(results, indent=2) + "\n")
+        print(f"Wrote {RESULTS_PATH}")
+
+
+if __name__ == "__main__":
+    main()
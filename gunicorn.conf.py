@@ -0,0 +1,38 @@
+"""Gunicorn settings picked up automatically by `gunicorn app:app` (see Procfile).
+
+The app is imported once in the master, which loads the model artifacts
+and warms every serving path before forking. With artifacts memory-mapped copy-on-write (prediction.mmap_mode)
+every worker shares a single physical copy of the large arrays.
+"""
+import gc
+
+preload_app = True
+
+
+def when_ready(server):
+    from app import warm_up
+
+    # Workers fork after this returns, so they start loaded, warm and ready
+    warm_up()
+    # Keep the preloaded objects out of the collector so refcount/GC
+    # bookkeeping does not copy their pages into every worker
+    gc.freeze()
+
+
+def post_fork(server, worker):
+    from app import configure_logging, reset_micro_batcher
+    from src.student_performance.utils.metrics import metrics
+
+    # The master's log writer and micro-batcher threads do not survive fork;
+    # each worker starts its own
+    configure_logging()
+    reset_micro_batcher()
+    # Samples recorded in the master would otherwise be reported by every worker
+    metrics.reset()
+
+
+def worker_exit(server, worker):
+    from src.student_performance.utils.async_logging import shutdown_logging
+
+    # Drain queued records, including every WARNING/ERROR, before the worker exits
+    shutdown_logging()
@@ -8,14 +8,20 @@ log_dir = "logs"
 log_filepath = os.path.join(log_dir,"running_logs.log")
 os.makedirs(log_dir, exist_ok=True)
 
+# Kept so utils.async_logging can move exactly these behind a queue
+log_handlers = [
+    logging.FileHandler(log_filepath, delay=True),
+    logging.StreamHandler(sys.stdout)
+]
+
 logging.basicConfig(
     level= logging.INFO,
     format= logging_str,
 
-    handlers=[
-        logging.FileHandler(log_filepath),
-        logging.StreamHandler(sys.stdout)
-    ]
+    handlers=log_handlers
 )
 
 logger = logging.getLogger("studentPerformanceLogger")
+
+# High-volume per-request lines; sampled via prediction.logging.sample_rates
+serving_logger = logging.getLogger("studentPerformanceLogger.serving")
@@ -1,35 +1,232 @@
 import os
+import glob
+import json
+import time
 import shutil
+import hashlib
 import zipfile
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from src.student_performance import logger
-from src.student_performance.utils.common import get_size
+from src.student_performance.utils.common import get_size, save_json, load_json
+from src.student_performance.utils.stage_cache import path_digest
+from src.student_performance.utils.columnar_store import (read_table, write_table, apply_schema, is_parquet,
+                                                          iter_table_chunks, PartitionedWriter, PARQUET_SUFFIXES)
+from src.student_performance.utils.incremental_store import IncrementalStore
+from src.student_performance.utils.stage_artifacts import publish
 from src.student_performance.entity.config_entity import DataIngestionConfig
 from pathlib import Path
-import pandas as pd
+
+SOURCE_SUFFIXES = (".xlsx", ".csv") + PARQUET_SUFFIXES
+
+
+def resolve_sources(source_URL) -> list:
+    """
+    Data files named by source_URL: a single file, every data file in a
+    directory, or the files matching a glob (e.g. data/schools/*.xlsx)
+
+    Returns:
+        list: Sorted paths; Excel lock files (~$...) and hidden files are skipped
+    """
+    source = str(source_URL)
+    path = Path(source)
+    if path.is_dir() and not is_parquet(path):
+        paths = list(path.iterdir())
+    elif any(char in source for char in "*?["):
+        paths = [Path(p) for p in glob.glob(source, recursive=True)]
+    else:
+        return [path]
+    return sorted(p for p in paths if p.suffix.lower() in SOURCE_SUFFIXES and not p.name.startswith(("~$", ".")))
+
+
+def source_sheets(path: Path) -> list:
+    """
+    (path, sheet) for every worksheet of an xlsx workbook, (path, None) for other files
+    """
+    if Path(path).suffix.lower() != ".xlsx":
+        return [(path, None)]
+    from openpyxl import load_workbook
+
+    try:
+        workbook = load_workbook(path, read_only=True)
+    except Exception:
+        # Unreadable workbook: let parsing report it like any other bad source
+        return [(path, None)]
+    try:
+        return [(path, sheet) for sheet in workbook.sheetnames]
+    finally:
+        workbook.close()
+
+
+def _label(path, sheet) -> str:
+    return f"{path}[{sheet}]" if sheet else str(path)
+
+
+def parse_source(path, sheet, dtypes: dict, part_path: Path) -> dict:
+    """
+    Parse one file or worksheet into a Parquet part; runs in a worker process
+
+    Errors are returned rather than raised, so one unreadable sheet is reported
+    without stopping the others.
+
+    Returns:
+        dict: Source label, status, rows, column dtypes, part path and seconds taken
+    """
+    start = time.perf_counter()
+    result = {"source": _label(path, sheet)}
+    try:
+        df = read_table(path, dtypes=dtypes, sheet=sheet)
+        if df.columns.empty:
+            result.update(status="empty", rows=0)
+        else:
+            write_table(df, part_path)
+            result.update(status="ok", rows=len(df), part=str(part_path),
+                          columns={column: str(dtype) for column, dtype in df.dtypes.items()})
+    except Exception as e:
+        result.update(status="failed", error=f"{type(e).__name__}: {str(e)}")
+    result["seconds"] = round(time.perf_counter() - start, 3)
+    return result
+
+
+NUMERIC_DTYPES = ("int64", "int32", "float64", "float32")
+
+
+def reconcile_columns(results: list, schema_columns: dict = None) -> dict:
+    """
+    Check every parsed source against the schema: it must have all of its
+    columns, and numeric schema columns must have parsed as numbers. Sources
+    that do not match are marked "inconsistent" in place, so one stray sheet
+    (e.g. a notes or metadata sheet) is rejected on its own. Columns the
+    schema does not list are dropped.
+
+    Without a schema every source is checked against the first one that
+    parsed instead, and must have exactly its columns, with dtypes of the same kind.
+
+    Args:
+        results (list): parse_source results
+        schema_columns (dict, optional): COLUMNS of schema.yaml: column -> dtype
+
+    Returns:
+        dict: Column -> dtype every accepted source is cast to; numeric columns
+            that are integer in some sources and float in others become float64
+    """
+    import numpy as np
+
+    def kind(dtype):
+        return "number" if dtype in NUMERIC_DTYPES else dtype
+
+    reference = None
+    reference_source = "the schema"
+    if schema_columns:
+        reference = {column: str(dtype) for column, dtype in schema_columns.items()}
+    dtypes = {}
+    for result in results:
+        if result["status"] != "ok":
+            continue
+        columns = result["columns"]
+        if reference is None:
+            reference, reference_source = columns, result["source"]
+        if schema_columns:
+            problems = sorted(set(reference) - set(columns))
+            problems += [column for column in reference if column in columns
+                         and reference[column] in NUMERIC_DTYPES and kind(columns[column]) != "number"]
+        else:
+            problems = sorted(set(reference) ^ set(columns))
+            problems += [column for column in reference
+                         if column in columns and kind(columns[column]) != kind(reference[column])]
+        if problems:
+            result.update(status="inconsistent", error=f"Columns differ from {reference_source}: {problems}")
+            continue
+        for column in reference:
+            dtype = columns[column]
+            if column not in dtypes:
+                dtypes[column] = dtype
+            elif dtype != dtypes[column]:
+                dtypes[column] = (str(np.result_type(dtype, dtypes[column]))
+                                  if kind(dtype) == kind(dtypes[column]) == "number" else "object")
+    return dtypes
+
 
 class DataIngestion:
     def __init__(self, config: DataIngestionConfig):
         self.config = config
+        # The single source file being ingested; source_URL unless it is a directory or glob
+        self.source_path = None
+
+    def local_copy_path(self) -> Path:
+        """
+        local_data_file with the suffix of the source, so a CSV or Parquet source
+        is still parsed as CSV or Parquet after being copied
+        """
+        local_data_file = Path(self.config.local_data_file)
+        suffix = Path(str(self.source_path or self.config.source_URL)).suffix
+        return local_data_file.with_suffix(suffix) if suffix else local_data_file
+
+    def store_settings(self) -> dict:
+        """
+        Settings that shape the data file besides the source itself: the schema
+        columns and dtypes, chunk_rows and the incremental mode
+        """
+        settings = {"column_dtypes": self.config.column_dtypes, "schema_columns": self.config.schema_columns,
+                    "chunk_rows": self.config.chunk_rows, "incremental": self.config.incremental}
+        # Round-trip through JSON so it compares equal to the copy in source_digest.json
+        return json.loads(json.dumps(settings))
+
+    def store_is_current(self, digest_path: Path, source_digest: str) -> bool:
+        """
+        Whether the data file was converted from this source digest with the current settings
+
+        When the settings changed, the incremental key index is dropped too, so
+        the store is rebuilt with the new dtypes rather than appended to.
+        """
+        data_file = Path(self.config.data_file)
+        if not digest_path.exists():
+            return False
+        recorded = load_json(digest_path)
+        if recorded.get("settings") != self.store_settings():
+            logger.info(f"Schema dtypes, chunk_rows or incremental settings changed since the last "
+                        f"conversion, rebuilding {data_file}")
+            if self.incremental and os.path.exists(self.config.incremental["index_file"]):
+                os.remove(self.config.incremental["index_file"])
+            return False
+        if self.incremental and not os.path.exists(self.config.incremental["index_file"]):
+            return False
+        return (data_file.exists() and recorded.get("sha256") == source_digest
+                and recorded.get("data_file") == str(data_file))
+
+    def record_conversion(self, digest_path: Path, source: str, source_digest: str):
+        """Write source_digest.json; only once the data file is in place"""
+        save_json(path=digest_path, data={"source": source, "sha256": source_digest,
+                                          "data_file": str(self.config.data_file),
+                                          "settings": self.store_settings()})
 
     def copy_local_file(self):
         """Copy local dataset file to artifacts directory"""
         try:
+            source_path = str(self.source_path or self.config.source_URL)
+            local_file = self.local_copy_path()
             # Ensure the target directory exists
-            os.makedirs(os.path.dirname(self.config.local_data_file), exist_ok=True)
+            os.makedirs(local_file.parent, exist_ok=True)
             
-            # Check if target file already exists
-            if not os.path.exists(self.config.local_data_file):
+            # Copy when the target is missing or differs from the source dataset
+            source_changed = (local_file.exists() and os.path.exists(source_path)
+                              and path_digest(source_path) != path_digest(local_file))
+            if not local_file.exists() or source_changed:
                 # Copy from local data folder to artifacts
-                source_path = self.config.source_URL  # Now points to local file
-                
-                if os.path.exists(source_path):
-                    shutil.copy2(source_path, self.config.local_data_file)
-                    logger.info(f"File copied from {source_path} to {self.config.local_data_file}")
-                    logger.info(f"File size: {get_size(Path(self.config.local_data_file))}")
+                if os.path.isdir(source_path):
+                    # A partitioned Parquet table
+                    shutil.rmtree(local_file, ignore_errors=True)
+                    shutil.copytree(source_path, local_file)
+                    logger.info(f"Directory copied from {source_path} to {local_file}")
+                elif os.path.exists(source_path):
+                    if local_file.is_dir():
+                        shutil.rmtree(local_file)
+                    shutil.copy2(source_path, local_file)
+                    logger.info(f"File copied from {source_path} to {local_file}")
+                    logger.info(f"File size: {get_size(local_file)}")
                 else:
                     raise FileNotFoundError(f"Source dataset file not found at: {source_path}")
             else:
-                logger.info(f"File already exists of size: {get_size(Path(self.config.local_data_file))}")
+                logger.info(f"Local copy {local_file} is up to date")
                 
         except Exception as e:
             logger.error(f"Error copying local file: {str(e)}")
@@ -43,38 +240,46 @@ class DataIngestion:
         """
         unzip_path = self.config.unzip_dir
         os.makedirs(unzip_path, exist_ok=True)
-        with zipfile.ZipFile(self.config.local_data_file, 'r') as zip_ref:
+        with zipfile.ZipFile(self.local_copy_path(), 'r') as zip_ref:
             zip_ref.extractall(unzip_path)
 
-    def initiate_data_ingestion(self):
+    def initiate_data_ingestion(self, artifacts=None):
         """
         This function initiates the data ingestion process
+
+        Args:
+            artifacts (StageArtifacts, optional): Hands the loaded data to the next stages
+                and writes the data file in the background
         """
         try:
             logger.info("Starting data ingestion process")
             
-            # Copy the local data file to artifacts directory
-            self.copy_local_file()
-            
-            # If it's a zip file, extract it
-            if Path(self.config.local_data_file).suffix == '.zip':
-                self.extract_zip_file()
-            
-            # Track the final data file path
-            final_data_file = str(self.config.local_data_file)
-            
-            # If it's an Excel file, convert to CSV for easier processing
-            if str(self.config.local_data_file).endswith('.xlsx'):
-                csv_file = self.convert_excel_to_csv()
-                final_data_file = csv_file
-                logger.info(f"Excel file converted to CSV: {csv_file}")
+            # Several files or worksheets are parsed in parallel straight from the source
+            sources = resolve_sources(self.config.source_URL)
+            sheets = [task for path in sources if path.exists() for task in source_sheets(path)]
+            if len(sheets) > 1:
+                df = self.convert_sources_to_store(sources, sheets, artifacts)
+            else:
+                # Copy the local data file to artifacts directory
+                self.source_path = sources[0] if sources else None
+                self.copy_local_file()
+                
+                # If it's a zip file, extract it
+                if self.local_copy_path().suffix == '.zip':
+                    self.extract_zip_file()
+                
+                # Convert the source into the typed columnar store the later stages read
+                df = self.convert_to_store(artifacts)
+            final_data_file = str(self.config.data_file)
             
-            # Validate the data file exists
-            if os.path.exists(final_data_file):
+            # Validate the data file exists; a handed-off frame may still be being written
+            if df is not None or os.path.exists(final_data_file):
                 logger.info("Data ingestion completed successfully")
                 
-                # Get and log data information using the final file path
-                self.get_data_info_from_file(final_data_file)
+                # Log data information from the frame already in memory; streamed
+                # ingestion logged a per-chunk summary instead
+                if df is not None:
+                    self.log_data_info(df)
                 
                 return final_data_file
             else:
@@ -84,48 +289,281 @@ class DataIngestion:
             logger.error(f"Error in data ingestion: {str(e)}")
             raise e
 
-    def convert_excel_to_csv(self):
+    def convert_to_store(self, artifacts=None):
         """
-        Convert Excel file to CSV for easier processing
+        Convert the ingested source (xlsx or csv) into the Parquet data file, typing the
+        columns from schema.yaml. The conversion is skipped while the source's sha256
+        and the store_settings match the ones recorded by the last conversion and
+        the data file still exists.
+
+        With chunk_rows set the source is streamed into a partitioned data file
+        instead of being loaded whole (see stream_to_store). In incremental mode
+        only its new and changed rows are appended to the data file (see
+        append_to_store).
+
+        Args:
+            artifacts (StageArtifacts, optional): Receives the frame as "data"; the data
+                file is then written in the background
+
+        Returns:
+            pd.DataFrame: The stored data, or None when streaming or appending
         """
         try:
-            if self.config.local_data_file.endswith('.xlsx'):
-                # Read Excel file
-                df = pd.read_excel(self.config.local_data_file)
-                
-                # Create CSV file path
-                csv_path = self.config.local_data_file.replace('.xlsx', '.csv')
-                
-                # Save as CSV
-                df.to_csv(csv_path, index=False)
-                logger.info(f"Converted Excel file to CSV: {csv_path}")
-                
-                # Return CSV path instead of modifying frozen dataclass
-                return csv_path
-            else:
-                return str(self.config.local_data_file)
-                
+            source_path = str(self.local_copy_path())
+            data_file = Path(self.config.data_file)
+            digest_path = Path(self.config.root_dir) / "source_digest.json"
+
+            source_digest = path_digest(source_path)
+            if self.store_is_current(digest_path, source_digest):
+                logger.info(f"Source unchanged since the last conversion, reusing {data_file}")
+                if self.incremental:
+                    publish(artifacts, "delta", self.unchanged_delta())
+                    return None
+                if self.config.chunk_rows:
+                    return None
+                return publish(artifacts, "data", read_table(data_file))
+
+            def record_source():
+                # Only once the data file is in place, so a crash cannot leave a digest without data
+                self.record_conversion(digest_path, source_path, source_digest)
+                logger.info(f"Converted {source_path} to {data_file} ({get_size(data_file)})")
+
+            if self.incremental:
+                publish(artifacts, "delta", self.append_to_store(source_path, data_file))
+                record_source()
+                return None
+
+            if self.config.chunk_rows:
+                self.stream_to_store(source_path, data_file)
+                record_source()
+                return None
+
+            df = read_table(source_path, dtypes=self.config.column_dtypes)
+            return publish(artifacts, "data", df, persist=lambda: (write_table(df, data_file), record_source()))
+
         except Exception as e:
-            logger.error(f"Error converting Excel to CSV: {str(e)}")
+            logger.error(f"Error converting source to the columnar store: {str(e)}")
             raise e
 
+    def convert_sources_to_store(self, sources, sheets, artifacts=None):
+        """
+        Parse every source file and worksheet in a process pool and concatenate
+        them into the data file (or append them, in incremental mode)
+
+        Sources whose columns do not match schema.yaml (see reconcile_columns),
+        and sources that fail to parse, are left out and reported in ingestion_report.json together
+        with the rows and seconds of every source. Nothing is done while the
+        sources' sha256 digests and the store_settings match the last conversion.
+
+        Args:
+            sources (list): Source files, from resolve_sources
+            sheets (list): (path, sheet) for every worksheet to ingest
+            artifacts (StageArtifacts, optional): Receives the delta in incremental mode
+
+        Returns:
+            None: The data is streamed to the data file, not held in memory
+
+        Raises:
+            ValueError: No source could be ingested
+        """
+        try:
+            data_file = Path(self.config.data_file)
+            digest_path = Path(self.config.root_dir) / "source_digest.json"
+            sha = hashlib.sha256()
+            for path in sources:
+                sha.update(f"{path}:{path_digest(path)}\n".encode())
+            source_digest = sha.hexdigest()
+            if self.store_is_current(digest_path, source_digest):
+                logger.info(f"Sources unchanged since the last conversion, reusing {data_file}")
+                if self.incremental:
+                    publish(artifacts, "delta", self.unchanged_delta())
+                return None
+
+            staging_dir = Path(self.config.root_dir) / f".sources.tmp.{os.getpid()}"
+            shutil.rmtree(staging_dir, ignore_errors=True)
+            os.makedirs(staging_dir)
+            try:
+                start = time.perf_counter()
+                results = self.parse_sources(sheets, staging_dir)
+                dtypes = reconcile_columns(results, self.config.schema_columns)
+                accepted = [result for result in results if result["status"] == "ok"]
+                if not accepted:
+                    raise ValueError(f"None of the {len(sheets)} sources matched by "
+                                     f"{self.config.source_URL} could be ingested")
+
+                columns = list(dtypes)
+                chunk_rows = self.config.chunk_rows or 100_000
+
+                def chunks():
+                    for result in accepted:
+                        for chunk in iter_table_chunks(result["part"], chunk_rows):
+                            yield apply_schema(chunk[columns], dtypes)
+
+                if self.incremental:
+                    publish(artifacts, "delta", self.append_to_store(None, data_file, chunks=chunks()))
+                else:
+                    with PartitionedWriter(data_file) as writer:
+                        for chunk in chunks():
+                            writer.write(chunk)
+
+                report = {
+                    "source_URL": str(self.config.source_URL),
+                    "rows": sum(result["rows"] for result in accepted),
+                    "seconds": round(time.perf_counter() - start, 3),
+                    "accepted": len(accepted),
+                    "rejected": len(results) - len(accepted),
+                    "sources": [{key: value for key, value in result.items() if key not in ("part", "columns")}
+                                for result in results],
+                }
+                save_json(path=Path(self.config.root_dir) / "ingestion_report.json", data=report)
+            finally:
+                shutil.rmtree(staging_dir, ignore_errors=True)
+
+            self.record_conversion(digest_path, str(self.config.source_URL), source_digest)
+            logger.info(f"Ingested {report['rows']} rows from {report['accepted']} of {len(results)} sources "
+                        f"into {data_file} in {report['seconds']}s")
+            return None
+
+        except Exception as e:
+            logger.error(f"Error converting sources to the columnar store: {str(e)}")
+            raise e
+
+    def parse_sources(self, sheets, staging_dir) -> list:
+        """
+        Parse each (path, sheet) into its own Parquet part in staging_dir, n_jobs
+        processes at a time
+
+        Returns:
+            list: parse_source results, in the order of sheets
+        """
+        n_jobs = self.config.n_jobs
+        workers = min(len(sheets), os.cpu_count() if n_jobs is None or n_jobs < 0 else n_jobs)
+        results = [None] * len(sheets)
+        with ProcessPoolExecutor(max_workers=max(workers, 1)) as pool:
+            futures = {pool.submit(parse_source, path, sheet, self.config.column_dtypes,
+                                   Path(staging_dir) / f"part-{i:05d}.parquet"): i
+                       for i, (path, sheet) in enumerate(sheets)}
+            for future in as_completed(futures):
+                i = futures[future]
+                try:
+                    result = future.result()
+                except Exception as e:
+                    # The worker process itself died, e.g. out of memory
+                    result = {"source": _label(*sheets[i]), "status": "failed",
+                              "error": f"{type(e).__name__}: {str(e)}", "seconds": None}
+                results[i] = result
+                if result["status"] == "failed":
+                    logger.warning(f"Could not parse {result['source']}: {result['error']}")
+                else:
+                    logger.info(f"Parsed {result['source']}: {result['rows']} rows in {result['seconds']}s")
+        return results
+
+    def stream_to_store(self, source_path, data_file):
+        """
+        Copy the source into a partitioned Parquet data file chunk_rows rows at a time,
+        so peak memory depends on the chunk size and not on the size of the source
+
+        Returns:
+            dict: Rows, parts and missing values per column
+        """
+        try:
+            missing = None
+            with PartitionedWriter(data_file) as writer:
+                for chunk in iter_table_chunks(source_path, self.config.chunk_rows,
+                                               dtypes=self.config.column_dtypes):
+                    writer.write(chunk)
+                    counts = chunk.isnull().sum()
+                    missing = counts if missing is None else missing.add(counts, fill_value=0)
+
+            summary = {"rows": writer.rows, "parts": writer.parts,
+                       "missing": {} if missing is None else missing[missing > 0].astype(int).to_dict()}
+            logger.info(f"Streamed {summary['rows']} rows into {summary['parts']} parts of {data_file}")
+            logger.info(f"Missing values: {summary['missing']}")
+            return summary
+
+        except Exception as e:
+            logger.error(f"Error streaming source to the columnar store: {str(e)}")
+            raise e
+
+    @property
+    def incremental(self) -> bool:
+        return bool(self.config.incremental and self.config.incremental.get("enabled"))
+
+    def append_to_store(self, source_path, data_file, chunks=None):
+        """
+        Append the source rows whose key is new, or whose values changed, to the
+        partitioned data file, and write just those rows to the delta file
+
+        The source still has to be read, but only the delta is written, hashed
+        against the key index and handed on, so the cost of a re-ingestion
+        follows what changed rather than the size of the data. Rows whose key
+        left the source are kept.
+
+        Args:
+            source_path: Source file
+            data_file (Path): The data file
+            chunks (iterable of pd.DataFrame, optional): The source already split into
+                chunks, instead of source_path
+
+        Returns:
+            dict: Counts of new, changed and unchanged rows, the store's size and the delta file
+        """
+        try:
+            incremental = self.config.incremental
+            store = IncrementalStore(data_file, incremental["index_file"], incremental["key_column"])
+            if chunks is None:
+                chunks = iter_table_chunks(source_path, self.config.chunk_rows or 100_000,
+                                           dtypes=self.config.column_dtypes)
+            summary = store.append(chunks, delta_path=incremental.get("delta_file"))
+            summary["delta_file"] = incremental.get("delta_file")
+            save_json(path=Path(self.config.root_dir) / "delta_summary.json", data=summary)
+            return summary
+
+        except Exception as e:
+            logger.error(f"Error appending source to the columnar store: {str(e)}")
+            raise e
+
+    def unchanged_delta(self):
+        """
+        Empty the delta file and rewrite delta_summary.json when the source did not
+        change, so neither is left over from the previous run
+
+        Returns:
+            dict: The delta summary, as append_to_store returns it
+        """
+        incremental = self.config.incremental
+        summary_path = Path(self.config.root_dir) / "delta_summary.json"
+        previous = load_json(summary_path) if summary_path.exists() else {}
+        # Every source row was new, changed or unchanged the last time around
+        source_rows = sum(previous.get(key, 0) for key in ("new", "changed", "unchanged"))
+        store = IncrementalStore(self.config.data_file, incremental["index_file"], incremental["key_column"])
+        summary = store.unchanged(source_rows, delta_path=incremental.get("delta_file"))
+        summary["delta_file"] = incremental.get("delta_file")
+        save_json(path=summary_path, data=summary)
+        logger.info(f"No new or changed rows; {incremental.get('delta_file')} is empty")
+        return summary
+
     def get_data_info(self):
         """
         Get basic information about the ingested data
         """
-        return self.get_data_info_from_file(str(self.config.local_data_file))
+        return self.get_data_info_from_file(str(self.local_copy_path()))
     
     def get_data_info_from_file(self, file_path):
         """
         Get basic information about the ingested data from a specific file path
         """
         try:
-            # Determine file type and read accordingly
-            if file_path.endswith('.xlsx'):
-                df = pd.read_excel(file_path)
-            else:
-                df = pd.read_csv(file_path)
-                
+            return self.log_data_info(read_table(file_path))
+        except Exception as e:
+            logger.error(f"Error getting data info: {str(e)}")
+            return None
+
+    def log_data_info(self, df):
+        """
+        Log shape, dtypes, missing values and category levels of the ingested data
+        """
+        try:
             logger.info(f"Data shape: {df.shape}")
             logger.info(f"Data columns: {list(df.columns)}")
             logger.info(f"Data types: \n{df.dtypes}")
@@ -133,7 +571,7 @@ class DataIngestion:
             logger.info(f"Data description: \n{df.describe()}")
             
             # Log categorical column unique values
-            categorical_cols = df.select_dtypes(include=['object']).columns
+            categorical_cols = df.select_dtypes(include=['object', 'category']).columns
             for col in categorical_cols:
                 unique_vals = df[col].unique()
                 logger.info(f"Unique values in {col}: {unique_vals}")
@@ -10,7 +10,11 @@ from sklearn.preprocessing import OneHotEncoder,StandardScaler
 from sklearn.model_selection import train_test_split
 
 from src.student_performance import logger
-from src.student_performance.utils.common import save_bin
+from src.student_performance.utils.common import save_bin, load_bin
+from src.student_performance.utils.columnar_store import (read_table, write_table, iter_table_chunks,
+                                                          PartitionedWriter, hash_split_mask)
+from src.student_performance.utils.stage_artifacts import publish
+from src.student_performance.utils.compiled_preprocessor import CompiledPreprocessor
 from src.student_performance.entity.config_entity import DataTransformationConfig
 
 @dataclass
@@ -87,51 +91,120 @@ class DataTransformation:
             logger.error(f"Error in get_data_transformer_object: {str(e)}")
             raise e
     
-    def initiate_data_transformation(self, train_path, test_path):
+    def split_features(self, df):
+        """
+        Split a train/test frame into model inputs and the math_score target
+        """
+        target_column_name = "math_score"
+        # Remove columns that shouldn't be used for prediction
+        columns_to_drop = ["id", "first_name", "last_name", "email"]
+        available_drop_cols = [col for col in columns_to_drop if col in df.columns]
+        if available_drop_cols:
+            df = df.drop(columns=available_drop_cols)
+
+        return df.drop(columns=[target_column_name]), df[target_column_name]
+
+    def split_paths(self):
+        """
+        Paths of the train and test sets in the columnar store
+        """
+        return (os.path.join(self.config.root_dir, "train.parquet"),
+                os.path.join(self.config.root_dir, "test.parquet"))
+
+    def hash_split_to_store(self, split: dict):
+        """
+        Split the data file into partitioned train and test tables chunk by chunk,
+        assigning every row by the hash of its key column (see hash_split_mask)
+
+        Args:
+            split (dict): test_size, key_column and seed
+
+        Returns:
+            tuple: train path, test path
+        """
         try:
-            train_df = pd.read_csv(train_path)
-            test_df = pd.read_csv(test_path)
+            train_path, test_path = self.split_paths()
+            with PartitionedWriter(train_path) as train_writer, PartitionedWriter(test_path) as test_writer:
+                for chunk in iter_table_chunks(self.config.data_path, self.config.chunk_rows or 100_000):
+                    is_test = hash_split_mask(chunk, split.get("test_size", 0.2),
+                                              key_column=split.get("key_column"), seed=split.get("seed", 42))
+                    train_writer.write(chunk[~is_test])
+                    test_writer.write(chunk[is_test])
 
-            logger.info("Read train and test data completed")
+            logger.info(f"Hash split {train_writer.rows + test_writer.rows} rows: "
+                        f"{train_writer.rows} train, {test_writer.rows} test")
+            return train_path, test_path
 
-            logger.info("Obtaining preprocessing object")
+        except Exception as e:
+            logger.error(f"Error in hash_split_to_store: {str(e)}")
+            raise e
 
-            preprocessing_obj = self.get_data_transformer_object()
+    def load_transformed_arrays(self):
+        """
+        Rebuild the train/test arrays from the saved split and the fitted preprocessor,
+        for when the transformation stage is skipped
 
-            target_column_name = "math_score"
-            # Remove columns that shouldn't be used for prediction
-            columns_to_drop = ["id", "first_name", "last_name", "email"]
-            
-            # Drop unnecessary columns from both train and test sets
-            available_drop_cols = [col for col in columns_to_drop if col in train_df.columns]
-            if available_drop_cols:
-                train_df = train_df.drop(columns=available_drop_cols, axis=1)
-                test_df = test_df.drop(columns=available_drop_cols, axis=1)
+        Returns:
+            tuple: train_arr, test_arr, preprocessor path
+        """
+        try:
+            preprocessing_obj = load_bin(self.config.preprocessor_obj_file_path)
+            arrays = []
+            for path in self.split_paths():
+                input_df, target = self.split_features(read_table(path))
+                arrays.append(np.c_[preprocessing_obj.transform(input_df), np.array(target)])
 
-            input_feature_train_df = train_df.drop(columns=[target_column_name], axis=1)
-            target_feature_train_df = train_df[target_column_name]
+            logger.info("Loaded transformed train and test arrays from saved artifacts")
+            return arrays[0], arrays[1], self.config.preprocessor_obj_file_path
+        except Exception as e:
+            logger.error(f"Error in load_transformed_arrays: {str(e)}")
+            raise e
 
-            input_feature_test_df = test_df.drop(columns=[target_column_name], axis=1)
-            target_feature_test_df = test_df[target_column_name]
+    def transform_frames(self, train_df, test_df):
+        """
+        Fit the preprocessor on the train set and transform both sets
 
-            logger.info(
-                f"Applying preprocessing object on training dataframe and testing dataframe."
-            )
+        Returns:
+            tuple: train_arr, test_arr, fitted preprocessor
+        """
+        logger.info("Obtaining preprocessing object")
 
-            input_feature_train_arr = preprocessing_obj.fit_transform(input_feature_train_df)
-            input_feature_test_arr = preprocessing_obj.transform(input_feature_test_df)
+        preprocessing_obj = self.get_data_transformer_object()
 
-            train_arr = np.c_[
-                input_feature_train_arr, np.array(target_feature_train_df)
-            ]
-            test_arr = np.c_[input_feature_test_arr, np.array(target_feature_test_df)]
+        input_feature_train_df, target_feature_train_df = self.split_features(train_df)
+        input_feature_test_df, target_feature_test_df = self.split_features(test_df)
 
-            logger.info(f"Saved preprocessing object.")
+        logger.info(
+            f"Applying preprocessing object on training dataframe and testing dataframe."
+        )
 
-            save_bin(
-                preprocessing_obj,
-                self.config.preprocessor_obj_file_path,
-            )
+        input_feature_train_arr = preprocessing_obj.fit_transform(input_feature_train_df)
+        input_feature_test_arr = preprocessing_obj.transform(input_feature_test_df)
+
+        # The serving fast path compiles this preprocessor; check it agrees with sklearn on a sample of rows
+        compiled = CompiledPreprocessor.from_column_transformer(preprocessing_obj)
+        compiled.verify(preprocessing_obj, input_feature_train_df)
+
+        train_arr = np.c_[
+            input_feature_train_arr, np.array(target_feature_train_df)
+        ]
+        test_arr = np.c_[input_feature_test_arr, np.array(target_feature_test_df)]
+
+        return train_arr, test_arr, preprocessing_obj
+
+    def initiate_data_transformation(self, train_path, test_path, artifacts=None):
+        try:
+            train_df = read_table(train_path)
+            test_df = read_table(test_path)
+
+            logger.info("Read train and test data completed")
+
+            train_arr, test_arr, preprocessing_obj = self.transform_frames(train_df, test_df)
+
+            publish(artifacts, "test_df", test_df)
+            publish(artifacts, "preprocessor", preprocessing_obj,
+                    persist=lambda: save_bin(preprocessing_obj, self.config.preprocessor_obj_file_path))
+            logger.info(f"Saved preprocessing object.")
 
             return (
                 train_arr,
@@ -142,34 +215,59 @@ class DataTransformation:
             logger.error(f"Error in initiate_data_transformation: {str(e)}")
             raise e
 
-    def initiate_data_transformation_from_config(self):
+    def initiate_data_transformation_from_config(self, df=None, artifacts=None):
         """
         Transform data using the configuration
+
+        Args:
+            df (pd.DataFrame, optional): The ingested data when the ingestion stage ran in
+                this process; read from data_path otherwise
+            artifacts (StageArtifacts, optional): Receives the split frames and fitted
+                preprocessor; their files are then written in the background
+
+        Returns:
+            tuple: train_arr, test_arr, preprocessor path
         """
         try:
-            # Read the raw data
-            df = pd.read_csv(self.config.data_path)
-            logger.info("Read data completed")
+            split = self.config.split or {}
+            train_path, test_path = self.split_paths()
+            if df is None and split.get("method", "random") == "hash":
+                # Out of core: stream the data file into partitioned train/test tables
+                self.hash_split_to_store(split)
+                logger.info("Train test split completed")
+                train_arr, test_arr, preprocessor_path = self.initiate_data_transformation(
+                    train_path, test_path, artifacts)
+                logger.info("Data transformation completed")
+                return train_arr, test_arr, preprocessor_path
+
+            if df is None:
+                # Read the raw data
+                df = read_table(self.config.data_path)
+                logger.info("Read data completed")
             logger.info(f"Data shape: {df.shape}")
 
             # Split the data
-            train_set, test_set = train_test_split(df, test_size=0.2, random_state=42)
-            
+            if split.get("method", "random") == "hash":
+                is_test = hash_split_mask(df, split.get("test_size", 0.2),
+                                          key_column=split.get("key_column"), seed=split.get("seed", 42))
+                train_set, test_set = df[~is_test], df[is_test]
+            else:
+                train_set, test_set = train_test_split(df, test_size=split.get("test_size", 0.2),
+                                                       random_state=split.get("seed", 42))
+
             # Save train and test sets
-            train_path = os.path.join(self.config.root_dir, "train.csv")
-            test_path = os.path.join(self.config.root_dir, "test.csv")
-            
-            train_set.to_csv(train_path, index=False, header=True)
-            test_set.to_csv(test_path, index=False, header=True)
-            
+            publish(artifacts, "train_df", train_set, persist=lambda: write_table(train_set, train_path))
+            publish(artifacts, "test_df", test_set, persist=lambda: write_table(test_set, test_path))
             logger.info("Train test split completed")
 
             # Apply transformation
-            train_arr, test_arr, preprocessor_path = self.initiate_data_transformation(train_path, test_path)
+            train_arr, test_arr, preprocessing_obj = self.transform_frames(train_set, test_set)
+            publish(artifacts, "preprocessor", preprocessing_obj,
+                    persist=lambda: save_bin(preprocessing_obj, self.config.preprocessor_obj_file_path))
             
             logger.info("Data transformation completed")
             
-            return train_arr, test_arr, preprocessor_path
+            return train_arr, test_arr, self.config.preprocessor_obj_file_path
             
         except Exception as e:
             logger.error(f"Error in initiate_data_transformation_from_config: {str(e)}")
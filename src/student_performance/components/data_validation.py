@@ -0,0 +1,199 @@
+import os
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from src.student_performance import logger
+from src.student_performance.utils.common import save_json
+from src.student_performance.utils.columnar_store import iter_table_chunks, iter_frame_chunks, table_columns
+from src.student_performance.entity.config_entity import DataValidationConfig
+
+MAX_EXAMPLES = 5
+
+
+def _not_null(series) -> np.ndarray:
+    return series.notna().to_numpy()
+
+
+def dtype_violations(series, expected: str) -> np.ndarray:
+    """
+    Rows whose value cannot be read as the schema dtype; missing values never violate
+    """
+    if expected == "object":
+        if pd.api.types.is_numeric_dtype(series) and not pd.api.types.is_bool_dtype(series):
+            return _not_null(series)
+        return np.zeros(len(series), dtype=bool)
+
+    if pd.api.types.is_integer_dtype(series) or (expected.startswith("float") and pd.api.types.is_float_dtype(series)):
+        return np.zeros(len(series), dtype=bool)
+    values = pd.to_numeric(series.astype(object) if isinstance(series.dtype, pd.CategoricalDtype) else series,
+                           errors="coerce").to_numpy(dtype=float)
+    bad = np.isnan(values)
+    if expected.startswith("int"):
+        bad |= np.mod(values, 1) != 0
+    return bad & _not_null(series)
+
+
+def domain_violations(series, allowed: list) -> np.ndarray:
+    """
+    Rows whose value is outside the allowed levels, checked on categorical codes:
+    a categorical column is checked once per level rather than once per row
+    """
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        categories = series.cat.categories
+        if len(categories) == 0:
+            return np.zeros(len(series), dtype=bool)
+        level_ok = categories.isin(allowed)
+        codes = series.cat.codes.to_numpy()
+        return (codes >= 0) & ~level_ok[codes]
+    codes = pd.Categorical(series, categories=allowed).codes
+    return (codes == -1) & _not_null(series)
+
+
+def range_violations(series, low, high) -> np.ndarray:
+    """
+    Rows outside the inclusive [low, high] bounds, or not numeric at all
+    """
+    values = pd.to_numeric(series.astype(object) if isinstance(series.dtype, pd.CategoricalDtype) else series,
+                           errors="coerce").to_numpy(dtype=float)
+    with np.errstate(invalid="ignore"):
+        inside = (values >= low) & (values <= high)
+    return ~inside & _not_null(series)
+
+
+def compile_checks(columns: dict, domain_values: dict = None, validation_rules: dict = None) -> list:
+    """
+    Compile schema.yaml into column checks
+
+    Args:
+        columns (dict): COLUMNS: column -> dtype
+        domain_values (dict, optional): DOMAIN_VALUE: column -> allowed levels
+        validation_rules (dict, optional): VALIDATION_RULES: rule -> {columns, min, max}
+
+    Returns:
+        list: (rule name, column, function of a Series returning a boolean violation mask)
+    """
+    checks = [(f"dtype:{column}", column, lambda s, dtype=str(dtype): dtype_violations(s, dtype))
+              for column, dtype in columns.items()]
+    for column, allowed in (domain_values or {}).items():
+        allowed = [str(value) for value in allowed]
+        checks.append((f"domain:{column}", column, lambda s, allowed=allowed: domain_violations(s, allowed)))
+    for rule, spec in (validation_rules or {}).items():
+        for column in spec.get("columns", []):
+            checks.append((f"{rule}:{column}", column,
+                           lambda s, low=spec["min"], high=spec["max"]: range_violations(s, low, high)))
+    return checks
+
+
+def scan_chunks(chunks, checks: list):
+    """
+    Run the compiled checks over every chunk, keeping only counters and a few
+    example values between chunks
+
+    Returns:
+        tuple: (rows, per-rule report, missing values per column)
+    """
+    report = {name: {"column": column, "violations": 0, "examples": []} for name, column, _ in checks}
+    missing_values = {}
+    rows = 0
+    for chunk in chunks:
+        rows += len(chunk)
+
+        for name, column, check in checks:
+            if column not in chunk.columns:
+                continue
+            series = chunk[column]
+            bad = check(series)
+            count = int(bad.sum())
+            if count:
+                entry = report[name]
+                entry["violations"] += count
+                if len(entry["examples"]) < MAX_EXAMPLES:
+                    new = [str(v) for v in pd.unique(series[bad].astype(object)) if str(v) not in entry["examples"]]
+                    entry["examples"] += new[:MAX_EXAMPLES - len(entry["examples"])]
+
+        for column, count in chunk.isnull().sum().items():
+            if count:
+                missing_values[column] = missing_values.get(column, 0) + int(count)
+    return rows, report, missing_values
+
+
+class DataValidation:
+    def __init__(self, config: DataValidationConfig):
+        self.config = config
+
+    def validate_all_columns(self, df=None, delta=None) -> bool:
+        """
+        Check the data file against schema.yaml chunk by chunk and write the status
+        file and a per-rule violation report
+
+        Every check is a vectorized mask over a whole chunk, and only counters and
+        a few example values are kept between chunks, so memory is constant in
+        the number of rows.
+
+        Args:
+            df (pd.DataFrame, optional): The data, when ingestion already holds it in
+                memory; read from the data file otherwise
+            delta (dict, optional): Summary of an incremental ingestion, as handed
+                over under "delta"; the rows it added are also reported on their
+                own, under "delta" in the report
+
+        Returns:
+            bool: True when there are rows, every column is present and no rule is violated
+        """
+        try:
+            checks = compile_checks(self.config.all_schema, self.config.domain_values, self.config.validation_rules)
+            columns = df.columns if df is not None else table_columns(self.config.unzip_data_dir)
+            missing_columns = [column for column in self.config.all_schema if column not in columns]
+
+            start = time.perf_counter()
+            chunk_rows = self.config.chunk_rows or 100_000
+            chunks = (iter_frame_chunks(df, chunk_rows) if df is not None
+                      else iter_table_chunks(self.config.unzip_data_dir, chunk_rows))
+            rows, report, missing_values = scan_chunks(chunks, checks)
+            seconds = time.perf_counter() - start
+
+            violated = {name: entry for name, entry in report.items() if entry["violations"]}
+            status = rows > 0 and not missing_columns and not violated
+            summary = {
+                "status": status,
+                "rows": rows,
+                "seconds": round(seconds, 3),
+                "rows_per_second": round(rows / seconds) if seconds else None,
+                "missing_columns": missing_columns,
+                "missing_values": missing_values,
+                "violations": violated,
+                "rules_checked": len(checks),
+            }
+            if delta and delta.get("delta_file"):
+                # The status still covers the whole table; this shows what the last ingestion added
+                delta_rows, delta_report, _ = scan_chunks(iter_table_chunks(delta["delta_file"], chunk_rows), checks)
+                summary["delta"] = {
+                    "rows": delta_rows,
+                    "violations": {name: entry for name, entry in delta_report.items() if entry["violations"]},
+                }
+                logger.info(f"Validated the {delta_rows} rows added by the last ingestion: "
+                            f"{len(summary['delta']['violations'])} rules violated")
+
+            os.makedirs(os.path.dirname(self.config.STATUS_FILE), exist_ok=True)
+            with open(self.config.STATUS_FILE, "w") as f:
+                f.write(f"Validation status: {status}\n")
+            if self.config.report_file:
+                save_json(path=Path(self.config.report_file), data=summary)
+
+            logger.info(f"Validated {rows} rows against {len(checks)} rules in {seconds:.2f}s "
+                        f"({summary['rows_per_second']} rows/s): status {status}")
+            if not rows:
+                logger.warning("The data has no rows")
+            if missing_columns:
+                logger.warning(f"Columns missing from the data: {missing_columns}")
+            for name, entry in violated.items():
+                logger.warning(f"Rule {name} violated by {entry['violations']} rows, e.g. {entry['examples']}")
+
+            return status
+
+        except Exception as e:
+            logger.error(f"Error in validate_all_columns: {str(e)}")
+            raise e
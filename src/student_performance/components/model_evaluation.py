@@ -4,12 +4,10 @@ import numpy as np
 from pathlib import Path
 from sklearn.metrics import mean_squared_error, mean_absolute_error, r2_score
 from urllib.parse import urlparse
-import mlflow
-import mlflow.sklearn
-import joblib
 
 from src.student_performance import logger
 from src.student_performance.utils.common import save_json, load_json, load_bin
+from src.student_performance.utils.columnar_store import read_table
 from src.student_performance.entity.config_entity import ModelEvaluationConfig
 
 class ModelEvaluation:
@@ -25,30 +23,54 @@ class ModelEvaluation:
         r2 = r2_score(actual, pred)
         return rmse, mae, r2
 
-    def log_into_mlflow(self):
+    def prepare_test_data(self, test_data=None, model=None, preprocessor=None):
         """
-        Log model metrics and artifacts into MLflow
+        Load whatever the previous stages did not hand over and transform the test set
+
+        Args:
+            test_data (pd.DataFrame, optional): Raw test set; read from test_data_path otherwise
+            model (optional): Fitted model; loaded from model_path otherwise
+            preprocessor (optional): Fitted preprocessor; loaded from disk otherwise
+
+        Returns:
+            tuple: model, transformed test inputs, test target frame
         """
-        try:
-            test_data = pd.read_csv(self.config.test_data_path)
-            model = joblib.load(self.config.model_path)
-            
+        if test_data is None:
+            test_data = read_table(self.config.test_data_path)
+        if model is None:
+            model = load_bin(self.config.model_path)
+        if preprocessor is None:
             # Load the preprocessor
             preprocessor_path = "artifacts/data_transformation/preprocessor.pkl"
             preprocessor = load_bin(preprocessor_path)
 
-            # Prepare test data
-            test_x = test_data.drop([self.config.target_column], axis=1)
-            test_y = test_data[[self.config.target_column]]
-            
-            # Remove columns that shouldn't be used for prediction
-            columns_to_drop = ["id", "first_name", "last_name", "email"]
-            available_drop_cols = [col for col in columns_to_drop if col in test_x.columns]
-            if available_drop_cols:
-                test_x = test_x.drop(columns=available_drop_cols, axis=1)
-            
-            # Apply preprocessing
-            test_x_processed = preprocessor.transform(test_x)
+        # Prepare test data
+        test_x = test_data.drop(columns=[self.config.target_column])
+        test_y = test_data[[self.config.target_column]]
+        
+        # Remove columns that shouldn't be used for prediction
+        columns_to_drop = ["id", "first_name", "last_name", "email"]
+        available_drop_cols = [col for col in columns_to_drop if col in test_x.columns]
+        if available_drop_cols:
+            test_x = test_x.drop(columns=available_drop_cols)
+        
+        # Apply preprocessing
+        test_x_processed = preprocessor.transform(test_x)
+
+        return model, test_x_processed, test_y
+
+    def log_into_mlflow(self, test_data=None, model=None, preprocessor=None):
+        """
+        Log model metrics and artifacts into MLflow
+
+        Args:
+            test_data, model, preprocessor: Objects handed over by earlier stages, see prepare_test_data
+        """
+        try:
+            import mlflow
+            import mlflow.sklearn
+
+            model, test_x_processed, test_y = self.prepare_test_data(test_data, model, preprocessor)
 
             mlflow.set_registry_uri(self.config.mlflow_uri)
             tracking_url_type_store = urlparse(mlflow.get_tracking_uri()).scheme
@@ -79,31 +101,15 @@ class ModelEvaluation:
             logger.error(f"Error in MLflow logging: {str(e)}")
             raise e
 
-    def evaluate_model(self):
+    def evaluate_model(self, test_data=None, model=None, preprocessor=None):
         """
         Evaluate model performance and save metrics
+
+        Args:
+            test_data, model, preprocessor: Objects handed over by earlier stages, see prepare_test_data
         """
         try:
-            # Load test data and model
-            test_data = pd.read_csv(self.config.test_data_path)
-            model = load_bin(self.config.model_path)
-            
-            # Load the preprocessor
-            preprocessor_path = "artifacts/data_transformation/preprocessor.pkl"
-            preprocessor = load_bin(preprocessor_path)
-
-            # Prepare test data
-            test_x = test_data.drop([self.config.target_column], axis=1)
-            test_y = test_data[[self.config.target_column]]
-            
-            # Remove columns that shouldn't be used for prediction
-            columns_to_drop = ["id", "first_name", "last_name", "email"]
-            available_drop_cols = [col for col in columns_to_drop if col in test_x.columns]
-            if available_drop_cols:
-                test_x = test_x.drop(columns=available_drop_cols, axis=1)
-            
-            # Apply preprocessing
-            test_x_processed = preprocessor.transform(test_x)
+            model, test_x_processed, test_y = self.prepare_test_data(test_data, model, preprocessor)
 
             # Make predictions
             predicted_qualities = model.predict(test_x_processed)
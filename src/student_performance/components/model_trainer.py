@@ -1,6 +1,7 @@
 import os
 import sys
 from dataclasses import dataclass
+from pathlib import Path
 
 import numpy as np
 import pandas as pd
@@ -13,12 +14,12 @@ from sklearn.linear_model import LinearRegression
 from sklearn.metrics import r2_score
 from sklearn.neighbors import KNeighborsRegressor
 from sklearn.tree import DecisionTreeRegressor
-from xgboost import XGBRegressor
-from catboost import CatBoostRegressor
 from sklearn.ensemble import RandomForestRegressor
 
 from src.student_performance import logger
-from src.student_performance.utils.common import save_bin, evaluate_models
+from src.student_performance.utils.common import save_bin, save_json, evaluate_models
+from src.student_performance.utils.model_search import SuccessiveHalvingSearch
+from src.student_performance.utils.tree_engine import export_tree_ensemble, verify_tree_ensemble
 from src.student_performance.entity.config_entity import ModelTrainerConfig
 
 class ModelTrainer:
@@ -35,13 +36,17 @@ class ModelTrainer:
                 test_array[:, -1]
             )
             
+            # Boosting libraries are only imported when training actually runs
+            from xgboost import XGBRegressor
+            from catboost import CatBoostRegressor
+
             models = {
                 "Random Forest": RandomForestRegressor(),
                 "Decision Tree": DecisionTreeRegressor(),
                 "Gradient Boosting": GradientBoostingRegressor(),
                 "Linear Regression": LinearRegression(),
                 "XGBRegressor": XGBRegressor(),
-                "CatBoosting Regressor": CatBoostRegressor(verbose=False),
+                "CatBoosting Regressor": CatBoostRegressor(verbose=False, allow_writing_files=False),
                 "AdaBoost Regressor": AdaBoostRegressor(),
             }
             
@@ -73,8 +78,7 @@ class ModelTrainer:
                 }
             }
 
-            model_report: dict = evaluate_models(X_train=X_train, y_train=y_train, X_test=X_test, y_test=y_test,
-                                                 models=models, param=params)
+            model_report: dict = self.search_models(X_train, y_train, X_test, y_test, models, params)
 
             # Log all model scores for debugging
             logger.info("Model performance report:")
@@ -89,6 +93,8 @@ class ModelTrainer:
                 list(model_report.values()).index(best_model_score)
             ]
             best_model = models[best_model_name]
+            # Kept for the evaluation stage when it runs in the same process
+            self.best_model = best_model
 
             logger.info(f"Expected accuracy threshold: {self.config.expected_accuracy}")
             logger.info(f"Best model score achieved: {best_model_score}")
@@ -105,6 +111,7 @@ class ModelTrainer:
             # Save the best model
             model_path = os.path.join(self.config.root_dir, self.config.model_name)
             save_bin(best_model, model_path)
+            self.export_tree_engine(best_model, X_test)
 
             predicted = best_model.predict(X_test)
             r2_square = r2_score(y_test, predicted)
@@ -117,6 +124,63 @@ class ModelTrainer:
             logger.error(f"Error in model training: {str(e)}")
             raise e
 
+    def search_models(self, X_train, y_train, X_test, y_test, models, params) -> dict:
+        """
+        Tune every candidate with the configured search strategy; the fitted
+        winners are stored back into models and the per-model search stats are
+        written to search_report.json
+
+        Returns:
+            dict: Test R2 per model
+        """
+        report_path = Path(self.config.root_dir) / "search_report.json"
+        if self.config.search_strategy == "grid":
+            model_report = evaluate_models(X_train=X_train, y_train=y_train, X_test=X_test, y_test=y_test,
+                                           models=models, param=params, n_jobs=self.config.n_jobs)
+            # The grid search keeps no per-trial stats; the report still exists for DVC
+            save_json(report_path, {name: {"strategy": "grid", "test_score": score}
+                                    for name, score in model_report.items()})
+            return model_report
+        if self.config.search_strategy != "halving":
+            raise ValueError(f"Unknown search strategy: {self.config.search_strategy}")
+
+        tuning = self.config.model_config.hyperparameter_tuning
+        early_stopping = self.config.early_stopping
+        search = SuccessiveHalvingSearch(
+            cv_folds=tuning.cv_folds,
+            n_trials=tuning.n_trials,
+            timeout=tuning.timeout,
+            n_jobs=self.config.n_jobs,
+            random_state=self.config.model_config.model_evaluation.random_state,
+            early_stopping={
+                "validation_fraction": early_stopping["validation_fraction"],
+                "patience": early_stopping["patience"]
+            } if early_stopping and early_stopping["enabled"] else None
+        )
+        model_report, search_stats = search.run(X_train, y_train, X_test, y_test, models, params)
+        save_json(report_path, search_stats)
+        return model_report
+
+    def export_tree_engine(self, model, X_check):
+        """
+        Save a NumPy-only copy of a tree ensemble next to the model, verified on X_check.
+        Point prediction.model_path at it to serve without xgboost/catboost.
+
+        For a model that is not a tree ensemble the file holds None, so it always
+        exists for DVC and never holds an engine for a previous, different model.
+        """
+        engine_path = os.path.join(self.config.root_dir, "tree_model.pkl")
+        try:
+            engine = export_tree_ensemble(model)
+            verify_tree_ensemble(engine, model, X_check)
+        except ValueError as e:
+            logger.info(f"Tree engine export skipped: {str(e)}")
+            save_bin(None, engine_path)
+            return None
+
+        save_bin(engine, engine_path)
+        return engine_path
+
     def train_models_with_mlflow(self, train_array, test_array):
         """
         Train models with MLflow tracking
@@ -135,13 +199,17 @@ class ModelTrainer:
                 test_array[:, -1]
             )
             
+            # Boosting libraries are only imported when training actually runs
+            from xgboost import XGBRegressor
+            from catboost import CatBoostRegressor
+
             models = {
                 "Random Forest": RandomForestRegressor(),
                 "Decision Tree": DecisionTreeRegressor(),
                 "Gradient Boosting": GradientBoostingRegressor(),
                 "Linear Regression": LinearRegression(),
                 "XGBRegressor": XGBRegressor(),
-                "CatBoosting Regressor": CatBoostRegressor(verbose=False),
+                "CatBoosting Regressor": CatBoostRegressor(verbose=False, allow_writing_files=False),
                 "AdaBoost Regressor": AdaBoostRegressor(),
             }
             
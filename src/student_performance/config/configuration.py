@@ -1,10 +1,13 @@
 from src.student_performance.constants import *
 from src.student_performance.utils.common import read_yaml, create_directories
+from src.student_performance.utils.columnar_store import schema_dtypes
 from src.student_performance.entity.config_entity import (DataIngestionConfig,
                                                       DataValidationConfig,
                                                       DataTransformationConfig,
                                                       ModelTrainerConfig,
-                                                      ModelEvaluationConfig)
+                                                      ModelEvaluationConfig,
+                                                      PredictionConfig,
+                                                      StageCacheConfig)
 
 class ConfigurationManager:
     def __init__(
@@ -28,7 +31,13 @@ class ConfigurationManager:
             root_dir=config.root_dir,
             source_URL=config.source_URL,
             local_data_file=config.local_data_file,
-            unzip_dir=config.unzip_dir 
+            unzip_dir=config.unzip_dir,
+            data_file=config.data_file,
+            column_dtypes=schema_dtypes(self.schema),
+            chunk_rows=config.chunk_rows,
+            incremental=config.get("incremental"),
+            n_jobs=config.get("n_jobs"),
+            schema_columns=dict(self.schema.COLUMNS)
         )
 
         return data_ingestion_config
@@ -44,6 +53,10 @@ class ConfigurationManager:
             STATUS_FILE=config.STATUS_FILE,
             unzip_data_dir = config.unzip_data_dir,
             all_schema=schema,
+            domain_values=self.schema.DOMAIN_VALUE,
+            validation_rules=self.schema.VALIDATION_RULES,
+            report_file=config.report_file,
+            chunk_rows=config.chunk_rows,
         )
 
         return data_validation_config
@@ -56,7 +69,9 @@ class ConfigurationManager:
         data_transformation_config = DataTransformationConfig(
             root_dir=config.root_dir,
             data_path=config.data_path,
-            preprocessor_obj_file_path=config.preprocessor_obj_file_path
+            preprocessor_obj_file_path=config.preprocessor_obj_file_path,
+            chunk_rows=config.chunk_rows,
+            split=config.split
         )
 
         return data_transformation_config
@@ -75,7 +90,10 @@ class ConfigurationManager:
             model_name = config.model_name,
             target_column = schema.name,
             expected_accuracy = params.model_evaluation.expected_accuracy,
-            model_config = params
+            model_config = params,
+            n_jobs = config.n_jobs,
+            search_strategy = config.search_strategy,
+            early_stopping = config.early_stopping
         )
 
         return model_trainer_config
@@ -98,3 +116,30 @@ class ConfigurationManager:
         )
 
         return model_evaluation_config
+
+    def get_stage_cache_config(self) -> StageCacheConfig:
+        config = self.config.stage_cache
+
+        create_directories([config.root_dir])
+
+        stage_cache_config = StageCacheConfig(
+            root_dir=config.root_dir
+        )
+
+        return stage_cache_config
+
+    def get_prediction_config(self) -> PredictionConfig:
+        config = self.config.prediction
+
+        prediction_config = PredictionConfig(
+            model_path=config.model_path,
+            preprocessor_path=config.preprocessor_path,
+            mmap_mode=config.mmap_mode,
+            max_batch_size=config.max_batch_size,
+            micro_batching=config.micro_batching,
+            cache=config.cache,
+            warmup=config.warmup,
+            logging=config.logging
+        )
+
+        return prediction_config
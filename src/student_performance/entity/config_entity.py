@@ -7,6 +7,12 @@ class DataIngestionConfig:
     source_URL: str
     local_data_file: Path
     unzip_dir: Path
+    data_file: Path = None
+    column_dtypes: dict = None
+    chunk_rows: int = None
+    incremental: dict = None
+    n_jobs: int = None
+    schema_columns: dict = None
 
 @dataclass(frozen=True)
 class DataValidationConfig:
@@ -14,12 +20,22 @@ class DataValidationConfig:
     STATUS_FILE: str
     unzip_data_dir: Path
     all_schema: dict
+    domain_values: dict = None
+    validation_rules: dict = None
+    report_file: Path = None
+    chunk_rows: int = None
 
 @dataclass(frozen=True)
 class DataTransformationConfig:
     root_dir: Path
     data_path: Path
     preprocessor_obj_file_path: Path
+    chunk_rows: int = None
+    split: dict = None
+
+@dataclass(frozen=True)
+class StageCacheConfig:
+    root_dir: Path
 
 @dataclass(frozen=True)
 class ModelTrainerConfig:
@@ -30,6 +46,9 @@ class ModelTrainerConfig:
     target_column: str
     expected_accuracy: float
     model_config: dict
+    n_jobs: int = None
+    search_strategy: str = "halving"
+    early_stopping: dict = None
 
 @dataclass(frozen=True)
 class ModelEvaluationConfig:
@@ -40,3 +59,14 @@ class ModelEvaluationConfig:
     metric_file_name: Path
     target_column: str
     mlflow_uri: str
+
+@dataclass(frozen=True)
+class PredictionConfig:
+    model_path: Path
+    preprocessor_path: Path
+    mmap_mode: str
+    max_batch_size: int
+    micro_batching: dict
+    cache: dict
+    warmup: dict
+    logging: dict
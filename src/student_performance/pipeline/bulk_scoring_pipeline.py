@@ -0,0 +1,194 @@
+import os
+import csv
+import json
+import time
+import argparse
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from src.student_performance import logger
+from src.student_performance.config.configuration import ConfigurationManager
+from src.student_performance.entity.config_entity import PredictionConfig
+from src.student_performance.pipeline.prediction_pipeline import PredictPipeline
+
+# One pipeline per worker process, created by the pool initializer
+_worker_pipeline = None
+
+
+def _init_worker(config: PredictionConfig):
+    global _worker_pipeline
+    _worker_pipeline = PredictPipeline(config=config)
+    _worker_pipeline.load_artifacts()
+
+
+class MalformedLine:
+    """
+    Stands in for a JSONL line that is not valid JSON, so it is reported as
+    an error row like any other invalid record instead of aborting the run
+    """
+    def __init__(self, line_number: int, error: str):
+        self.line_number = line_number
+        self.error = error
+
+    def __str__(self):
+        return f"Malformed JSON on line {self.line_number}: {self.error}"
+
+
+def _score_chunk(start, rows):
+    results = _worker_pipeline.predict_batch(rows)
+    for result, row in zip(results, rows):
+        result["index"] += start
+        if isinstance(row, MalformedLine):
+            result["error"] = str(row)
+    return results
+
+
+def read_chunks(path: Path, chunk_size: int):
+    """
+    Yield lists of raw records from a CSV, JSONL or Parquet file, chunk_size rows at a time
+    """
+    suffix = Path(path).suffix.lower()
+
+    if suffix == ".csv":
+        import pandas as pd
+        for frame in pd.read_csv(path, chunksize=chunk_size, dtype=str, keep_default_na=False):
+            yield frame.to_dict("records")
+
+    elif suffix in (".jsonl", ".ndjson"):
+        with open(path) as f:
+            chunk = []
+            for line_number, line in enumerate(f, start=1):
+                if line.strip():
+                    try:
+                        chunk.append(json.loads(line))
+                    except json.JSONDecodeError as e:
+                        chunk.append(MalformedLine(line_number, str(e)))
+                if len(chunk) == chunk_size:
+                    yield chunk
+                    chunk = []
+            if chunk:
+                yield chunk
+
+    elif suffix == ".parquet":
+        import pyarrow.parquet as pq
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=chunk_size):
+            yield batch.to_pylist()
+
+    else:
+        raise ValueError(f"Unsupported input format: {suffix}")
+
+
+class PredictionWriter:
+    """
+    Append predictions to a CSV or JSONL file as chunks complete
+    """
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.suffix = self.path.suffix.lower()
+        if self.suffix not in (".csv", ".jsonl", ".ndjson"):
+            raise ValueError(f"Unsupported output format: {self.suffix}")
+
+        os.makedirs(self.path.parent, exist_ok=True)
+        self._file = open(self.path, "w", newline="")
+        if self.suffix == ".csv":
+            self._csv = csv.writer(self._file)
+            self._csv.writerow(["index", "prediction", "error"])
+
+    def write(self, results):
+        for result in results:
+            if self.suffix == ".csv":
+                self._csv.writerow([result["index"], result.get("prediction", ""), result.get("error", "")])
+            else:
+                self._file.write(json.dumps(result) + "\n")
+
+    def close(self):
+        self._file.close()
+
+
+class BulkScoringPipeline:
+    def __init__(self, config: PredictionConfig = None, chunk_size: int = 10000, workers: int = None):
+        if config is None:
+            config = ConfigurationManager().get_prediction_config()
+        self.config = config
+        self.chunk_size = chunk_size
+        self.workers = workers or os.cpu_count() or 1
+
+    def run(self, input_path: Path, output_path: Path) -> dict:
+        """
+        Score every record in input_path and write predictions to output_path in input order.
+
+        At most two chunks per worker are in flight, so memory stays constant
+        regardless of the input size.
+
+        Returns:
+            dict: rows, errors, seconds and rows_per_second
+        """
+        try:
+            logger.info(f"Bulk scoring {input_path} -> {output_path} with {self.workers} workers")
+            start_time = time.perf_counter()
+            rows = 0
+            errors = 0
+            writer = PredictionWriter(output_path)
+
+            def consume(results):
+                nonlocal rows, errors
+                writer.write(results)
+                rows += len(results)
+                errors += sum(1 for result in results if not result["success"])
+
+            try:
+                if self.workers == 1:
+                    _init_worker(self.config)
+                    offset = 0
+                    for chunk in read_chunks(input_path, self.chunk_size):
+                        consume(_score_chunk(offset, chunk))
+                        offset += len(chunk)
+                else:
+                    with ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker,
+                                             initargs=(self.config,)) as pool:
+                        in_flight = deque()
+                        offset = 0
+                        for chunk in read_chunks(input_path, self.chunk_size):
+                            in_flight.append(pool.submit(_score_chunk, offset, chunk))
+                            offset += len(chunk)
+                            if len(in_flight) >= 2 * self.workers:
+                                consume(in_flight.popleft().result())
+                        while in_flight:
+                            consume(in_flight.popleft().result())
+            finally:
+                writer.close()
+
+            seconds = time.perf_counter() - start_time
+            report = {
+                "rows": rows,
+                "errors": errors,
+                "seconds": round(seconds, 3),
+                "rows_per_second": round(rows / seconds, 1) if seconds > 0 else 0.0,
+            }
+            logger.info(f"Bulk scoring completed: {report}")
+            return report
+
+        except Exception as e:
+            logger.error(f"Error in bulk scoring pipeline: {str(e)}")
+            raise e
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Score a CSV/JSONL/Parquet file of prediction requests")
+    parser.add_argument("input", help="Input file (.csv, .jsonl or .parquet)")
+    parser.add_argument("output", help="Output file (.csv or .jsonl)")
+    parser.add_argument("--chunk-size", type=int, default=10000, help="Rows per chunk")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: all cores)")
+    args = parser.parse_args(argv)
+
+    pipeline = BulkScoringPipeline(chunk_size=args.chunk_size, workers=args.workers)
+    return pipeline.run(Path(args.input), Path(args.output))
+
+
+if __name__ == '__main__':
+    try:
+        main()
+    except Exception as e:
+        logger.error(f"Bulk scoring failed: {str(e)}")
+        raise e
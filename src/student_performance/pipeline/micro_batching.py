@@ -0,0 +1,125 @@
+import time
+import queue
+import threading
+from concurrent.futures import Future
+
+from src.student_performance import logger
+
+
+class MicroBatcher:
+    """
+    Coalesces concurrent single-record predictions into one vectorized call.
+
+    Requests are queued and a background worker drains them into batches of
+    at most ``max_batch_size`` records, waiting no longer than the current
+    window for stragglers. The window adapts after every batch: it shrinks
+    when the slowest request in the batch overshot ``latency_target_ms`` and
+    grows back towards ``window_ms`` while there is headroom.
+
+    ``predict_fn`` receives the list of queued records and returns one
+    prediction per record, e.g. ``PredictPipeline.predict_records``.
+    """
+    def __init__(self, predict_fn, max_batch_size: int = 32, window_ms: float = 2.0,
+                 latency_target_ms: float = 20.0):
+        self.predict_fn = predict_fn
+        self.max_batch_size = max_batch_size
+        self.max_window = window_ms / 1000.0
+        self.window = self.max_window
+        self.latency_target = latency_target_ms / 1000.0
+
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self.batch_sizes = {}
+        self.batches = 0
+        self.requests = 0
+        self.queue_delay_total = 0.0
+        self.queue_delay_max = 0.0
+
+        self._worker = threading.Thread(target=self._run, name="micro-batcher", daemon=True)
+        self._worker.start()
+
+    def submit(self, features) -> Future:
+        """
+        Queue one PredictionRecord (or feature dict) for the next batch
+
+        Returns:
+            Future: Resolves to the float prediction for this row
+        """
+        future = Future()
+        self._queue.put((features, future, time.perf_counter()))
+        return future
+
+    def predict(self, features, timeout: float = None) -> float:
+        """
+        Queue one record and block until its prediction is ready
+        """
+        return self.submit(features).result(timeout=timeout)
+
+    def _collect(self):
+        batch = [self._queue.get()]
+        deadline = time.perf_counter() + self.window
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._collect()
+            started = time.perf_counter()
+            features = [item[0] for item in batch]
+            futures = [item[1] for item in batch]
+
+            try:
+                preds = self.predict_fn(features)
+                for future, pred in zip(futures, preds):
+                    future.set_result(float(pred))
+            except Exception as e:
+                logger.error(f"Error in micro-batch of {len(batch)} records: {str(e)}")
+                for future in futures:
+                    future.set_exception(e)
+
+            finished = time.perf_counter()
+            self._record(batch, started, finished)
+
+    def _record(self, batch, started, finished):
+        delays = [started - item[2] for item in batch]
+        worst_latency = finished - min(item[2] for item in batch)
+
+        with self._lock:
+            size = len(batch)
+            self.batch_sizes[size] = self.batch_sizes.get(size, 0) + 1
+            self.batches += 1
+            self.requests += size
+            self.queue_delay_total += sum(delays)
+            self.queue_delay_max = max(self.queue_delay_max, max(delays))
+
+            if worst_latency > self.latency_target:
+                self.window = self.window * 0.5
+            elif worst_latency < 0.5 * self.latency_target:
+                self.window = min(self.max_window, max(self.window * 1.25, 1e-4))
+
+    def stats(self) -> dict:
+        """
+        Batch-size distribution, queueing delay and the current window
+
+        Returns:
+            dict: Counters for monitoring
+        """
+        with self._lock:
+            return {
+                "batches": self.batches,
+                "requests": self.requests,
+                "max_batch_size": self.max_batch_size,
+                "batch_size_histogram": dict(sorted(self.batch_sizes.items())),
+                "mean_batch_size": self.requests / self.batches if self.batches else 0.0,
+                "queue_delay_seconds_total": self.queue_delay_total,
+                "mean_queue_delay_ms": 1000 * self.queue_delay_total / self.requests if self.requests else 0.0,
+                "max_queue_delay_ms": 1000 * self.queue_delay_max,
+                "window_ms": 1000 * self.window,
+            }
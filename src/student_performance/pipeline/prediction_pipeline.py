@@ -1,25 +1,178 @@
 import sys
-import pandas as pd
-from src.student_performance.utils.common import load_bin
-from src.student_performance import logger
+import numpy as np
+from src.student_performance.config.configuration import ConfigurationManager
+from src.student_performance.entity.config_entity import PredictionConfig
+from src.student_performance.utils.artifact_cache import artifact_cache
+from src.student_performance.utils.compiled_preprocessor import CompiledPreprocessor
+from src.student_performance.utils.folded_linear import FoldedLinearModel, LINEAR_MODELS
+from src.student_performance.utils.metrics import metrics
+from src.student_performance.utils.prediction_cache import PredictionCache
+from src.student_performance import logger, serving_logger
+
+REQUIRED_FIELDS = ('gender', 'race_ethnicity', 'parental_level_of_education',
+                   'lunch', 'test_preparation_course', 'reading_score', 'writing_score')
+
+# Columns used during training, in the order CustomData has always produced them
+FEATURE_COLUMNS = (
+    "gender", "part_time_job", "extracurricular_activities", "career_aspiration",
+    "race_ethnicity", "parental_level_of_education", "lunch", "test_preparation_course",
+    "absence_days", "weekly_self_study_hours", "history_score", "physics_score",
+    "chemistry_score", "biology_score", "english_score", "geography_score",
+    "writing_score", "reading_score",
+)
+
+# Training features the forms do not collect, filled with fixed defaults
+FEATURE_DEFAULTS = {
+    "part_time_job": "No",
+    "extracurricular_activities": "No",
+    "career_aspiration": "Unknown",
+    "absence_days": 0,
+    "weekly_self_study_hours": 5,
+}
+
+# Subject scores the forms do not collect, proxied by reading_score
+FEATURE_ALIASES = {
+    "history_score": "reading_score",
+    "physics_score": "reading_score",
+    "chemistry_score": "reading_score",
+    "biology_score": "reading_score",
+    "english_score": "reading_score",
+    "geography_score": "reading_score",
+}
 
 class PredictPipeline:
-    def __init__(self):
-        pass
+    def __init__(self, config: PredictionConfig = None):
+        if config is None:
+            config = ConfigurationManager().get_prediction_config()
+        self.config = config
+        self._compiled = (None, None)
+        self._folded = (None, None)
+
+        self.prediction_cache = None
+        if config.cache["enabled"]:
+            self.prediction_cache = PredictionCache(
+                max_entries=config.cache["max_entries"],
+                ttl_seconds=config.cache["ttl_seconds"]
+            )
+
+    def load_artifacts(self):
+        """
+        Return the (model, preprocessor, version) triple from the process-wide cache
+        """
+        return artifact_cache.get(self.config.model_path, self.config.preprocessor_path,
+                                  mmap_mode=self.config.mmap_mode)
+
+    def get_compiled_preprocessor(self, preprocessor, version):
+        """
+        Compile the preprocessor once per artifact version; None if it cannot be compiled
+        """
+        compiled_version, compiled = self._compiled
+        if compiled_version != version:
+            try:
+                compiled = CompiledPreprocessor.from_column_transformer(preprocessor)
+            except (AttributeError, ValueError) as e:
+                logger.warning(f"Falling back to sklearn preprocessing: {str(e)}")
+                compiled = None
+            self._compiled = (version, compiled)
+        return compiled
+
+    def get_folded_model(self, model, preprocessor, version):
+        """
+        Fold a linear model and its preprocessor once per artifact version; None for other models
+        """
+        folded_version, folded = self._folded
+        if folded_version != version:
+            folded = None
+            if type(model).__name__ in LINEAR_MODELS:
+                try:
+                    folded = FoldedLinearModel.from_pipeline(
+                        self.get_compiled_preprocessor(preprocessor, version) or preprocessor, model)
+                except (AttributeError, ValueError) as e:
+                    logger.warning(f"Falling back to unfolded linear model: {str(e)}")
+            self._folded = (version, folded)
+        return folded
+
+    def transform_records(self, records, preprocessor, version) -> np.ndarray:
+        """
+        Encode PredictionRecords (or feature dicts) into one contiguous feature matrix
+        """
+        compiled = self.get_compiled_preprocessor(preprocessor, version)
+        if compiled is not None:
+            return compiled.transform_records(records)
+        import pandas as pd
+        return preprocessor.transform(pd.DataFrame([as_feature_dict(record) for record in records]))
+
+    def predict_record(self, record) -> float:
+        """
+        Score one PredictionRecord (or feature dict) without building a DataFrame
+        """
+        return self.predict_records([record])[0]
+
+    def predict_records(self, records) -> list:
+        """
+        Score PredictionRecords (or feature dicts) with one transform and one predict call.
+        PredictionRecords already in the prediction cache skip the model entirely.
+        """
+        try:
+            with metrics.stage("load_artifacts"):
+                model, preprocessor, version = self.load_artifacts()
+            cache = self.prediction_cache
+
+            preds = [None] * len(records)
+            keys = [None] * len(records)
+            pending = []
+            with metrics.stage("cache_lookup"):
+                for index, record in enumerate(records):
+                    if cache is not None and isinstance(record, PredictionRecord):
+                        keys[index] = record.canonical_key()
+                        preds[index] = cache.get(version, keys[index])
+                    if preds[index] is None:
+                        pending.append(index)
+
+            if pending:
+                pending_records = [records[i] for i in pending]
+                folded = self.get_folded_model(model, preprocessor, version)
+                if folded is not None:
+                    with metrics.stage("folded_predict"):
+                        pending_preds = folded.predict_records(pending_records)
+                else:
+                    with metrics.stage("preprocess"):
+                        features = self.transform_records(pending_records, preprocessor, version)
+                    with metrics.stage("model_predict"):
+                        pending_preds = model.predict(features)
+
+                for index, pred in zip(pending, pending_preds):
+                    preds[index] = float(pred)
+                    if keys[index] is not None:
+                        cache.put(version, keys[index], preds[index])
+
+            return preds
+
+        except Exception as e:
+            logger.error(f"Error in prediction pipeline: {str(e)}")
+            raise e
+
+    def explain_record(self, record) -> dict:
+        """
+        Per-feature contributions for one record; only available for folded linear models
+
+        Raises:
+            ValueError: If the loaded model cannot be folded
+        """
+        model, preprocessor, version = self.load_artifacts()
+        folded = self.get_folded_model(model, preprocessor, version)
+        if folded is None:
+            raise ValueError(f"Contributions are only available for linear models, not {type(model).__name__}")
+        return folded.explain_record(record)
 
     def predict(self, features):
         try:
-            model_path = "artifacts/model_trainer/model.pkl"
-            preprocessor_path = "artifacts/data_transformation/preprocessor.pkl"
-            
-            logger.info("Loading model and preprocessor")
-            model = load_bin(model_path)
-            preprocessor = load_bin(preprocessor_path)
+            model, preprocessor, _ = self.load_artifacts()
             
-            logger.info("Scaling input features")
+            serving_logger.info("Scaling input features")
             data_scaled = preprocessor.transform(features)
             
-            logger.info("Making prediction")
+            serving_logger.info("Making prediction")
             preds = model.predict(data_scaled)
             
             return preds
@@ -28,6 +181,127 @@ class PredictPipeline:
             logger.error(f"Error in prediction pipeline: {str(e)}")
             raise e
 
+    def predict_batch(self, records):
+        """
+        Validate a list of raw records and score the valid ones in a single transform/predict call
+
+        Args:
+            records (list): JSON/form records with the CustomData fields
+
+        Returns:
+            list: One dict per input record, holding either a prediction or an error
+        """
+        try:
+            results = [None] * len(records)
+            rows = []
+            row_indices = []
+
+            for index, record in enumerate(records):
+                try:
+                    rows.append(PredictionRecord.from_mapping(record))
+                    row_indices.append(index)
+                except ValueError as e:
+                    results[index] = {"index": index, "error": str(e), "success": False}
+
+            if rows:
+                serving_logger.info("Scoring batch of %d records", len(rows))
+                preds = self.predict_records(rows)
+                for index, pred in zip(row_indices, preds):
+                    results[index] = {"index": index, "prediction": pred, "success": True}
+
+            return results
+
+        except Exception as e:
+            logger.error(f"Error in batch prediction: {str(e)}")
+            raise e
+
+def as_feature_dict(record) -> dict:
+    """
+    Full training feature row for a PredictionRecord, or the dict itself
+    """
+    if isinstance(record, PredictionRecord):
+        return record.as_dict()
+    return record
+
+class PredictionRecord:
+    """
+    Compact, validated request record filled straight from JSON or form fields.
+
+    It behaves like a read-only mapping over the training feature columns
+    (``record.get(column)``), resolving defaults and proxied scores on access,
+    so the compiled preprocessor can encode it without an intermediate dict.
+    """
+    __slots__ = REQUIRED_FIELDS
+
+    def __init__(self, gender, race_ethnicity, parental_level_of_education, lunch,
+                 test_preparation_course, reading_score, writing_score):
+        self.gender = gender
+        self.race_ethnicity = race_ethnicity
+        self.parental_level_of_education = parental_level_of_education
+        self.lunch = lunch
+        self.test_preparation_course = test_preparation_course
+        self.reading_score = reading_score
+        self.writing_score = writing_score
+
+    @classmethod
+    def from_mapping(cls, mapping, aliases: dict = None):
+        """
+        Validate a JSON object or form and build a record from it
+
+        Args:
+            mapping: Dict or werkzeug MultiDict with the request fields
+            aliases (dict, optional): Field name -> key in mapping, e.g. {"race_ethnicity": "ethnicity"}
+
+        Raises:
+            ValueError: If the record is malformed
+        """
+        if not hasattr(mapping, "get"):
+            raise ValueError("Record must be a JSON object")
+
+        aliases = aliases or {}
+        values = [mapping.get(aliases.get(field, field)) for field in REQUIRED_FIELDS]
+
+        missing_fields = [field for field, value in zip(REQUIRED_FIELDS, values) if value in (None, "")]
+        if missing_fields:
+            raise ValueError(f"Missing required fields: {', '.join(missing_fields)}")
+
+        try:
+            reading_score = float(values[5])
+            writing_score = float(values[6])
+        except (TypeError, ValueError):
+            raise ValueError("Invalid score values. Please enter numeric values.")
+
+        if not (0 <= reading_score <= 100) or not (0 <= writing_score <= 100):
+            raise ValueError("Scores must be between 0 and 100")
+
+        return cls(values[0], values[1], values[2], values[3], values[4], reading_score, writing_score)
+
+    def get(self, column, default=None):
+        if column in FEATURE_DEFAULTS:
+            return FEATURE_DEFAULTS[column]
+        try:
+            return getattr(self, FEATURE_ALIASES.get(column, column))
+        except AttributeError:
+            return default
+
+    def canonical_key(self) -> tuple:
+        """
+        Hashable key identifying the prediction inputs; scores are already floats
+        """
+        return tuple(getattr(self, field) for field in REQUIRED_FIELDS)
+
+    def as_dict(self) -> dict:
+        return {column: self.get(column) for column in FEATURE_COLUMNS}
+
+    def __eq__(self, other):
+        if not isinstance(other, PredictionRecord):
+            return NotImplemented
+        return all(getattr(self, field) == getattr(other, field) for field in REQUIRED_FIELDS)
+
+    def __repr__(self):
+        fields = ", ".join(f"{field}={getattr(self, field)!r}" for field in REQUIRED_FIELDS)
+        return f"PredictionRecord({fields})"
+
 class CustomData:
     def __init__(self,
                  gender: str,
@@ -46,33 +320,40 @@ class CustomData:
         self.reading_score = reading_score
         self.writing_score = writing_score
 
+    @classmethod
+    def from_record(cls, record):
+        """
+        Build a CustomData from a JSON/form record, validating required fields and score ranges
+
+        Raises:
+            ValueError: If the record is malformed
+        """
+        record = PredictionRecord.from_mapping(record)
+        return cls(**{field: getattr(record, field) for field in REQUIRED_FIELDS})
+
+    def to_prediction_record(self):
+        return PredictionRecord(
+            gender=self.gender,
+            race_ethnicity=self.race_ethnicity,
+            parental_level_of_education=self.parental_level_of_education,
+            lunch=self.lunch,
+            test_preparation_course=self.test_preparation_course,
+            reading_score=self.reading_score,
+            writing_score=self.writing_score
+        )
+
+    def get_data_as_dict(self):
+        """
+        Full feature row matching the columns used during training.
+        For fields not provided by the user, use sensible defaults.
+        """
+        return self.to_prediction_record().as_dict()
+
     def get_data_as_data_frame(self):
         try:
-            # Build a full feature vector matching the columns used during training.
-            # For fields not provided by the user, use sensible defaults.
-            custom_data_input_dict = {
-                "gender": [self.gender],
-                "part_time_job": ["No"],
-                "extracurricular_activities": ["No"],
-                "career_aspiration": ["Unknown"],
-                "race_ethnicity": [self.race_ethnicity],
-                "parental_level_of_education": [self.parental_level_of_education],
-                "lunch": [self.lunch],
-                "test_preparation_course": [self.test_preparation_course],
-
-                # Numerical features (use reading_score as proxy for other subject scores)
-                "absence_days": [0],
-                "weekly_self_study_hours": [5],
-                "history_score": [self.reading_score],
-                "physics_score": [self.reading_score],
-                "chemistry_score": [self.reading_score],
-                "biology_score": [self.reading_score],
-                "english_score": [self.reading_score],
-                "geography_score": [self.reading_score],
-                "writing_score": [self.writing_score],
-                "reading_score": [self.reading_score],
-            }
+            custom_data_input_dict = {key: [value] for key, value in self.get_data_as_dict().items()}
 
+            import pandas as pd
             return pd.DataFrame(custom_data_input_dict)
 
         except Exception as e:
@@ -1,8 +1,13 @@
 import os
 import sys
+import argparse
 from src.student_performance import logger
+from src.student_performance.constants import SCHEMA_FILE_PATH
 from src.student_performance.config.configuration import ConfigurationManager
-from src.student_performance.components.data_ingestion import DataIngestion
+from src.student_performance.utils.stage_cache import StageCache, StageSpec
+from src.student_performance.utils.stage_artifacts import StageArtifacts, handed_over, publish
+from src.student_performance.components.data_ingestion import DataIngestion, resolve_sources
+from src.student_performance.components.data_validation import DataValidation
 from src.student_performance.components.data_transformation import DataTransformation
 from src.student_performance.components.model_trainer import ModelTrainer
 from src.student_performance.components.model_evaluation import ModelEvaluation
@@ -13,12 +18,32 @@ class DataIngestionTrainingPipeline:
     def __init__(self):
         pass
 
-    def main(self):
+    def main(self, config: ConfigurationManager = None, artifacts: StageArtifacts = None):
         try:
-            config = ConfigurationManager()
+            config = config or ConfigurationManager()
             data_ingestion_config = config.get_data_ingestion_config()
             data_ingestion = DataIngestion(config=data_ingestion_config)
-            data_ingestion.initiate_data_ingestion()
+            data_ingestion.initiate_data_ingestion(artifacts)
+        except Exception as e:
+            logger.error(f"Error in {STAGE_NAME}: {str(e)}")
+            raise e
+
+STAGE_NAME = "Data Validation stage"
+
+class DataValidationTrainingPipeline:
+    def __init__(self):
+        pass
+
+    def main(self, config: ConfigurationManager = None, artifacts: StageArtifacts = None):
+        try:
+            config = config or ConfigurationManager()
+            data_validation_config = config.get_data_validation_config()
+            data_validation = DataValidation(config=data_validation_config)
+            status = data_validation.validate_all_columns(handed_over(artifacts, "data"),
+                                                          delta=handed_over(artifacts, "delta"))
+            if not status:
+                raise ValueError(f"Data failed schema validation, see {data_validation_config.report_file}")
+            return status
         except Exception as e:
             logger.error(f"Error in {STAGE_NAME}: {str(e)}")
             raise e
@@ -29,13 +54,14 @@ class DataTransformationTrainingPipeline:
     def __init__(self):
         pass
 
-    def main(self):
+    def main(self, config: ConfigurationManager = None, artifacts: StageArtifacts = None):
         try:
-            config = ConfigurationManager()
+            config = config or ConfigurationManager()
             data_transformation_config = config.get_data_transformation_config()
             data_transformation = DataTransformation(config=data_transformation_config)
-            train_arr, test_arr, _ = data_transformation.initiate_data_transformation_from_config()
-            return train_arr, test_arr
+            train_arr, test_arr, _ = data_transformation.initiate_data_transformation_from_config(
+                df=handed_over(artifacts, "data"), artifacts=artifacts)
+            return publish(artifacts, "arrays", (train_arr, test_arr))
         except Exception as e:
             logger.error(f"Error in {STAGE_NAME}: {str(e)}")
             raise e
@@ -46,12 +72,13 @@ class ModelTrainerTrainingPipeline:
     def __init__(self):
         pass
 
-    def main(self, train_arr, test_arr):
+    def main(self, train_arr, test_arr, config: ConfigurationManager = None, artifacts: StageArtifacts = None):
         try:
-            config = ConfigurationManager()
+            config = config or ConfigurationManager()
             model_trainer_config = config.get_model_trainer_config()
             model_trainer = ModelTrainer(config=model_trainer_config)
             r2_score, best_model_name, model_report = model_trainer.initiate_model_trainer(train_arr, test_arr)
+            publish(artifacts, "model", model_trainer.best_model)
             return r2_score, best_model_name, model_report
         except Exception as e:
             logger.error(f"Error in {STAGE_NAME}: {str(e)}")
@@ -63,50 +90,182 @@ class ModelEvaluationTrainingPipeline:
     def __init__(self):
         pass
 
-    def main(self):
+    def main(self, config: ConfigurationManager = None, artifacts: StageArtifacts = None):
         try:
-            config = ConfigurationManager()
+            config = config or ConfigurationManager()
             model_evaluation_config = config.get_model_evaluation_config()
             model_evaluation = ModelEvaluation(config=model_evaluation_config)
-            model_evaluation.log_into_mlflow()
+            model_evaluation.log_into_mlflow(test_data=handed_over(artifacts, "test_df"),
+                                             model=handed_over(artifacts, "model"),
+                                             preprocessor=handed_over(artifacts, "preprocessor"))
         except Exception as e:
             logger.error(f"Error in {STAGE_NAME}: {str(e)}")
             raise e
 
+STAGE_ORDER = ("data_ingestion", "data_validation", "data_transformation", "model_trainer", "model_evaluation")
+
+def build_stage_specs(config: ConfigurationManager) -> dict:
+    """
+    Inputs and outputs of every training stage, with paths taken from config.yaml
+    """
+    ingestion = config.config.data_ingestion
+    validation = config.config.data_validation
+    transformation = config.config.data_transformation
+    trainer = config.config.model_trainer
+    evaluation = config.config.model_evaluation
+
+    data_file = ingestion.data_file
+    incremental = ingestion.get("incremental") or {}
+    train_file = trainer.train_data_path
+    test_file = trainer.test_data_path
+    model_path = os.path.join(trainer.root_dir, trainer.model_name)
+
+    return {
+        "data_ingestion": StageSpec(
+            name="data_ingestion",
+            # schema.yaml types the stored columns
+            deps=(*resolve_sources(ingestion.source_URL), SCHEMA_FILE_PATH),
+            config_sections=("data_ingestion",),
+            code=("src/student_performance/components/data_ingestion.py",
+                  "src/student_performance/utils/columnar_store.py",
+                  "src/student_performance/utils/incremental_store.py"),
+            outs=(data_file,),
+            optional_outs=tuple(incremental[key] for key in ("index_file", "delta_file") if incremental.get(key))
+            + (os.path.join(ingestion.root_dir, "ingestion_report.json"),),
+        ),
+        "data_validation": StageSpec(
+            name="data_validation",
+            deps=(data_file, SCHEMA_FILE_PATH),
+            config_sections=("data_validation",),
+            code=("src/student_performance/components/data_validation.py",),
+            outs=(validation.STATUS_FILE, validation.report_file),
+        ),
+        "data_transformation": StageSpec(
+            name="data_transformation",
+            deps=(data_file,),
+            config_sections=("data_transformation",),
+            code=("src/student_performance/components/data_transformation.py",
+                  "src/student_performance/utils/compiled_preprocessor.py"),
+            outs=(train_file, test_file, transformation.preprocessor_obj_file_path),
+        ),
+        "model_trainer": StageSpec(
+            name="model_trainer",
+            deps=(train_file, test_file, transformation.preprocessor_obj_file_path),
+            config_sections=("model_trainer",),
+            params_sections=("hyperparameter_tuning", "model_evaluation"),
+            code=("src/student_performance/components/model_trainer.py",
+                  "src/student_performance/utils/model_search.py",
+                  "src/student_performance/utils/common.py",
+                  "src/student_performance/utils/tree_engine.py"),
+            outs=(model_path, os.path.join(trainer.root_dir, "tree_model.pkl"),
+                  os.path.join(trainer.root_dir, "search_report.json")),
+        ),
+        "model_evaluation": StageSpec(
+            name="model_evaluation",
+            deps=(model_path, test_file, transformation.preprocessor_obj_file_path),
+            config_sections=("model_evaluation", "mlflow_config"),
+            params_sections=("*",),
+            code=("src/student_performance/components/model_evaluation.py",),
+            outs=(evaluation.metric_file_name,),
+        ),
+    }
+
 class CompleteTrainingPipeline:
-    def __init__(self):
-        pass
+    """
+    Runs the training stages in order, skipping every stage whose inputs
+    (data, config/params sections and code) are unchanged since its last
+    successful run and whose outputs are still intact.
+
+    Stages that run hand their frames, matrices and fitted objects to the
+    next stage in memory and write their files in the background. A stage
+    is recorded in the stage cache as soon as its own writes have finished,
+    so a later failure keeps its result. A stage after one that ran is
+    fingerprinted once the writes of the stages producing its inputs are
+    done, and is skipped if those inputs came out unchanged.
+    """
+    def __init__(self, force: bool = False):
+        self.force = force
 
-    def run_pipeline(self):
+    def run_stage(self, name, config, cache, specs, state, artifacts):
         """
-        Run the complete training pipeline
+        Run one stage unless the stage cache holds a valid result for its current inputs
+
+        Returns:
+            bool: Whether the stage ran
+        """
+        spec = specs[name]
+        # Inputs written in the background by stages that ran must be complete before they are hashed
+        deps = {os.path.normpath(str(dep)) for dep in spec.deps}
+        for producer, recorded in state["recorded"].items():
+            if deps & {os.path.normpath(str(out)) for out in specs[producer].outs}:
+                recorded.result()
+
+        if not self.force:
+            fingerprint = cache.fingerprint(spec, config.config, config.params)
+            manifest = cache.lookup(spec, fingerprint)
+            if manifest is not None:
+                logger.info(f">>>>>> stage {name} skipped: inputs unchanged (fingerprint {fingerprint[:12]}) <<<<<<")
+                if name == "model_trainer":
+                    state["trainer_result"] = manifest["result"]
+                return False
+
+        logger.info(f">>>>>> stage {name} started <<<<<<")
+        result = None
+        if name == "data_ingestion":
+            DataIngestionTrainingPipeline().main(config, artifacts)
+
+        elif name == "data_validation":
+            DataValidationTrainingPipeline().main(config, artifacts)
+
+        elif name == "data_transformation":
+            DataTransformationTrainingPipeline().main(config, artifacts)
+
+        elif name == "model_trainer":
+            arrays = handed_over(artifacts, "arrays")
+            if arrays is None:
+                # Transformation was skipped; rebuild its arrays from the saved split
+                transformation = DataTransformation(config=config.get_data_transformation_config())
+                arrays = transformation.load_transformed_arrays()[:2]
+            r2_score, best_model_name, model_report = ModelTrainerTrainingPipeline().main(*arrays, config, artifacts)
+            result = {"r2_score": r2_score, "best_model": best_model_name, "model_report": model_report}
+            state["trainer_result"] = result
+
+        elif name == "model_evaluation":
+            ModelEvaluationTrainingPipeline().main(config, artifacts)
+
+        state["executed"].append((spec, result))
+        # The manifest hashes the stage's outputs, so it is written once they are on disk
+        state["recorded"][name] = artifacts.after_writes(
+            f"{name} manifest",
+            lambda: cache.record(spec, cache.fingerprint(spec, config.config, config.params), result))
+        logger.info(f">>>>>> stage {name} completed <<<<<<\n\nx==========x")
+        return True
+
+    def run_pipeline(self, stages=STAGE_ORDER):
+        """
+        Run the complete training pipeline, or only the named stages
         """
         try:
             logger.info("Starting complete training pipeline")
-            
-            # Stage 1: Data Ingestion
-            logger.info(f">>>>>> stage {DataIngestionTrainingPipeline.__name__} started <<<<<<")
-            data_ingestion_pipeline = DataIngestionTrainingPipeline()
-            data_ingestion_pipeline.main()
-            logger.info(f">>>>>> stage {DataIngestionTrainingPipeline.__name__} completed <<<<<<\n\nx==========x")
-
-            # Stage 2: Data Transformation
-            logger.info(f">>>>>> stage {DataTransformationTrainingPipeline.__name__} started <<<<<<")
-            data_transformation_pipeline = DataTransformationTrainingPipeline()
-            train_arr, test_arr = data_transformation_pipeline.main()
-            logger.info(f">>>>>> stage {DataTransformationTrainingPipeline.__name__} completed <<<<<<\n\nx==========x")
-
-            # Stage 3: Model Training
-            logger.info(f">>>>>> stage {ModelTrainerTrainingPipeline.__name__} started <<<<<<")
-            model_trainer_pipeline = ModelTrainerTrainingPipeline()
-            r2_score, best_model_name, model_report = model_trainer_pipeline.main(train_arr, test_arr)
-            logger.info(f">>>>>> stage {ModelTrainerTrainingPipeline.__name__} completed <<<<<<\n\nx==========x")
-
-            # Stage 4: Model Evaluation
-            logger.info(f">>>>>> stage {ModelEvaluationTrainingPipeline.__name__} started <<<<<<")
-            model_evaluation_pipeline = ModelEvaluationTrainingPipeline()
-            model_evaluation_pipeline.main()
-            logger.info(f">>>>>> stage {ModelEvaluationTrainingPipeline.__name__} completed <<<<<<\n\nx==========x")
+
+            # Read the three YAML files once and share them with every stage
+            config = ConfigurationManager()
+            cache = StageCache(config.get_stage_cache_config().root_dir)
+            specs = build_stage_specs(config)
+            state = {"executed": [], "recorded": {}}
+
+            # Leaving the block waits for every write and manifest, also when a stage fails
+            with StageArtifacts() as artifacts:
+                for name in STAGE_ORDER:
+                    if name in stages:
+                        self.run_stage(name, config, cache, specs, state, artifacts)
+
+            executed = [spec.name for spec, _ in state["executed"]]
+            logger.info(f"Stages executed: {executed or 'none'}")
+
+            trainer_result = state.get("trainer_result") or {}
+            best_model_name = trainer_result.get("best_model")
+            r2_score = trainer_result.get("r2_score")
 
             logger.info("Complete training pipeline finished successfully")
             logger.info(f"Best model: {best_model_name} with R2 score: {r2_score}")
@@ -114,17 +273,27 @@ class CompleteTrainingPipeline:
             return {
                 "best_model": best_model_name,
                 "r2_score": r2_score,
-                "model_report": model_report
+                "model_report": trainer_result.get("model_report"),
+                "executed_stages": executed
             }
 
         except Exception as e:
             logger.error(f"Error in complete training pipeline: {str(e)}")
             raise e
 
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run the training pipeline, skipping up-to-date stages")
+    parser.add_argument("--stage", choices=STAGE_ORDER + ("all",), default="all",
+                        help="Run a single stage (as dvc.yaml does) or all of them")
+    parser.add_argument("--force", action="store_true", help="Rerun stages even if their inputs are unchanged")
+    args = parser.parse_args(argv)
+
+    stages = STAGE_ORDER if args.stage == "all" else (args.stage,)
+    return CompleteTrainingPipeline(force=args.force).run_pipeline(stages)
+
 if __name__ == '__main__':
     try:
-        pipeline = CompleteTrainingPipeline()
-        results = pipeline.run_pipeline()
+        results = main()
         logger.info(f"Pipeline completed with results: {results}")
     except Exception as e:
         logger.error(f"Pipeline failed: {str(e)}")
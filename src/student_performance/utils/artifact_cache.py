@@ -0,0 +1,146 @@
+import os
+import time
+import hashlib
+import threading
+from collections import namedtuple
+from pathlib import Path
+
+from src.student_performance import logger
+from src.student_performance.utils.common import load_bin
+
+ModelArtifacts = namedtuple("ModelArtifacts", ["model", "preprocessor", "version"])
+
+
+def file_digest(path: Path, chunk_size: int = 1 << 20) -> str:
+    """
+    Compute the sha256 digest of a file without reading it into memory at once
+
+    Args:
+        path (Path): Path of the file
+        chunk_size (int, optional): Bytes read per iteration. Defaults to 1 MiB.
+
+    Returns:
+        str: Hex digest of the file content
+    """
+    sha = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            sha.update(chunk)
+    return sha.hexdigest()
+
+
+class ArtifactCache:
+    """
+    Thread-safe, process-wide cache for the model and preprocessor pair.
+
+    The artifacts are unpickled once and served from memory. Every lookup
+    stats both files; when the mtime or size changes the content hash is
+    recomputed and, if it differs, both files are reloaded and swapped in
+    together so a request never sees a model paired with a stale preprocessor.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        # Hits have their own lock, so a hit never waits behind a slow reload
+        self._hits_lock = threading.Lock()
+        self._entries = {}
+        self.hits = 0
+        self.misses = 0
+        self.reloads = 0
+        self.reload_failures = 0
+        self.last_reload_seconds = 0.0
+
+    @staticmethod
+    def _signature(model_path, preprocessor_path):
+        model_stat = os.stat(model_path)
+        preprocessor_stat = os.stat(preprocessor_path)
+        return (model_stat.st_mtime_ns, model_stat.st_size,
+                preprocessor_stat.st_mtime_ns, preprocessor_stat.st_size)
+
+    def _count_hit(self):
+        with self._hits_lock:
+            self.hits += 1
+
+    def get(self, model_path: Path, preprocessor_path: Path, mmap_mode: str = None) -> ModelArtifacts:
+        """
+        Return the cached artifacts, reloading them if the files changed on disk
+
+        Args:
+            model_path (Path): Path to the pickled model
+            preprocessor_path (Path): Path to the pickled preprocessor
+            mmap_mode (str, optional): Passed to load_bin to memory-map large arrays
+
+        Returns:
+            ModelArtifacts: model, preprocessor and a version string
+        """
+        key = (str(model_path), str(preprocessor_path))
+        signature = self._signature(*key)
+
+        entry = self._entries.get(key)
+        if entry is not None and entry["signature"] == signature:
+            self._count_hit()
+            return entry["artifacts"]
+
+        with self._lock:
+            # Another thread may have reloaded while we waited for the lock
+            entry = self._entries.get(key)
+            if entry is not None and entry["signature"] == signature:
+                self._count_hit()
+                return entry["artifacts"]
+
+            self.misses += 1
+            digests = (file_digest(key[0]), file_digest(key[1]))
+
+            if entry is not None and entry["digests"] == digests:
+                # Files were touched but the content is identical
+                self._entries[key] = dict(entry, signature=signature)
+                return entry["artifacts"]
+
+            start = time.perf_counter()
+            try:
+                model = load_bin(key[0], mmap_mode=mmap_mode)
+                preprocessor = load_bin(key[1], mmap_mode=mmap_mode)
+                if model is None:
+                    # e.g. tree_model.pkl after a model that is not a tree ensemble won
+                    raise ValueError(f"{key[0]} holds no model")
+            except Exception as e:
+                if entry is None:
+                    raise e
+                # Training may still be writing the files; keep serving the old pair
+                self.reload_failures += 1
+                logger.warning(f"Artifact reload failed, keeping version {entry['artifacts'].version}: {str(e)}")
+                return entry["artifacts"]
+
+            version = hashlib.sha256("".join(digests).encode()).hexdigest()[:12]
+            artifacts = ModelArtifacts(model=model, preprocessor=preprocessor, version=version)
+            self._entries[key] = {"signature": signature, "digests": digests, "artifacts": artifacts}
+
+            self.last_reload_seconds = time.perf_counter() - start
+            self.reloads += 1
+            logger.info(f"Loaded artifacts version {version} in {self.last_reload_seconds:.3f}s")
+            return artifacts
+
+    def clear(self):
+        """
+        Drop every cached entry so the next lookup reloads from disk
+        """
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        """
+        Cache counters for monitoring
+
+        Returns:
+            dict: hits, misses, reloads, failures and last reload latency
+        """
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "reloads": self.reloads,
+            "reload_failures": self.reload_failures,
+            "last_reload_seconds": self.last_reload_seconds,
+            "versions": [entry["artifacts"].version for entry in self._entries.values()],
+        }
+
+
+artifact_cache = ArtifactCache()
@@ -0,0 +1,138 @@
+import os
+import queue
+import atexit
+import logging
+import threading
+from itertools import count
+from logging.handlers import QueueHandler, QueueListener
+
+from src.student_performance import log_handlers
+
+
+class SamplingFilter(logging.Filter):
+    """
+    Keep one in every 1/rate records below WARNING; WARNING and above always pass.
+
+    Sampling is deterministic (every Nth record) so a rate of 0.01 keeps
+    exactly one INFO line per hundred requests instead of a random subset.
+    """
+    def __init__(self, rate: float):
+        super().__init__()
+        if not 0 < rate <= 1:
+            raise ValueError(f"Sampling rate must be in (0, 1], got {rate}")
+        self.rate = rate
+        self.every = max(1, round(1 / rate))
+        self._counter = count()
+        self.dropped = 0
+
+    def filter(self, record) -> bool:
+        if record.levelno >= logging.WARNING or self.every == 1:
+            return True
+        if next(self._counter) % self.every == 0:
+            return True
+        self.dropped += 1
+        return False
+
+
+class LazyQueueHandler(QueueHandler):
+    """
+    Enqueue records without formatting them; the listener thread does the
+    string work. INFO records are dropped when the queue is full so a slow
+    disk never blocks a request, while WARNING and above wait for room.
+    """
+    def __init__(self, log_queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record):
+        # The stock handler formats here, in the calling thread
+        return record
+
+    def enqueue(self, record):
+        if record.levelno >= logging.WARNING:
+            self.queue.put(record)
+            return
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+class _DrainingListener(QueueListener):
+    def enqueue_sentinel(self):
+        # Wait for room instead of raising queue.Full so stop() always drains
+        self.queue.put(self._sentinel)
+
+
+_state = {"pid": None, "listener": None, "handler": None, "handlers": None}
+_state_lock = threading.Lock()
+
+
+def configure_async_logging(enabled: bool = True, queue_size: int = 10000, sample_rates: dict = None):
+    """
+    Move the package's file and stdout handlers behind a queue drained by a background thread and
+    install sampling filters on the given loggers.
+
+    Safe to call again after a fork: the listener thread does not survive
+    fork(), so a new queue and listener are started in the child.
+
+    Args:
+        enabled (bool, optional): Use the queue; when False only sampling is applied
+        queue_size (int, optional): Records buffered before INFO lines are dropped
+        sample_rates (dict, optional): Logger name -> fraction of sub-WARNING records kept
+    """
+    for name, rate in (sample_rates or {}).items():
+        target = logging.getLogger(name)
+        for existing in [f for f in target.filters if isinstance(f, SamplingFilter)]:
+            target.removeFilter(existing)
+        target.addFilter(SamplingFilter(float(rate)))
+
+    if not enabled:
+        return
+
+    with _state_lock:
+        pid = os.getpid()
+        if _state["pid"] == pid:
+            return
+
+        root = logging.getLogger()
+        if _state["handlers"] is None:
+            _state["handlers"] = [h for h in log_handlers if h in root.handlers]
+        elif _state["handler"] is not None:
+            # Inherited from the parent process, whose listener thread is gone
+            root.removeHandler(_state["handler"])
+
+        log_queue = queue.Queue(maxsize=queue_size)
+        handler = LazyQueueHandler(log_queue)
+        for existing in _state["handlers"]:
+            root.removeHandler(existing)
+        root.addHandler(handler)
+
+        listener = _DrainingListener(log_queue, *_state["handlers"], respect_handler_level=True)
+        listener.start()
+        _state.update(pid=pid, listener=listener, handler=handler)
+
+    atexit.register(shutdown_logging)
+
+
+def shutdown_logging():
+    """
+    Drain the queue into the real handlers and restore synchronous logging
+    """
+    with _state_lock:
+        listener, handler = _state["listener"], _state["handler"]
+        if listener is None or _state["pid"] != os.getpid():
+            return
+        # stop() enqueues a sentinel and waits until every earlier record is written
+        listener.stop()
+
+        root = logging.getLogger()
+        root.removeHandler(handler)
+        # Stream handlers flush on every emit; logging.shutdown() closes them later
+        for existing in _state["handlers"]:
+            root.addHandler(existing)
+        _state.update(pid=None, listener=None, handler=None, handlers=None)
+
+    if handler.dropped:
+        logging.getLogger("studentPerformanceLogger").warning(
+            "Dropped %d log records while the logging queue was full", handler.dropped)
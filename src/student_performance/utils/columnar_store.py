@@ -0,0 +1,305 @@
+import os
+import shutil
+from pathlib import Path
+
+from src.student_performance import logger
+
+# pandas and pyarrow are imported inside the functions that use them so that
+# the serving entry points do not pay for them at startup
+
+PARQUET_SUFFIXES = (".parquet", ".pq")
+
+
+def schema_dtypes(schema) -> dict:
+    """
+    Column dtypes of the columnar store, derived from schema.yaml
+
+    Columns listed under categorical_columns are stored as pandas categoricals
+    (dictionary-encoded in Parquet); the remaining non-object COLUMNS keep the
+    dtype the schema declares.
+
+    Args:
+        schema (ConfigBox): Parsed schema.yaml
+
+    Returns:
+        dict: Column name -> pandas dtype
+    """
+    dtypes = {name: dtype for name, dtype in schema.get("COLUMNS", {}).items() if dtype != "object"}
+    dtypes.update({name: "category" for name in schema.get("categorical_columns", [])})
+    return dtypes
+
+
+def apply_schema(df, dtypes: dict):
+    """
+    Cast the columns of df that appear in dtypes; absent columns are ignored
+
+    A column that cannot take its declared dtype (e.g. an int64 column with
+    missing values) keeps the inferred one and a warning is logged.
+    """
+    for column, dtype in (dtypes or {}).items():
+        if column not in df.columns or str(df[column].dtype) == dtype:
+            continue
+        try:
+            df[column] = df[column].astype(dtype)
+        except (TypeError, ValueError) as e:
+            logger.warning(f"Column {column} kept dtype {df[column].dtype} instead of {dtype}: {str(e)}")
+    return df
+
+
+def is_parquet(path) -> bool:
+    return Path(path).suffix.lower() in PARQUET_SUFFIXES
+
+
+def _remove(path: Path):
+    if path.is_dir():
+        shutil.rmtree(path)
+    elif path.exists():
+        path.unlink()
+
+
+def write_table(df, path: Path, dtypes: dict = None):
+    """
+    Write a frame to the store: Parquet (zstd) for .parquet paths, CSV otherwise.
+    The file is written beside its final path and renamed into place, so readers
+    never see a partial table.
+
+    Args:
+        df (pd.DataFrame): Frame to write
+        path (Path): Destination file
+        dtypes (dict, optional): Schema dtypes applied before writing
+
+    Returns:
+        Path: The written path
+    """
+    path = Path(path)
+    os.makedirs(path.parent, exist_ok=True)
+    df = apply_schema(df, dtypes)
+
+    tmp_path = path.with_name(f".{path.name}.tmp.{os.getpid()}")
+    if is_parquet(path):
+        df.to_parquet(tmp_path, index=False, compression="zstd")
+    else:
+        df.to_csv(tmp_path, index=False)
+    if path.is_dir():
+        # A partitioned table written by PartitionedWriter
+        _remove(path)
+    os.replace(tmp_path, path)
+    return path
+
+
+def read_table(path: Path, columns: list = None, dtypes: dict = None, sheet: str = None):
+    """
+    Read a table written by write_table, or any CSV/Excel source
+
+    Args:
+        path (Path): Parquet file or partitioned Parquet directory, CSV or xlsx file
+        columns (list, optional): Only read these columns (Parquet reads skip the others on disk)
+        dtypes (dict, optional): Schema dtypes applied after reading
+        sheet (str, optional): Worksheet of an xlsx file; the first one by default
+
+    Returns:
+        pd.DataFrame: The table
+    """
+    import pandas as pd
+
+    path = str(path)
+    if is_parquet(path):
+        df = pd.read_parquet(path, columns=columns)
+    elif path.endswith(".xlsx"):
+        df = pd.read_excel(path, usecols=columns, sheet_name=sheet or 0)
+    else:
+        df = pd.read_csv(path, usecols=columns)
+    return apply_schema(df, dtypes)
+
+
+def table_columns(path: Path) -> list:
+    """
+    Column names of a table without reading its rows; a partitioned Parquet
+    directory with no parts has none
+    """
+    import pandas as pd
+
+    path = Path(path)
+    if is_parquet(path):
+        import pyarrow.parquet as pq
+
+        parts = sorted(path.glob("*.parquet")) if path.is_dir() else [path]
+        return pq.read_schema(parts[0]).names if parts else []
+    if path.suffix.lower() == ".xlsx":
+        return list(pd.read_excel(path, nrows=0).columns)
+    return list(pd.read_csv(path, nrows=0).columns)
+
+
+def iter_table_chunks(path: Path, chunk_rows: int, columns: list = None, dtypes: dict = None, sheet: str = None):
+    """
+    Stream a table in chunks of at most chunk_rows rows, so memory stays bounded
+    by the chunk size rather than the table size
+
+    Parquet files and partitioned directories are read batch by batch, CSV with
+    pandas' chunked reader and xlsx through openpyxl's read-only row iterator.
+
+    Args:
+        path (Path): Parquet file or directory, CSV or xlsx file
+        chunk_rows (int): Maximum rows per chunk
+        columns (list, optional): Only read these columns
+        dtypes (dict, optional): Schema dtypes applied to every chunk
+        sheet (str, optional): Worksheet of an xlsx file; the active one by default
+
+    Yields:
+        pd.DataFrame: The next chunk
+    """
+    import pandas as pd
+
+    path = Path(path)
+    if is_parquet(path):
+        import pyarrow.parquet as pq
+
+        parts = sorted(path.glob("*.parquet")) if path.is_dir() else [path]
+        for part in parts:
+            for batch in pq.ParquetFile(part).iter_batches(batch_size=chunk_rows, columns=columns):
+                yield apply_schema(batch.to_pandas(), dtypes)
+
+    elif path.suffix.lower() == ".xlsx":
+        from openpyxl import load_workbook
+
+        workbook = load_workbook(path, read_only=True, data_only=True)
+        try:
+            rows = (workbook[sheet] if sheet else workbook.active).iter_rows(values_only=True)
+            header = list(next(rows, ()))
+            chunk = []
+            for row in rows:
+                chunk.append(row)
+                if len(chunk) == chunk_rows:
+                    yield apply_schema(pd.DataFrame(chunk, columns=header)[columns or header], dtypes)
+                    chunk = []
+            if chunk:
+                yield apply_schema(pd.DataFrame(chunk, columns=header)[columns or header], dtypes)
+        finally:
+            workbook.close()
+
+    else:
+        for chunk in pd.read_csv(path, usecols=columns, chunksize=chunk_rows):
+            yield apply_schema(chunk, dtypes)
+
+
+def iter_frame_chunks(df, chunk_rows: int):
+    """
+    Yield views of an in-memory frame chunk_rows rows at a time, so code written
+    for iter_table_chunks can run on a frame another stage handed over
+    """
+    for start in range(0, len(df), chunk_rows):
+        yield df.iloc[start:start + chunk_rows]
+
+
+def _widen_schema(schema, df):
+    import pyarrow as pa
+
+    # Category codes and values get fixed widths so later chunks with more levels still fit
+    fields = []
+    for field in schema:
+        if pa.types.is_dictionary(field.type):
+            values = field.type.value_type
+            if len(df[field.name].cat.categories) == 0:
+                values = pa.large_string()
+            field = field.with_type(pa.dictionary(pa.int32(), values))
+        fields.append(field)
+    return pa.schema(fields, metadata=schema.metadata)
+
+
+def write_part(path: Path, df, schema=None):
+    """
+    Write one Parquet part of a partitioned table, cast to the table's Arrow schema
+
+    Args:
+        path (Path): Part file
+        df (pd.DataFrame): Rows of the part
+        schema (pa.Schema, optional): Schema of the table; derived from df for its first part
+
+    Returns:
+        pa.Schema: The schema the part was written with
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    path = Path(path)
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    if schema is None:
+        schema = _widen_schema(table.schema, df)
+    table = table.select(schema.names).cast(schema)
+    tmp_path = path.with_name(f".{path.name}.tmp.{os.getpid()}")
+    pq.write_table(table, tmp_path, compression="zstd")
+    os.replace(tmp_path, path)
+    return schema
+
+
+class PartitionedWriter:
+    """
+    Write a table as a directory of Parquet parts, one per chunk.
+
+    Every part is cast to the Arrow schema of the first, so the parts read
+    back as one table. Categorical columns get 32-bit codes and string levels
+    (even when the first chunk has no levels at all); other columns should be
+    typed through the schema dtypes, since their first chunk fixes their type.
+    The parts go to a temporary directory that replaces path on close(), so
+    readers never see a half-written table.
+
+    Usage:
+        with PartitionedWriter(path) as writer:
+            for chunk in chunks:
+                writer.write(chunk)
+    """
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.tmp_path = self.path.with_name(f".{self.path.name}.tmp.{os.getpid()}")
+        self.schema = None
+        self.parts = 0
+        self.rows = 0
+        _remove(self.tmp_path)
+        os.makedirs(self.tmp_path)
+
+    def write(self, df):
+        if df.empty and self.parts:
+            return
+        self.schema = write_part(self.tmp_path / f"part-{self.parts:05d}.parquet", df, self.schema)
+        self.parts += 1
+        self.rows += len(df)
+
+    def close(self):
+        _remove(self.path)
+        os.replace(self.tmp_path, self.path)
+        return self.path
+
+    def abort(self):
+        _remove(self.tmp_path)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+
+def hash_split_mask(df, test_size: float, key_column: str = None, seed: int = 42):
+    """
+    Deterministic train/test assignment: a row is in the test set when the hash
+    of its key (or of the whole row, without key_column) falls in the lowest
+    test_size fraction of the hash space. The assignment of a row never depends
+    on the other rows, so it is stable across runs, chunkings and appended data.
+
+    Args:
+        df (pd.DataFrame): Rows to assign
+        test_size (float): Expected fraction of rows in the test set
+        key_column (str, optional): Column identifying a row, e.g. the student id
+        seed (int, optional): Changes the assignment. Defaults to 42.
+
+    Returns:
+        np.ndarray: Boolean mask, True for test rows
+    """
+    import pandas as pd
+
+    keys = df[[key_column]] if key_column and key_column in df.columns else df
+    hashes = pd.util.hash_pandas_object(keys, index=False, hash_key=f"{seed:016d}"[-16:]).to_numpy()
+    return (hashes >> 11) / float(1 << 53) < test_size
@@ -1,18 +1,17 @@
 import os
 import sys
 import yaml
-import joblib
 import json
 from pathlib import Path
 from typing import Any
 from box import ConfigBox
 from box.exceptions import BoxValueError
 from ensure import ensure_annotations
-import pandas as pd
-import numpy as np
-from sklearn.metrics import mean_squared_error, mean_absolute_error, r2_score
 from src.student_performance import logger
 
+# joblib and sklearn are imported inside the functions that use them so that
+# reading config.yaml does not pay for them at startup
+
 @ensure_annotations
 def read_yaml(path_to_yaml: Path) -> ConfigBox:
     """
@@ -83,28 +82,45 @@ def load_json(path: Path) -> ConfigBox:
     logger.info(f"json file loaded successfully from: {path}")
     return ConfigBox(content)
 
-def save_bin(data: Any, path: Path):
+def save_bin(data: Any, path: Path, compress: int = 0):
     """
     Save binary file
     
+    The file is written next to its destination and renamed into place, so
+    readers (including processes that memory-map the old file) never see a
+    partially written artifact. With compress=0 NumPy arrays are stored
+    uncompressed and aligned, which lets load_bin memory-map them.
+    
     Args:
         data (Any): Data to be saved as binary
         path (Path): Path to binary file
+        compress (int, optional): joblib compression level. Defaults to 0.
     """
-    joblib.dump(value=data, filename=path)
+    tmp_path = f"{path}.tmp.{os.getpid()}"
+    try:
+        import joblib
+        joblib.dump(value=data, filename=tmp_path, compress=compress)
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
     logger.info(f"binary file saved at: {path}")
 
-def load_bin(path: Path) -> Any:
+def load_bin(path: Path, mmap_mode: str = None) -> Any:
     """
     Load binary data
     
     Args:
         path (Path): Path to binary file
+        mmap_mode (str, optional): "r" or "c" to memory-map the NumPy arrays of an
+            uncompressed file instead of copying them. "c" is copy-on-write, so the
+            pages stay shared between processes until one of them writes. Defaults to None.
         
     Returns:
         Any: Object stored in the file
     """
-    data = joblib.load(path)
+    import joblib
+    data = joblib.load(path, mmap_mode=mmap_mode)
     logger.info(f"binary file loaded from: {path}")
     return data
 
@@ -122,10 +138,19 @@ def get_size(path: Path) -> str:
     size_in_kb = round(os.path.getsize(path)/1024)
     return f"~ {size_in_kb} KB"
 
-def evaluate_models(X_train, y_train, X_test, y_test, models, param):
+def evaluate_models(X_train, y_train, X_test, y_test, models, param, n_jobs=None):
     """
     Evaluate multiple models and return their performance metrics
     
+    Every (model, parameter candidate, CV fold) fit of the 3-fold grid search
+    is scheduled on one process pool, so slow grids no longer serialise the
+    rest. n_estimators sweeps of ensembles are fitted once at the largest
+    size and scored from staged predictions. Large feature arrays are
+    memory-mapped read-only into the workers instead of being copied per
+    task. The best candidate of each model is refitted once on the full
+    training set and stored back into models. Candidate selection follows
+    GridSearchCV, so the report matches the serial search.
+    
     Args:
         X_train: Training features
         y_train: Training target
@@ -133,34 +158,61 @@ def evaluate_models(X_train, y_train, X_test, y_test, models, param):
         y_test: Test target
         models: Dictionary of models
         param: Dictionary of parameters for each model
+        n_jobs (int, optional): Worker processes; -1 uses every core, None or 1 runs serially
         
     Returns:
         dict: Model performance report
     """
     try:
+        import numpy as np
+        from joblib import Parallel, delayed
+        from sklearn.base import clone, is_classifier
+        from sklearn.model_selection import ParameterGrid, check_cv
+        from src.student_performance.utils.model_search import fit_and_score_group, refit_and_score, staging_groups
+
+        candidates = {name: list(ParameterGrid(param[name])) for name in models}
+        folds = {
+            name: list(check_cv(3, y_train, classifier=is_classifier(model)).split(X_train, y_train))
+            for name, model in models.items()
+        }
+        # Candidates differing only in n_estimators share one fit at the largest size
+        tasks = [
+            (name, group, train_index, test_index)
+            for name in models
+            for group in staging_groups(models[name], candidates[name])
+            for train_index, test_index in folds[name]
+        ]
+        logger.info(f"Grid search: {len(tasks)} fits over {len(models)} models with n_jobs={n_jobs}")
+
+        with Parallel(n_jobs=n_jobs, mmap_mode="r") as parallel:
+            scores = parallel(
+                delayed(fit_and_score_group)(clone(models[name]), [candidates[name][index] for index in group],
+                                             X_train, y_train, train_index, test_index)
+                for name, group, train_index, test_index in tasks
+            )
+
+            fold_scores = {name: [[] for _ in candidates[name]] for name in models}
+            for (name, group, _, _), group_scores in zip(tasks, scores):
+                for index, (score, _) in zip(group, group_scores):
+                    fold_scores[name][index].append(score)
+
+            best_params = {}
+            for name in models:
+                mean_scores = np.array([np.mean(s) for s in fold_scores[name]])
+                if np.isnan(mean_scores).all():
+                    raise ValueError(f"All {len(candidates[name]) * len(folds[name])} fits failed for {name}")
+                # First candidate with the highest mean, as GridSearchCV ranks ties
+                best_params[name] = candidates[name][int(np.argmax(np.nan_to_num(mean_scores, nan=-np.inf)))]
+
+            refits = parallel(
+                delayed(refit_and_score)(clone(model), best_params[name], X_train, y_train, X_test, y_test)
+                for name, model in models.items()
+            )
+
         report = {}
-        
-        for i in range(len(list(models))):
-            model = list(models.values())[i]
-            para = param[list(models.keys())[i]]
-            
-            # Hyperparameter tuning using GridSearchCV
-            from sklearn.model_selection import GridSearchCV
-            gs = GridSearchCV(model, para, cv=3)
-            gs.fit(X_train, y_train)
-            
-            model.set_params(**gs.best_params_)
-            model.fit(X_train, y_train)
-            
-            # Make predictions
-            y_train_pred = model.predict(X_train)
-            y_test_pred = model.predict(X_test)
-            
-            # Calculate metrics
-            train_model_score = r2_score(y_train, y_train_pred)
-            test_model_score = r2_score(y_test, y_test_pred)
-            
-            report[list(models.keys())[i]] = test_model_score
+        for name, (estimator, test_model_score) in zip(list(models), refits):
+            models[name] = estimator
+            report[name] = test_model_score
             
         return report
     
@@ -0,0 +1,175 @@
+import math
+
+import numpy as np
+
+from src.student_performance import logger
+
+
+def _is_missing(value):
+    return value is None or (isinstance(value, float) and math.isnan(value))
+
+
+def _steps(transformer):
+    from sklearn.pipeline import Pipeline
+    if isinstance(transformer, Pipeline):
+        return [step for _, step in transformer.steps]
+    return [transformer]
+
+
+class CompiledPreprocessor:
+    """
+    Flat NumPy form of the fitted ColumnTransformer built in DataTransformation.
+
+    Numerical columns keep their imputation medians and StandardScaler
+    mean/scale vectors. Categorical columns become a lookup table from each
+    category value to its output position and its already-scaled one-hot
+    value, so a single record is encoded without building a DataFrame.
+    """
+    def __init__(self, n_features, numerical_columns, numerical_fill, numerical_mean, numerical_scale,
+                 numerical_positions, categorical_columns, categorical_fill, categorical_lookup):
+        self.n_features = n_features
+        self.numerical_columns = numerical_columns
+        self.numerical_fill = numerical_fill
+        self.numerical_mean = numerical_mean
+        self.numerical_scale = numerical_scale
+        self.numerical_positions = numerical_positions
+        self.categorical_columns = categorical_columns
+        self.categorical_fill = categorical_fill
+        self.categorical_lookup = categorical_lookup
+
+    @classmethod
+    def from_column_transformer(cls, preprocessor):
+        """
+        Compile a fitted ColumnTransformer made of imputer/scaler and imputer/one-hot/scaler pipelines
+
+        Raises:
+            ValueError: If the transformer uses steps this compiler does not support
+        """
+        # The fitted preprocessor already loaded sklearn, so these imports are free here
+        from sklearn.impute import SimpleImputer
+        from sklearn.preprocessing import OneHotEncoder, StandardScaler
+
+        numerical_columns, numerical_fill, numerical_mean, numerical_scale, numerical_positions = [], [], [], [], []
+        categorical_columns, categorical_fill, categorical_lookup = [], [], []
+        offset = 0
+
+        for name, transformer, columns in preprocessor.transformers_:
+            if transformer == "drop" or len(columns) == 0:
+                continue
+            if transformer == "passthrough":
+                raise ValueError(f"Passthrough block '{name}' is not supported")
+
+            steps = _steps(transformer)
+            imputer = next((s for s in steps if isinstance(s, SimpleImputer)), None)
+            encoder = next((s for s in steps if isinstance(s, OneHotEncoder)), None)
+            scaler = next((s for s in steps if isinstance(s, StandardScaler)), None)
+            if len([s for s in (imputer, encoder, scaler) if s is not None]) != len(steps):
+                raise ValueError(f"Block '{name}' contains unsupported steps: {steps}")
+
+            if encoder is None:
+                count = len(columns)
+                fill = imputer.statistics_ if imputer is not None else np.full(count, np.nan)
+                mean = scaler.mean_ if scaler is not None and scaler.with_mean else np.zeros(count)
+                scale = scaler.scale_ if scaler is not None and scaler.with_std else np.ones(count)
+
+                numerical_columns.extend(columns)
+                numerical_fill.extend(fill)
+                numerical_mean.extend(mean)
+                numerical_scale.extend(scale)
+                numerical_positions.extend(range(offset, offset + count))
+                offset += count
+                continue
+
+            if encoder.drop_idx_ is not None or getattr(encoder, "_infrequent_enabled", False):
+                raise ValueError(f"Block '{name}' uses dropped or infrequent categories")
+            if scaler is not None and scaler.with_mean:
+                raise ValueError(f"Block '{name}' centers one-hot columns, which is not supported")
+
+            width = sum(len(categories) for categories in encoder.categories_)
+            scale = scaler.scale_ if scaler is not None and scaler.with_std else np.ones(width)
+
+            position = 0
+            for index, (column, categories) in enumerate(zip(columns, encoder.categories_)):
+                categorical_columns.append(column)
+                categorical_fill.append(imputer.statistics_[index] if imputer is not None else None)
+                categorical_lookup.append({
+                    category: (offset + position + k, 1.0 / scale[position + k])
+                    for k, category in enumerate(categories)
+                })
+                position += len(categories)
+            offset += width
+
+        return cls(
+            n_features=offset,
+            numerical_columns=numerical_columns,
+            numerical_fill=np.asarray(numerical_fill, dtype=np.float64),
+            numerical_mean=np.asarray(numerical_mean, dtype=np.float64),
+            numerical_scale=np.asarray(numerical_scale, dtype=np.float64),
+            numerical_positions=np.asarray(numerical_positions, dtype=np.intp),
+            categorical_columns=categorical_columns,
+            categorical_fill=categorical_fill,
+            categorical_lookup=categorical_lookup,
+        )
+
+    def transform_record(self, record, out: np.ndarray = None) -> np.ndarray:
+        """
+        Encode one raw record into a feature vector
+
+        Args:
+            record: Anything with a dict-like get(column), e.g. a dict or PredictionRecord
+            out (np.ndarray, optional): Zeroed row to fill in place
+        """
+        row = np.zeros(self.n_features, dtype=np.float64) if out is None else out
+
+        # None becomes NaN under a float64 dtype
+        values = np.array([record.get(column) for column in self.numerical_columns], dtype=np.float64)
+        missing = np.isnan(values)
+        if missing.any():
+            values[missing] = self.numerical_fill[missing]
+        row[self.numerical_positions] = (values - self.numerical_mean) / self.numerical_scale
+
+        for column, fill, lookup in zip(self.categorical_columns, self.categorical_fill, self.categorical_lookup):
+            value = record.get(column)
+            if _is_missing(value):
+                value = fill
+            hit = lookup.get(value)
+            # Unknown categories encode as all zeros, like handle_unknown='ignore'
+            if hit is not None:
+                row[hit[0]] = hit[1]
+
+        return row
+
+    def transform_records(self, records) -> np.ndarray:
+        """
+        Encode a list of raw records into one contiguous 2D feature matrix
+        """
+        matrix = np.zeros((len(records), self.n_features), dtype=np.float64)
+        for row, record in zip(matrix, records):
+            self.transform_record(record, out=row)
+        return matrix
+
+    def verify(self, preprocessor, frame, atol: float = 1e-9, max_rows: int = 1000):
+        """
+        Check the compiled encoding against preprocessor.transform on a DataFrame
+
+        The compiled path runs row by row in Python, so only a fixed random
+        sample of at most max_rows rows is checked; max_rows=None checks them all.
+
+        Raises:
+            ValueError: If any element differs by more than atol
+        """
+        if max_rows is not None and len(frame) > max_rows:
+            frame = frame.sample(n=max_rows, random_state=0)
+        expected = preprocessor.transform(frame)
+        if hasattr(expected, "toarray"):
+            expected = expected.toarray()
+        actual = self.transform_records(frame.to_dict("records"))
+
+        if expected.shape != actual.shape:
+            raise ValueError(f"Compiled preprocessor shape {actual.shape} != {expected.shape}")
+        max_error = float(np.max(np.abs(expected - actual))) if expected.size else 0.0
+        if max_error > atol:
+            raise ValueError(f"Compiled preprocessor deviates from sklearn by {max_error}")
+
+        logger.info(f"Compiled preprocessor verified on {len(frame)} rows (max error {max_error:.2e})")
+        return max_error
@@ -0,0 +1,112 @@
+import numpy as np
+
+from src.student_performance import logger
+from src.student_performance.utils.compiled_preprocessor import CompiledPreprocessor, _is_missing
+
+LINEAR_MODELS = ("LinearRegression", "ElasticNet", "Ridge", "Lasso", "LassoLars", "BayesianRidge", "SGDRegressor")
+
+
+class FoldedLinearModel:
+    """
+    Preprocessor and linear model folded into one weighted sum.
+
+    StandardScaler means/scales are folded into per-numeric-feature weights
+    and a constant offset, and every one-hot column (already divided by its
+    scale) becomes an additive contribution per category value. A prediction
+    is one dot product plus one dict lookup per categorical column.
+    """
+    def __init__(self, intercept, numerical_columns, numerical_weights, numerical_mean, numerical_fill,
+                 categorical_columns, categorical_fill, categorical_contributions):
+        self.intercept = float(intercept)
+        self.numerical_columns = numerical_columns
+        self.numerical_weights = numerical_weights
+        self.numerical_mean = numerical_mean
+        self.numerical_fill = numerical_fill
+        self.categorical_columns = categorical_columns
+        self.categorical_fill = categorical_fill
+        self.categorical_contributions = categorical_contributions
+        # intercept + w . (x - mean) == (intercept - w . mean) + w . x
+        self.offset = self.intercept - float(numerical_weights @ numerical_mean)
+
+    @classmethod
+    def from_pipeline(cls, preprocessor, model):
+        """
+        Fold a fitted ColumnTransformer and single-output linear model
+
+        Raises:
+            ValueError: If the model is not linear or the preprocessor cannot be compiled
+        """
+        if type(model).__name__ not in LINEAR_MODELS:
+            raise ValueError(f"{type(model).__name__} is not a supported linear model")
+
+        coef = np.ravel(model.coef_).astype(np.float64)
+        intercept = float(np.ravel(model.intercept_)[0]) if np.ndim(model.intercept_) else float(model.intercept_)
+
+        compiled = preprocessor if isinstance(preprocessor, CompiledPreprocessor) \
+            else CompiledPreprocessor.from_column_transformer(preprocessor)
+        if len(coef) != compiled.n_features:
+            raise ValueError(f"Model has {len(coef)} coefficients for {compiled.n_features} features")
+
+        numerical_weights = coef[compiled.numerical_positions] / compiled.numerical_scale
+        categorical_contributions = [
+            {category: float(coef[position] * value) for category, (position, value) in lookup.items()}
+            for lookup in compiled.categorical_lookup
+        ]
+
+        logger.info(f"Folded {type(model).__name__} into {len(numerical_weights)} numeric weights "
+                    f"and {sum(len(c) for c in categorical_contributions)} category contributions")
+        return cls(
+            intercept=intercept,
+            numerical_columns=compiled.numerical_columns,
+            numerical_weights=numerical_weights,
+            numerical_mean=compiled.numerical_mean,
+            numerical_fill=compiled.numerical_fill,
+            categorical_columns=compiled.categorical_columns,
+            categorical_fill=compiled.categorical_fill,
+            categorical_contributions=categorical_contributions,
+        )
+
+    def _numerical_values(self, record):
+        values = np.array([record.get(column) for column in self.numerical_columns], dtype=np.float64)
+        missing = np.isnan(values)
+        if missing.any():
+            values[missing] = self.numerical_fill[missing]
+        return values
+
+    def _categorical_contributions(self, record):
+        for column, fill, contributions in zip(self.categorical_columns, self.categorical_fill,
+                                               self.categorical_contributions):
+            value = record.get(column)
+            if _is_missing(value):
+                value = fill
+            # Unknown categories contribute nothing, like handle_unknown='ignore'
+            yield column, contributions.get(value, 0.0)
+
+    def predict_record(self, record) -> float:
+        """
+        Predict one record given as a dict or PredictionRecord
+        """
+        total = self.offset + float(self.numerical_weights @ self._numerical_values(record))
+        for _, contribution in self._categorical_contributions(record):
+            total += contribution
+        return total
+
+    def predict_records(self, records) -> list:
+        return [self.predict_record(record) for record in records]
+
+    def explain_record(self, record) -> dict:
+        """
+        Per-feature additive contributions; they sum with the intercept to the prediction
+
+        Returns:
+            dict: intercept, prediction and a contribution per input column
+        """
+        numerical = self.numerical_weights * (self._numerical_values(record) - self.numerical_mean)
+        contributions = dict(zip(self.numerical_columns, numerical.tolist()))
+        contributions.update(self._categorical_contributions(record))
+
+        return {
+            "intercept": self.intercept,
+            "prediction": self.intercept + sum(contributions.values()),
+            "contributions": contributions,
+        }
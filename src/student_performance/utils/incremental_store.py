@@ -0,0 +1,179 @@
+import os
+from pathlib import Path
+
+from src.student_performance import logger
+from src.student_performance.utils.columnar_store import (read_table, write_table, write_part,
+                                                          _remove, PartitionedWriter)
+
+def row_hashes(df):
+    """
+    64-bit hash of every row's values (index excluded), used to tell changed rows
+    from unchanged ones without keeping the rows themselves
+    """
+    import pandas as pd
+
+    return pd.util.hash_pandas_object(df, index=False).to_numpy().view("int64")
+
+
+def _part_number(name: str) -> int:
+    return int(name[len("part-"):-len(".parquet")])
+
+
+class IncrementalStore:
+    """
+    Append-only partitioned Parquet table keyed by one column (e.g. the student id).
+
+    A key index (key, hash of the row, part holding it) is kept next to the
+    table. append() compares incoming rows with it and writes only new rows
+    and rows whose values changed, as new parts; parts holding a superseded
+    version of a row are rewritten without it. Keys missing from the incoming
+    data are kept, so the table only ever grows.
+
+    The index is the commit point: parts it does not reference are leftovers of
+    an interrupted run and are deleted at the start of the next one, and parts
+    it stops referencing are deleted only once the new index is in place.
+
+    Usage:
+        store = IncrementalStore(data_dir, index_path, key_column="id")
+        summary = store.append(chunks, delta_path)
+    """
+    def __init__(self, path: Path, index_path: Path, key_column: str):
+        self.path = Path(path)
+        self.index_path = Path(index_path)
+        self.key_column = key_column
+
+    def load_index(self):
+        import pandas as pd
+
+        if self.index_path.exists() and self.path.is_dir():
+            return read_table(self.index_path)
+        # Without an index the table's rows are unknown, so start over
+        if self.path.exists():
+            logger.info(f"No key index for {self.path}, rebuilding it from scratch")
+            _remove(self.path)
+        return pd.DataFrame({"key": pd.Series(dtype="int64"), "row_hash": pd.Series(dtype="int64"),
+                             "part": pd.Series(dtype="int64")})
+
+    def _part_path(self, part: int) -> Path:
+        return self.path / f"part-{part:05d}.parquet"
+
+    def _remove_strays(self, index) -> set:
+        live = set(index["part"].unique().tolist())
+        for name in os.listdir(self.path):
+            stray = name.startswith(".") or (name.startswith("part-") and _part_number(name) not in live)
+            if stray:
+                logger.info(f"Removing {name}, left behind by an interrupted ingestion")
+                _remove(self.path / name)
+        return live
+
+    def append(self, chunks, delta_path: Path = None) -> dict:
+        """
+        Add the new and changed rows of chunks to the table
+
+        Args:
+            chunks (iterable of pd.DataFrame): The full source, in chunks; when a
+                key is repeated its last row wins
+            delta_path (Path, optional): Also write the added rows here, as a
+                partitioned table downstream stages can read on their own
+
+        Returns:
+            dict: Counts of new, changed and unchanged rows, and the table's rows and parts
+        """
+        import numpy as np
+        import pandas as pd
+        import pyarrow.parquet as pq
+
+        index = self.load_index()
+        os.makedirs(self.path, exist_ok=True)
+        live = self._remove_strays(index)
+        next_part = max(live) + 1 if live else 0
+        schema = pq.read_schema(self._part_path(min(live))) if live else None
+
+        counts = {"new": 0, "changed": 0, "unchanged": 0}
+        superseded = {}
+        delta = PartitionedWriter(delta_path) if delta_path is not None else None
+        if delta is not None:
+            delta.schema = schema
+        try:
+            for chunk in chunks:
+                chunk = chunk.drop_duplicates(self.key_column, keep="last")
+                keys = chunk[self.key_column].to_numpy()
+                hashes = row_hashes(chunk)
+
+                position = pd.Index(index["key"]).get_indexer(keys)
+                known = position >= 0
+                changed = known.copy()
+                changed[known] = index["row_hash"].to_numpy()[position[known]] != hashes[known]
+                added = ~known | changed
+                counts["new"] += int((~known).sum())
+                counts["changed"] += int(changed.sum())
+                counts["unchanged"] += int((known & ~changed).sum())
+                if not added.any():
+                    continue
+
+                rows = chunk[added]
+                schema = write_part(self._part_path(next_part), rows, schema)
+                if delta is not None:
+                    delta.write(rows)
+
+                for part, key in zip(index["part"].to_numpy()[position[changed]], keys[changed]):
+                    superseded.setdefault(int(part), set()).add(key)
+                index.loc[position[changed], ["row_hash", "part"]] = np.column_stack(
+                    [hashes[changed], np.full(changed.sum(), next_part)])
+                index = pd.concat([index, pd.DataFrame({"key": keys[~known], "row_hash": hashes[~known],
+                                                        "part": next_part})], ignore_index=True)
+                next_part += 1
+
+            # Rewrite the parts that hold superseded rows under new numbers
+            for part, keys in superseded.items():
+                kept = read_table(self._part_path(part))
+                kept = kept[~kept[self.key_column].isin(keys)]
+                if kept.empty:
+                    continue
+                write_part(self._part_path(next_part), kept, schema)
+                index.loc[index["part"] == part, "part"] = next_part
+                next_part += 1
+
+            if delta is not None:
+                if not delta.parts and schema is not None:
+                    # Nothing changed: an empty delta with the table's columns
+                    delta.write(schema.empty_table().to_pandas())
+                delta.close()
+                delta = None
+        finally:
+            if delta is not None:
+                delta.abort()
+
+        if superseded or counts["new"] or counts["changed"] or not self.index_path.exists():
+            write_table(index, self.index_path)
+        for part in superseded:
+            _remove(self._part_path(part))
+
+        summary = {**counts, "rows": len(index), "parts": int(index["part"].nunique())}
+        logger.info(f"Appended {counts['new']} new and {counts['changed']} changed rows to {self.path} "
+                    f"({counts['unchanged']} unchanged); it now holds {summary['rows']} rows "
+                    f"in {summary['parts']} parts")
+        return summary
+
+    def unchanged(self, source_rows: int, delta_path: Path = None) -> dict:
+        """
+        What append() returns for a source known to be unchanged, without reading it
+
+        Args:
+            source_rows (int): Rows of the source, all of them unchanged
+            delta_path (Path, optional): Replace the delta here with an empty one
+                that has the table's columns
+
+        Returns:
+            dict: The same counts as append()
+        """
+        import pyarrow.parquet as pq
+
+        index = read_table(self.index_path)
+        if delta_path is not None:
+            schema = pq.read_schema(self._part_path(int(index["part"].min())))
+            with PartitionedWriter(delta_path) as delta:
+                delta.schema = schema
+                delta.write(schema.empty_table().to_pandas())
+        return {"new": 0, "changed": 0, "unchanged": source_rows, "rows": len(index),
+                "parts": int(index["part"].nunique())}
@@ -0,0 +1,308 @@
+import time
+import weakref
+import threading
+from bisect import bisect_left
+from contextlib import contextmanager
+
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+# Label used for stages timed outside a request, e.g. in the micro-batching thread
+BACKGROUND_ROUTE = "background"
+
+
+class _Shard:
+    """
+    Counters owned by one thread. Only the owning thread writes to it, so the
+    hot path takes no lock; the scraper merges all shards when rendering.
+    """
+    __slots__ = ("route", "error", "requests", "errors", "in_flight", "histograms")
+
+    def __init__(self):
+        self.route = None
+        self.error = False
+        self.requests = {}
+        self.errors = {}
+        self.in_flight = {}
+        self.histograms = {}
+
+    def merge_into(self, other):
+        for key, value in self.requests.items():
+            other.requests[key] = other.requests.get(key, 0) + value
+        for key, value in self.errors.items():
+            other.errors[key] = other.errors.get(key, 0) + value
+        for key, value in self.in_flight.items():
+            other.in_flight[key] = other.in_flight.get(key, 0) + value
+        for key, value in self.histograms.items():
+            merged = other.histograms.setdefault(key, [0] * len(value))
+            for i, count in enumerate(value):
+                merged[i] += count
+
+
+class _ThreadToken:
+    """Lives in a thread's local storage; collected when the thread exits"""
+    __slots__ = ("__weakref__",)
+
+
+class LatencyMetrics:
+    """
+    Per-route request counters, error counters, in-flight gauges and latency
+    histograms (whole request and per stage) rendered in the Prometheus text format.
+
+    Each thread aggregates into its own shard, so recording a sample is a few
+    dict updates with no lock. When a thread exits its shard is folded into
+    one shared shard and dropped, so a thread-per-request server does not
+    accumulate shards. Under gunicorn every worker process reports its own
+    numbers; the scraper sums them per instance.
+    """
+    def __init__(self, prefix: str = "student_performance", buckets: tuple = DEFAULT_BUCKETS):
+        self.prefix = prefix
+        self.buckets = tuple(buckets)
+        self._local = threading.local()
+        # Reentrant: a finalizer may retire a shard in a thread that holds the lock
+        self._lock = threading.RLock()
+        self._shards = []
+        self._retired = _Shard()
+
+    def _shard(self) -> _Shard:
+        shard = getattr(self._local, "shard", None)
+        if shard is None:
+            shard = _Shard()
+            self._local.shard = shard
+            self._local.token = _ThreadToken()
+            weakref.finalize(self._local.token, self._retire, shard)
+            with self._lock:
+                self._shards.append(shard)
+        return shard
+
+    def _retire(self, shard):
+        # The owning thread has exited, so nothing writes to the shard any more
+        with self._lock:
+            if any(s is shard for s in self._shards):
+                self._shards = [s for s in self._shards if s is not shard]
+                shard.merge_into(self._retired)
+
+    def _observe(self, shard, key, seconds):
+        histogram = shard.histograms.get(key)
+        if histogram is None:
+            # One counter per bucket plus +Inf, then the running sum
+            histogram = shard.histograms[key] = [0] * (len(self.buckets) + 1) + [0.0]
+        histogram[bisect_left(self.buckets, seconds)] += 1
+        histogram[-1] += seconds
+
+    def start_request(self, route: str) -> float:
+        """
+        Mark a request on route as in flight; returns the start time for end_request
+        """
+        shard = self._shard()
+        shard.route = route
+        shard.error = False
+        shard.in_flight[route] = shard.in_flight.get(route, 0) + 1
+        return time.perf_counter()
+
+    def end_request(self, route: str, start: float, status: int):
+        """
+        Record the latency and status of a request started with start_request
+        """
+        seconds = time.perf_counter() - start
+        shard = self._shard()
+        shard.in_flight[route] = shard.in_flight.get(route, 0) - 1
+        key = (route, str(status))
+        shard.requests[key] = shard.requests.get(key, 0) + 1
+        if status >= 500 or shard.error:
+            shard.errors[route] = shard.errors.get(route, 0) + 1
+        self._observe(shard, ("request", route, None), seconds)
+        shard.route = None
+        shard.error = False
+
+    def mark_error(self):
+        """
+        Count the current request as an error even if it returns a 2xx/4xx page
+        """
+        self._shard().error = True
+
+    def observe_stage(self, stage: str, seconds: float):
+        shard = self._shard()
+        self._observe(shard, ("stage", shard.route or BACKGROUND_ROUTE, stage), seconds)
+
+    @contextmanager
+    def stage(self, stage: str):
+        """
+        Time the enclosed block as a stage of the current request
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe_stage(stage, time.perf_counter() - start)
+
+    def _merged(self):
+        requests, errors, in_flight, histograms = {}, {}, {}, {}
+        with self._lock:
+            shards = list(self._shards)
+            retired = _Shard()
+            self._retired.merge_into(retired)
+        for shard in shards + [retired]:
+            # list() copies each dict in one step, so a concurrent insert cannot break iteration
+            for key, value in list(shard.requests.items()):
+                requests[key] = requests.get(key, 0) + value
+            for key, value in list(shard.errors.items()):
+                errors[key] = errors.get(key, 0) + value
+            for key, value in list(shard.in_flight.items()):
+                in_flight[key] = in_flight.get(key, 0) + value
+            for key, value in list(shard.histograms.items()):
+                merged = histograms.setdefault(key, [0] * len(value))
+                for i, count in enumerate(list(value)):
+                    merged[i] += count
+        return requests, errors, in_flight, histograms
+
+    def render(self) -> str:
+        """
+        Render every metric in the Prometheus text exposition format (version 0.0.4)
+        """
+        requests, errors, in_flight, histograms = self._merged()
+        p = self.prefix
+        lines = [
+            f"# HELP {p}_requests_total Requests handled, by route and HTTP status.",
+            f"# TYPE {p}_requests_total counter",
+        ]
+        for (route, status), value in sorted(requests.items()):
+            lines.append(f'{p}_requests_total{{route="{route}",status="{status}"}} {value}')
+
+        lines += [
+            f"# HELP {p}_request_errors_total Requests that failed or rendered an error page.",
+            f"# TYPE {p}_request_errors_total counter",
+        ]
+        for route, value in sorted(errors.items()):
+            lines.append(f'{p}_request_errors_total{{route="{route}"}} {value}')
+
+        lines += [
+            f"# HELP {p}_requests_in_flight Requests currently being handled.",
+            f"# TYPE {p}_requests_in_flight gauge",
+        ]
+        for route, value in sorted(in_flight.items()):
+            lines.append(f'{p}_requests_in_flight{{route="{route}"}} {value}')
+
+        for kind, help_text in (("request", "End-to-end request latency."),
+                                ("stage", "Latency of one stage of a request.")):
+            name = f"{p}_{kind}_duration_seconds"
+            lines += [f"# HELP {name} {help_text}", f"# TYPE {name} histogram"]
+            for (key_kind, route, stage), values in sorted(histograms.items(),
+                                                           key=lambda item: (item[0][1], item[0][2] or "")):
+                if key_kind != kind:
+                    continue
+                labels = f'route="{route}"' + (f',stage="{stage}"' if stage else "")
+                cumulative = 0
+                for bound, count in zip(self.buckets + (float("inf"),), values[:-1]):
+                    cumulative += count
+                    le = "+Inf" if bound == float("inf") else repr(bound)
+                    lines.append(f'{name}_bucket{{{labels},le="{le}"}} {cumulative}')
+                lines.append(f"{name}_sum{{{labels}}} {values[-1]}")
+                lines.append(f"{name}_count{{{labels}}} {cumulative}")
+
+        return "\n".join(lines) + "\n"
+
+    def reset(self):
+        """
+        Drop every recorded sample, e.g. after warm-up or between tests. The
+        in-flight gauges are kept: requests still running will end normally.
+        """
+        with self._lock:
+            for shard in self._shards + [self._retired]:
+                shard.requests.clear()
+                shard.errors.clear()
+                shard.histograms.clear()
+
+
+def render_family(name: str, kind: str, help_text: str, samples) -> list:
+    """
+    Lines of one metric family in the text format
+
+    Args:
+        name (str): Metric name, prefix included
+        kind (str): counter, gauge or histogram
+        help_text (str): HELP line
+        samples (iterable): (suffix, labels dict, value); the suffix (e.g. "_bucket")
+            is appended to name
+
+    Returns:
+        list: HELP, TYPE and one line per sample
+    """
+    lines = [f"# HELP {name} {help_text}", f"# TYPE {name} {kind}"]
+    for suffix, labels, value in samples:
+        label_text = ",".join(f'{key}="{label}"' for key, label in labels.items())
+        lines.append(f"{name}{suffix}{{{label_text}}} {value}" if label_text else f"{name}{suffix} {value}")
+    return lines
+
+
+def render_micro_batching(stats: dict, prefix: str = "student_performance") -> str:
+    """
+    MicroBatcher.stats() in the text format: the batch-size distribution as a
+    histogram with power-of-two buckets up to the maximum batch size, the
+    queueing delay and the current window
+
+    Returns:
+        str: The lines, newline-terminated
+    """
+    p = f"{prefix}_micro_batch"
+    bounds = sorted({2 ** i for i in range(stats["max_batch_size"].bit_length())} | {stats["max_batch_size"]})
+    buckets = [("_bucket", {"le": bound}, sum(count for size, count in stats["batch_size_histogram"].items()
+                                              if size <= bound)) for bound in bounds]
+    buckets += [("_bucket", {"le": "+Inf"}, stats["batches"]), ("_sum", {}, stats["requests"]),
+                ("_count", {}, stats["batches"])]
+    lines = render_family(f"{p}_size", "histogram", "Records per micro-batch.", buckets)
+    lines += render_family(f"{p}_queue_delay_seconds_total", "counter",
+                           "Time records spent queued before their batch started.",
+                           [("", {}, stats["queue_delay_seconds_total"])])
+    lines += render_family(f"{p}_queue_delay_max_seconds", "gauge", "Longest time a record spent queued.",
+                           [("", {}, stats["max_queue_delay_ms"] / 1000)])
+    lines += render_family(f"{p}_window_seconds", "gauge", "Current wait for stragglers before a batch runs.",
+                           [("", {}, stats["window_ms"] / 1000)])
+    return "\n".join(lines) + "\n"
+
+
+def render_prediction_cache(stats: dict, prefix: str = "student_performance") -> str:
+    """
+    PredictionCache.stats() in the text format: lookups by result, size, hit
+    rate, and entries dropped by eviction, expiry and version changes
+
+    Returns:
+        str: The lines, newline-terminated
+    """
+    p = f"{prefix}_prediction_cache"
+    lines = render_family(f"{p}_lookups_total", "counter", "Prediction cache lookups, by result.",
+                          [("", {"result": "hit"}, stats["hits"]), ("", {"result": "miss"}, stats["misses"])])
+    lines += render_family(f"{p}_hit_ratio", "gauge", "Share of lookups answered from the cache.",
+                           [("", {}, stats["hit_rate"])])
+    lines += render_family(f"{p}_entries", "gauge", "Predictions currently cached.", [("", {}, stats["size"])])
+    lines += render_family(f"{p}_max_entries", "gauge", "Capacity of the cache.", [("", {}, stats["max_entries"])])
+    for name, help_text in (("evictions", "Least recently used entries dropped to stay within capacity."),
+                            ("expirations", "Entries dropped because they outlived the time-to-live."),
+                            ("invalidations", "Times the whole cache was dropped for a new artifact version.")):
+        lines += render_family(f"{p}_{name}_total", "counter", help_text, [("", {}, stats[name])])
+    return "\n".join(lines) + "\n"
+
+
+def render_artifact_cache(stats: dict, prefix: str = "student_performance") -> str:
+    """
+    ArtifactCache.stats() in the text format: lookups by result, reloads and
+    failed reloads, the last reload's duration and the loaded versions
+
+    Returns:
+        str: The lines, newline-terminated
+    """
+    p = f"{prefix}_artifact_cache"
+    lines = render_family(f"{p}_lookups_total", "counter", "Model artifact lookups, by result.",
+                          [("", {"result": "hit"}, stats["hits"]), ("", {"result": "miss"}, stats["misses"])])
+    lines += render_family(f"{p}_reloads_total", "counter", "Model artifacts loaded from disk.",
+                           [("", {}, stats["reloads"])])
+    lines += render_family(f"{p}_reload_failures_total", "counter",
+                           "Reloads that failed while an older version kept serving.",
+                           [("", {}, stats["reload_failures"])])
+    lines += render_family(f"{p}_last_reload_seconds", "gauge", "Time the last reload took.",
+                           [("", {}, stats["last_reload_seconds"])])
+    lines += render_family(f"{p}_version_info", "gauge", "Artifact versions currently loaded.",
+                           [("", {"version": version}, 1) for version in stats["versions"]])
+    return "\n".join(lines) + "\n"
+
+
+metrics = LatencyMetrics()
@@ -0,0 +1,397 @@
+import math
+import time
+
+import numpy as np
+
+from src.student_performance import logger
+
+# Ensembles whose smaller n_estimators predictions can be read off one larger fit
+STAGED_MODELS = ("RandomForestRegressor", "ExtraTreesRegressor", "GradientBoostingRegressor",
+                 "AdaBoostRegressor", "XGBRegressor")
+
+# Boosted models that can stop early, and the parameter holding their number of rounds
+BOOSTED_ROUNDS = {
+    "GradientBoostingRegressor": "n_estimators",
+    "XGBRegressor": "n_estimators",
+    "CatBoostRegressor": "iterations",
+}
+
+
+class _ValidationMonitor:
+    """
+    GradientBoostingRegressor.fit monitor: adds each new stage's predictions on
+    a held-out split and stops the fit once their squared error has not improved
+    for patience stages. best_round is the stage with the lowest error, the
+    counterpart of XGBoost's and CatBoost's best iteration.
+    """
+    def __init__(self, X_val, y_val, patience: int):
+        self.X_val = X_val
+        self.y_val = y_val
+        self.patience = patience
+        self.predictions = None
+        self.best_loss = math.inf
+        self.best_round = 0
+
+    def __call__(self, i, estimator, _locals) -> bool:
+        if self.predictions is None:
+            self.predictions = (np.zeros(len(self.y_val)) if estimator.init_ == "zero"
+                                else estimator.init_.predict(self.X_val).astype(float))
+        self.predictions += estimator.learning_rate * estimator.estimators_[i, 0].predict(self.X_val)
+        loss = float(np.mean((self.y_val - self.predictions) ** 2))
+        if loss < self.best_loss:
+            self.best_loss, self.best_round = loss, i + 1
+        return i + 1 - self.best_round >= self.patience
+
+
+def _keep_stages(estimator, rounds: int):
+    """Drop the stages of a fitted GradientBoostingRegressor after the first rounds"""
+    estimator.estimators_ = estimator.estimators_[:rounds]
+    estimator.train_score_ = estimator.train_score_[:rounds]
+    for name in ("oob_improvement_", "oob_scores_"):
+        if hasattr(estimator, name):
+            setattr(estimator, name, getattr(estimator, name)[:rounds])
+    estimator.n_estimators_ = rounds
+
+
+def fit_estimator(estimator, X, y, early_stopping: dict = None):
+    """
+    Fit estimator, stopping boosted models once a held-out validation split stops improving
+
+    Args:
+        early_stopping (dict, optional): validation_fraction, patience and random_state;
+            None fits every model for its full number of rounds
+
+    Returns:
+        int: Rounds up to the best validation score, which the fitted model keeps,
+            or None when early stopping did not apply
+    """
+    name = type(estimator).__name__
+    # Parallel CatBoost fits would otherwise all write to the same catboost_info directory
+    if name == "CatBoostRegressor":
+        estimator.set_params(allow_writing_files=False)
+
+    if not early_stopping or name not in BOOSTED_ROUNDS:
+        estimator.fit(X, y)
+        return None
+
+    from sklearn.model_selection import train_test_split
+
+    X_fit, X_val, y_fit, y_val = train_test_split(
+        X, y, test_size=early_stopping["validation_fraction"], random_state=early_stopping["random_state"])
+    if name == "GradientBoostingRegressor":
+        # n_iter_no_change would keep the patience rounds after the best one; stop on
+        # the same split as the other boosters and keep only the stages up to the best
+        monitor = _ValidationMonitor(X_val, y_val, early_stopping["patience"])
+        estimator.fit(X_fit, y_fit, monitor=monitor)
+        _keep_stages(estimator, monitor.best_round)
+        return monitor.best_round
+
+    if name == "XGBRegressor":
+        estimator.set_params(early_stopping_rounds=early_stopping["patience"])
+        estimator.fit(X_fit, y_fit, eval_set=[(X_val, y_val)], verbose=False)
+        return int(estimator.best_iteration) + 1
+
+    # CatBoost keeps the best iteration's trees when given an eval_set
+    estimator.fit(X_fit, y_fit, eval_set=(X_val, y_val), early_stopping_rounds=early_stopping["patience"],
+                  verbose=False)
+    return int(estimator.tree_count_)
+
+
+def fit_and_score(estimator, params, X, y, train_index, test_index, early_stopping: dict = None):
+    """
+    Fit one parameter candidate on one CV fold; failed fits score NaN like GridSearchCV
+
+    Returns:
+        tuple: (validation R2, rounds kept by early stopping or None)
+    """
+    try:
+        estimator.set_params(**params)
+        rounds = fit_estimator(estimator, X[train_index], y[train_index], early_stopping)
+        return estimator.score(X[test_index], y[test_index]), rounds
+    except Exception as e:
+        logger.warning(f"Fit failed for {type(estimator).__name__} with {params}: {str(e)}")
+        return float("nan"), None
+
+
+def staged_predictions(estimator, X, sizes) -> dict:
+    """
+    Predictions of a fitted ensemble truncated to each size in sizes
+
+    Boosted sklearn models replay staged_predict, forests average a prefix of
+    their trees and XGBoost limits the iteration range. With a fixed
+    random_state each prefix equals a model fitted with that n_estimators.
+    Sizes beyond an early-stopped fit get the stopped model's predictions.
+    """
+    name = type(estimator).__name__
+    wanted = set(sizes)
+    predictions = {}
+
+    if name in ("GradientBoostingRegressor", "AdaBoostRegressor"):
+        last = None
+        for size, last in enumerate(estimator.staged_predict(X), start=1):
+            if size in wanted:
+                predictions[size] = last
+        # Boosting stopped early (perfect AdaBoost fit or early stopping), and so would every larger run
+        for size in wanted - predictions.keys():
+            predictions[size] = last
+
+    elif name in ("RandomForestRegressor", "ExtraTreesRegressor"):
+        # Sum tree by tree in fit order, like ForestRegressor.predict
+        totals = np.zeros(X.shape[0])
+        for size, tree in enumerate(estimator.estimators_, start=1):
+            totals += tree.predict(X, check_input=False) if X.dtype == np.float32 else tree.predict(X)
+            if size in wanted:
+                predictions[size] = totals / size
+
+    elif name == "XGBRegressor":
+        limit = estimator.best_iteration + 1 if estimator.get_params().get("early_stopping_rounds") else math.inf
+        for size in wanted:
+            predictions[size] = estimator.predict(X, iteration_range=(0, min(size, limit)))
+
+    else:
+        raise ValueError(f"{name} does not support staged predictions")
+    return predictions
+
+
+def staging_groups(model, candidates) -> list:
+    """
+    Group candidate indices that differ only in n_estimators so each group is fitted once
+    """
+    if type(model).__name__ not in STAGED_MODELS or not all("n_estimators" in c for c in candidates):
+        return [[index] for index in range(len(candidates))]
+
+    groups = {}
+    for index, candidate in enumerate(candidates):
+        key = tuple(sorted((k, repr(v)) for k, v in candidate.items() if k != "n_estimators"))
+        groups.setdefault(key, []).append(index)
+    return list(groups.values())
+
+
+def fit_and_score_group(estimator, candidates, X, y, train_index, test_index, early_stopping: dict = None) -> list:
+    """
+    Score candidates that differ only in n_estimators from one fit at the largest size
+
+    Returns:
+        list: (validation R2, rounds kept by early stopping or None) per candidate
+    """
+    if len(candidates) == 1:
+        return [fit_and_score(estimator, candidates[0], X, y, train_index, test_index, early_stopping)]
+
+    from sklearn.metrics import r2_score
+
+    sizes = [candidate["n_estimators"] for candidate in candidates]
+    largest = candidates[int(np.argmax(sizes))]
+    try:
+        estimator.set_params(**largest)
+        rounds = fit_estimator(estimator, X[train_index], y[train_index], early_stopping)
+        predictions = staged_predictions(estimator, X[test_index], sizes)
+        return [(r2_score(y[test_index], predictions[size]), None if rounds is None else min(size, rounds))
+                for size in sizes]
+    except Exception as e:
+        logger.warning(f"Fit failed for {type(estimator).__name__} with {largest}: {str(e)}")
+        return [(float("nan"), None)] * len(candidates)
+
+
+def timed_fit_and_score_group(*args, **kwargs):
+    """
+    fit_and_score_group plus the seconds it took, measured in the worker so
+    time spent queued behind other models' fits is not counted
+    """
+    start = time.perf_counter()
+    scores = fit_and_score_group(*args, **kwargs)
+    return scores, time.perf_counter() - start
+
+
+def refit_and_score(estimator, params, X_train, y_train, X_test, y_test):
+    """
+    Fit the chosen candidate on the full training set and score it on the test set
+    """
+    from sklearn.metrics import r2_score
+
+    estimator.set_params(**params)
+    fit_estimator(estimator, X_train, y_train)
+    return estimator, r2_score(y_test, estimator.predict(X_test))
+
+
+class _Trial:
+    __slots__ = ("params", "scores", "rounds", "fit_seconds", "finished_at")
+
+    def __init__(self, params):
+        self.params = params
+        self.scores = []
+        self.rounds = []
+        # Its share of fit seconds, and its model's fit seconds when its last score came in
+        self.fit_seconds = 0.0
+        self.finished_at = None
+
+    @property
+    def mean(self):
+        mean = float(np.mean(self.scores)) if self.scores else math.nan
+        return -math.inf if math.isnan(mean) else mean
+
+
+class SuccessiveHalvingSearch:
+    """
+    Budgeted hyperparameter search driven by params.yaml hyperparameter_tuning.
+
+    Up to n_trials candidates per model are sampled from its grid. CV folds
+    are the halving resource: every trial is scored on one fold, only the
+    best 1/eta are scored on more folds, and so on up to cv_folds. Hopeless
+    trials are therefore pruned after a single fit. All models share one
+    process pool per rung, and the search stops at the wall-clock timeout
+    with the best trial found so far.
+
+    With early_stopping, boosted candidates stop each fold's fit once a
+    validation split held out of that fold's training rows stops improving.
+    The winner is refitted on the full training set with the median of its
+    early-stopped round counts.
+    """
+    def __init__(self, cv_folds: int = 5, n_trials: int = 100, timeout: float = None,
+                 n_jobs: int = None, eta: int = 3, random_state: int = 42, early_stopping: dict = None):
+        self.cv_folds = cv_folds
+        self.n_trials = n_trials
+        self.timeout = timeout
+        self.n_jobs = n_jobs
+        self.eta = eta
+        self.random_state = random_state
+        self.early_stopping = None
+        if early_stopping:
+            self.early_stopping = dict(early_stopping, random_state=random_state)
+
+    def _rungs(self):
+        """Folds scored per surviving trial after each rung, e.g. [1, 3, 5] for 5 folds and eta=3"""
+        rungs, folds = [], 1
+        while folds < self.cv_folds:
+            rungs.append(folds)
+            folds *= self.eta
+        rungs.append(self.cv_folds)
+        return rungs
+
+    def _sample(self, grid):
+        from sklearn.model_selection import ParameterGrid, ParameterSampler
+
+        full = ParameterGrid(grid)
+        if len(full) <= self.n_trials:
+            return list(full)
+        return list(ParameterSampler(grid, n_iter=self.n_trials, random_state=self.random_state))
+
+    def run(self, X_train, y_train, X_test, y_test, models, param):
+        """
+        Search every model, refit each winner on the full training set and score it on the test set.
+        The refitted estimators are stored back into models.
+
+        Returns:
+            tuple: (report of test R2 per model, search statistics per model)
+        """
+        try:
+            from joblib import Parallel, delayed
+            from sklearn.base import clone, is_classifier
+            from sklearn.model_selection import check_cv
+
+            start = time.perf_counter()
+            deadline = start + self.timeout if self.timeout else math.inf
+
+            trials = {name: [_Trial(params) for params in self._sample(param[name])] for name in models}
+            folds = {
+                name: list(check_cv(self.cv_folds, y_train, classifier=is_classifier(model)).split(X_train, y_train))
+                for name, model in models.items()
+            }
+            survivors = {name: list(model_trials) for name, model_trials in trials.items()}
+            # Fit seconds spent on each model so far, summed over workers
+            fit_seconds = {name: 0.0 for name in models}
+            timed_out = False
+            logger.info(f"Successive halving over {sum(len(t) for t in trials.values())} trials, "
+                        f"rungs {self._rungs()} folds, timeout {self.timeout}s")
+
+            with Parallel(n_jobs=self.n_jobs, mmap_mode="r", return_as="generator") as parallel:
+                for rung, rung_folds in enumerate(self._rungs()):
+                    tasks = []
+                    for name in models:
+                        for fold in range(rung_folds):
+                            pending = [trial for trial in survivors[name] if len(trial.scores) <= fold]
+                            for group in staging_groups(models[name], [trial.params for trial in pending]):
+                                tasks.append((name, [pending[index] for index in group], fold))
+                    # Lower folds first, so a timeout leaves every trial with a prefix of its folds
+                    tasks.sort(key=lambda task: task[2])
+                    results = parallel(
+                        delayed(timed_fit_and_score_group)(clone(models[name]), [trial.params for trial in group],
+                                                           X_train, y_train, *folds[name][fold],
+                                                           self.early_stopping)
+                        for name, group, fold in tasks
+                    )
+                    # Iterate the generator itself (not zip) so it is exhausted and the pool is free again
+                    for index, (scores, seconds) in enumerate(results):
+                        name, group, fold = tasks[index]
+                        fit_seconds[name] += seconds
+                        for trial, (score, rounds) in zip(group, scores):
+                            trial.scores.append(score)
+                            if rounds is not None:
+                                trial.rounds.append(rounds)
+                            # Candidates staged from one fit share its cost
+                            trial.fit_seconds += seconds / len(group)
+                            trial.finished_at = fit_seconds[name]
+                        if time.perf_counter() > deadline:
+                            timed_out = True
+                            # Abort the fits still queued in this rung
+                            results.close()
+                            break
+                    if timed_out:
+                        logger.warning(f"Search timeout of {self.timeout}s reached in rung {rung}")
+                        break
+
+                    # Keep the best 1/eta of each model's trials for the next rung
+                    for name in models:
+                        ranked = sorted(survivors[name], key=lambda trial: trial.mean, reverse=True)
+                        survivors[name] = ranked[:max(1, math.ceil(len(ranked) / self.eta))]
+
+                best, refit_params, stats = {}, {}, {}
+                for name in models:
+                    scored = [trial for trial in trials[name] if trial.scores]
+                    if not scored:
+                        # Timed out before this model got a single fit; fall back to its defaults
+                        best[name] = _Trial({})
+                    else:
+                        # Trials scored on more folds outrank one-fold estimates; failed trials rank last
+                        best[name] = max(scored, key=lambda trial: (trial.mean > -math.inf, len(trial.scores), trial.mean))
+                        if best[name].mean == -math.inf:
+                            raise ValueError(f"All fits failed for {name}")
+
+                    # Early stopping picked the length per fold; refit once with the median of those
+                    best_rounds = int(np.median(best[name].rounds)) if best[name].rounds else None
+                    refit_params[name] = dict(best[name].params)
+                    if best_rounds is not None:
+                        refit_params[name][BOOSTED_ROUNDS[type(models[name]).__name__]] = best_rounds
+
+                    # Times are this model's own fit seconds, not wall-clock time of the shared search
+                    stats[name] = {
+                        "trials": len(scored),
+                        "fits": sum(len(trial.scores) for trial in trials[name]),
+                        "fit_seconds": round(fit_seconds[name], 3),
+                        "trials_per_second": (round(len(scored) / fit_seconds[name], 3)
+                                              if fit_seconds[name] > 0 else 0.0),
+                        "seconds_to_best": round(best[name].finished_at or 0.0, 3),
+                        "best_fit_seconds": round(best[name].fit_seconds, 3),
+                        "best_cv_score": best[name].mean if best[name].scores else None,
+                        "best_params": best[name].params,
+                        "best_rounds": best_rounds,
+                        "timed_out": timed_out,
+                    }
+
+                refits = list(parallel(
+                    delayed(refit_and_score)(clone(model), refit_params[name], X_train, y_train, X_test, y_test)
+                    for name, model in models.items()
+                ))
+
+            report = {}
+            for name, (estimator, test_score) in zip(list(models), refits):
+                models[name] = estimator
+                report[name] = test_score
+                logger.info(f"{name}: {stats[name]['trials']} trials, "
+                            f"{stats[name]['trials_per_second']} trials/s, best after {stats[name]['seconds_to_best']}s "
+                            f"of its {stats[name]['fit_seconds']}s of fits")
+
+            return report, stats
+
+        except Exception as e:
+            logger.error(f"Error in hyperparameter search: {str(e)}")
+            raise e
@@ -0,0 +1,139 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from src.student_performance import logger
+
+
+class StageArtifacts:
+    """
+    In-memory hand-off between training stages that run in the same process.
+
+    A stage puts the objects it produced (frames, feature matrices, fitted
+    objects) here and the next stage takes them instead of parsing the files
+    again. Writing the files that DVC and standalone stage runs need happens
+    in a background thread; wait() blocks until every write has finished and
+    re-raises the first failure.
+
+    Stages must treat objects they take from here as read-only, since a
+    background write may still be reading them.
+    """
+    def __init__(self, max_workers: int = 2):
+        self._objects = {}
+        self._pending = []
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="persist")
+
+    def put(self, key: str, value, persist=None):
+        """
+        Keep value under key and, if given, run persist() in the background
+
+        Args:
+            key (str): Name later stages look the object up by
+            value: The object
+            persist (callable, optional): Writes value to disk
+
+        Returns:
+            The value, for chaining
+        """
+        self._objects[key] = value
+        if persist is not None:
+            with self._lock:
+                self._pending.append((key, self._executor.submit(persist)))
+        return value
+
+    def after_writes(self, key: str, callback):
+        """
+        Run callback() in the background once every write queued so far has
+        finished; it does not run if one of them failed
+
+        Args:
+            key (str): Name the callback's own failure is reported under by wait()
+            callback (callable): e.g. records a stage's outputs in the stage cache
+
+        Returns:
+            Future: Resolves to the callback's result
+        """
+        def run():
+            for future in earlier:
+                future.result()
+            return callback()
+
+        with self._lock:
+            # Queued behind the writes it waits for, so it never blocks a worker they need
+            earlier = [future for _, future in self._pending]
+            future = self._executor.submit(run)
+            self._pending.append((key, future))
+        return future
+
+    def get(self, key: str, default=None):
+        return self._objects.get(key, default)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._objects
+
+    def wait(self):
+        """
+        Block until every background write has finished
+
+        Raises:
+            Exception: The first error raised by a write
+        """
+        with self._lock:
+            pending, self._pending = self._pending, []
+        error = None
+        for key, future in pending:
+            try:
+                future.result()
+            except Exception as e:
+                logger.error(f"Error persisting {key}: {str(e)}")
+                error = error or e
+        if error is not None:
+            raise error
+
+    def close(self):
+        try:
+            self.wait()
+        finally:
+            self._executor.shutdown(wait=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+            return
+        # Let the stage's own error propagate; write errors were logged by wait()
+        try:
+            self.close()
+        except Exception:
+            pass
+
+
+def publish(artifacts, key: str, value, persist=None):
+    """
+    Hand value to later stages when running under a StageArtifacts, and write it
+    to disk (in the background if so, synchronously otherwise)
+
+    Args:
+        artifacts (StageArtifacts): The pipeline's hand-off, or None for a standalone run
+        key (str): Name of the object
+        value: The object
+        persist (callable, optional): Writes value to disk
+
+    Returns:
+        The value
+    """
+    if artifacts is not None:
+        return artifacts.put(key, value, persist)
+    if persist is not None:
+        persist()
+    return value
+
+
+def handed_over(artifacts, key: str):
+    """
+    The object an earlier stage handed over under key, or None when there is
+    none (standalone run, or the producing stage was skipped)
+    """
+    return None if artifacts is None else artifacts.get(key)
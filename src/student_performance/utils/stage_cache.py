@@ -0,0 +1,121 @@
+import os
+import json
+import hashlib
+from dataclasses import dataclass
+from pathlib import Path
+
+from src.student_performance import logger
+from src.student_performance.utils.artifact_cache import file_digest
+from src.student_performance.constants import PROJECT_ROOT
+
+
+@dataclass(frozen=True)
+class StageSpec:
+    """
+    Everything that determines a training stage's outputs.
+
+    deps are data files, config_sections/params_sections name the parts of
+    config.yaml/params.yaml the stage reads ("*" for the whole file), code
+    lists the source files (relative to the project root) that implement it,
+    outs are the files it must leave behind and optional_outs are files it
+    may leave behind.
+    """
+    name: str
+    deps: tuple = ()
+    config_sections: tuple = ()
+    params_sections: tuple = ()
+    code: tuple = ()
+    outs: tuple = ()
+    optional_outs: tuple = ()
+
+
+def path_digest(path) -> str:
+    """
+    sha256 of a file, or of the relative names and digests of every file in a
+    directory (e.g. a partitioned Parquet table)
+    """
+    path = Path(path)
+    if not path.is_dir():
+        return file_digest(path)
+    sha = hashlib.sha256()
+    for child in sorted(p for p in path.rglob("*") if p.is_file()):
+        sha.update(f"{child.relative_to(path).as_posix()}:{file_digest(child)}\n".encode())
+    return sha.hexdigest()
+
+
+def _section(box, name):
+    if name == "*":
+        return box.to_dict() if hasattr(box, "to_dict") else dict(box)
+    value = box.get(name)
+    return value.to_dict() if hasattr(value, "to_dict") else value
+
+
+class StageCache:
+    """
+    Content-addressed record of completed training stages.
+
+    A stage's fingerprint hashes its dependency files, the config/params
+    sections it reads and its source code. After a successful run the
+    fingerprint is stored with the digest of every output (and the stage's
+    JSON result, if any); the stage can be skipped while both still match.
+    """
+    def __init__(self, root_dir: Path):
+        self.root_dir = Path(root_dir)
+        os.makedirs(self.root_dir, exist_ok=True)
+
+    def fingerprint(self, spec: StageSpec, config, params) -> str:
+        """
+        Hash everything the stage's outputs depend on
+
+        Raises:
+            FileNotFoundError: If a dependency file is missing
+        """
+        payload = {
+            "deps": {str(path): path_digest(path) for path in spec.deps},
+            "config": {name: _section(config, name) for name in spec.config_sections},
+            "params": {name: _section(params, name) for name in spec.params_sections},
+            "code": {path: file_digest(PROJECT_ROOT / path) for path in spec.code},
+        }
+        encoded = json.dumps(payload, sort_keys=True, default=str).encode()
+        return hashlib.sha256(encoded).hexdigest()
+
+    def _manifest_path(self, name):
+        return self.root_dir / f"{name}.json"
+
+    def lookup(self, spec: StageSpec, fingerprint: str):
+        """
+        Return the stored manifest if the stage ran with this fingerprint and its outputs are untouched
+        """
+        path = self._manifest_path(spec.name)
+        if not path.exists():
+            return None
+        with open(path) as f:
+            manifest = json.load(f)
+
+        if manifest.get("fingerprint") != fingerprint:
+            return None
+        for out, digest in manifest["outputs"].items():
+            if not os.path.exists(out) or path_digest(out) != digest:
+                logger.info(f"Stage {spec.name}: output {out} changed since the last run")
+                return None
+        return manifest
+
+    def record(self, spec: StageSpec, fingerprint: str, result=None):
+        """
+        Store the fingerprint, output digests and JSON-serialisable result of a successful run
+        """
+        outputs = {str(out): path_digest(out) for out in spec.outs}
+        outputs.update({str(out): path_digest(out) for out in spec.optional_outs if os.path.exists(out)})
+        manifest = {"stage": spec.name, "fingerprint": fingerprint, "outputs": outputs, "result": result}
+
+        path = self._manifest_path(spec.name)
+        tmp_path = f"{path}.tmp.{os.getpid()}"
+        with open(tmp_path, "w") as f:
+            json.dump(manifest, f, indent=4, default=str)
+        os.replace(tmp_path, path)
+        return manifest
+
+    def invalidate(self, name: str):
+        path = self._manifest_path(name)
+        if path.exists():
+            path.unlink()
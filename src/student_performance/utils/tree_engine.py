@@ -0,0 +1,323 @@
+import os
+import json
+import tempfile
+
+import numpy as np
+
+from src.student_performance import logger
+
+LEAF = -1
+
+
+def _round_down_float32(values):
+    """
+    Largest float32 <= each value, so that x_f32 <= t_f32 iff x_f32 <= t
+    """
+    rounded = np.asarray(values, dtype=np.float64).astype(np.float32)
+    too_high = rounded.astype(np.float64) > np.asarray(values, dtype=np.float64)
+    rounded[too_high] = np.nextafter(rounded[too_high], np.float32(-np.inf))
+    return rounded
+
+
+def _depth(left, right, node=0):
+    if left[node] < 0:
+        return 0
+    return 1 + max(_depth(left, right, left[node]), _depth(left, right, right[node]))
+
+
+class TreeEnsemble:
+    """
+    Tree ensemble packed into flat float32/int32 arrays and scored with NumPy only.
+
+    Every tree is stored as nodes in shared arrays (feature index, threshold,
+    left/right child, leaf value); ``roots`` holds the first node of each
+    tree. A row goes left when ``x <= threshold``; exporters rewrite other
+    split conventions into this one. Unpickling a TreeEnsemble needs nothing
+    beyond NumPy, so serving it never imports xgboost or catboost.
+    """
+    def __init__(self, feature, threshold, left, right, value, roots, max_depth, n_features,
+                 aggregation="sum", base_score=0.0, scale=1.0, tree_weights=None, source=""):
+        self.feature = np.asarray(feature, dtype=np.int32)
+        self.threshold = np.asarray(threshold, dtype=np.float32)
+        self.left = np.asarray(left, dtype=np.int32)
+        self.right = np.asarray(right, dtype=np.int32)
+        self.value = np.asarray(value, dtype=np.float32)
+        self.roots = np.asarray(roots, dtype=np.int32)
+        self.max_depth = int(max_depth)
+        self.n_features = int(n_features)
+        self.aggregation = aggregation
+        self.base_score = float(base_score)
+        self.scale = float(scale)
+        self.tree_weights = None if tree_weights is None else np.asarray(tree_weights, dtype=np.float64)
+        self.source = source
+
+        # Entry 2*i is the left child of node i and 2*i+1 the right one.
+        # Leaves point at themselves so finished rows stay put without masking.
+        # Kept as a plain array so it is memory-mapped along with the rest.
+        nodes = np.arange(len(self.left), dtype=np.int32)
+        self.is_leaf = self.left == LEAF
+        self.children = np.empty(2 * len(nodes), dtype=np.int32)
+        self.children[0::2] = np.where(self.is_leaf, nodes, self.left)
+        self.children[1::2] = np.where(self.is_leaf, nodes, self.right)
+
+    @property
+    def n_trees(self):
+        return len(self.roots)
+
+    def leaf_values(self, X) -> np.ndarray:
+        """
+        Leaf value reached in every tree for every row, shape (n_rows, n_trees)
+        """
+        X = np.ascontiguousarray(X, dtype=np.float32)
+        children = self.children
+        is_leaf = self.is_leaf
+        row_offset = (np.arange(X.shape[0], dtype=np.intp) * X.shape[1])[:, None]
+        flat_X = X.ravel()
+        node = np.broadcast_to(self.roots, (X.shape[0], self.n_trees)).copy()
+
+        for level in range(self.max_depth):
+            go_right = flat_X[row_offset + self.feature[node]] > self.threshold[node]
+            node = children[2 * node + go_right]
+            # Shallow trees finish early; checking every few levels keeps the check cheap
+            if level % 4 == 3 and is_leaf[node].all():
+                break
+
+        return self.value[node].astype(np.float64)
+
+    def predict(self, X) -> np.ndarray:
+        values = self.leaf_values(X)
+
+        if self.aggregation == "sum":
+            return self.base_score + self.scale * values.sum(axis=1)
+        if self.aggregation == "mean":
+            return values.mean(axis=1)
+        if self.aggregation == "weighted_median":
+            # Same selection rule as AdaBoostRegressor._get_median_predict
+            sorted_idx = np.argsort(values, axis=1)
+            weight_cdf = np.cumsum(self.tree_weights[sorted_idx], axis=1)
+            median_or_above = weight_cdf >= 0.5 * weight_cdf[:, -1][:, None]
+            median_idx = median_or_above.argmax(axis=1)
+            rows = np.arange(values.shape[0])
+            return values[rows, sorted_idx[rows, median_idx]]
+
+        raise ValueError(f"Unknown aggregation: {self.aggregation}")
+
+
+class _TreeBuilder:
+    def __init__(self):
+        self.feature, self.threshold, self.left, self.right, self.value = [], [], [], [], []
+        self.roots = []
+        self.max_depth = 0
+
+    def add_tree(self, feature, threshold, left, right, value, depth):
+        offset = len(self.feature)
+        left = np.asarray(left)
+        right = np.asarray(right)
+        is_leaf = left < 0
+
+        self.roots.append(offset)
+        self.feature.extend(np.where(is_leaf, 0, feature))
+        self.threshold.extend(np.where(is_leaf, 0.0, threshold))
+        self.left.extend(np.where(is_leaf, LEAF, left + offset))
+        self.right.extend(np.where(is_leaf, LEAF, right + offset))
+        self.value.extend(value)
+        self.max_depth = max(self.max_depth, depth)
+
+    def add_sklearn_tree(self, tree):
+        self.add_tree(
+            feature=tree.feature,
+            threshold=_round_down_float32(tree.threshold),
+            left=tree.children_left,
+            right=tree.children_right,
+            value=tree.value[:, 0, 0],
+            depth=tree.max_depth,
+        )
+
+    def build(self, n_features, **kwargs):
+        return TreeEnsemble(
+            feature=self.feature,
+            threshold=np.asarray(self.threshold, dtype=np.float32),
+            left=self.left,
+            right=self.right,
+            value=self.value,
+            roots=self.roots,
+            max_depth=self.max_depth,
+            n_features=n_features,
+            **kwargs
+        )
+
+
+def _export_sklearn(model):
+    from sklearn.ensemble import AdaBoostRegressor, GradientBoostingRegressor, RandomForestRegressor
+    from sklearn.tree import DecisionTreeRegressor
+
+    builder = _TreeBuilder()
+    name = type(model).__name__
+
+    if isinstance(model, DecisionTreeRegressor):
+        builder.add_sklearn_tree(model.tree_)
+        return builder.build(model.n_features_in_, aggregation="sum", source=name)
+
+    if isinstance(model, RandomForestRegressor):
+        for estimator in model.estimators_:
+            builder.add_sklearn_tree(estimator.tree_)
+        return builder.build(model.n_features_in_, aggregation="mean", source=name)
+
+    if isinstance(model, GradientBoostingRegressor):
+        if model.init_ == "zero":
+            base_score = 0.0
+        elif hasattr(model.init_, "constant_"):
+            base_score = float(np.ravel(model.init_.constant_)[0])
+        else:
+            raise ValueError(f"Unsupported GradientBoostingRegressor init: {model.init_}")
+        for estimator in model.estimators_[:, 0]:
+            builder.add_sklearn_tree(estimator.tree_)
+        return builder.build(model.n_features_in_, aggregation="sum", base_score=base_score,
+                             scale=model.learning_rate, source=name)
+
+    if isinstance(model, AdaBoostRegressor):
+        for estimator in model.estimators_:
+            if not isinstance(estimator, DecisionTreeRegressor):
+                raise ValueError(f"Unsupported AdaBoost base estimator: {type(estimator).__name__}")
+            builder.add_sklearn_tree(estimator.tree_)
+        weights = model.estimator_weights_[:len(model.estimators_)]
+        return builder.build(model.n_features_in_, aggregation="weighted_median",
+                             tree_weights=weights, source=name)
+
+    return None
+
+
+def _export_xgboost(model):
+    booster = model.get_booster()
+    learner = json.loads(booster.save_raw("json"))["learner"]
+
+    objective = learner["objective"]["name"]
+    if objective not in ("reg:squarederror", "reg:absoluteerror", "reg:pseudohubererror"):
+        raise ValueError(f"Unsupported XGBoost objective: {objective}")
+
+    gbm = learner["gradient_booster"]
+    if gbm.get("name") != "gbtree":
+        raise ValueError(f"Unsupported XGBoost booster: {gbm.get('name')}")
+    trees = gbm["model"]["trees"]
+
+    # predict() stops at the early-stopping round when there is one
+    try:
+        trees = trees[:int(gbm["model"]["iteration_indptr"][model.best_iteration + 1])]
+    except (AttributeError, KeyError, IndexError):
+        pass
+
+    builder = _TreeBuilder()
+    for tree in trees:
+        left = np.asarray(tree["left_children"])
+        conditions = np.asarray(tree["split_conditions"], dtype=np.float32)
+        # XGBoost goes left on x < t; in float32 that is x <= the next float below t
+        thresholds = np.where(left < 0, 0.0, np.nextafter(conditions, np.float32(-np.inf)))
+        builder.add_tree(
+            feature=tree["split_indices"],
+            threshold=thresholds,
+            left=left,
+            right=tree["right_children"],
+            value=np.where(left < 0, conditions, 0.0),
+            depth=_depth(left, np.asarray(tree["right_children"])),
+        )
+
+    base_score = float(str(learner["learner_model_param"]["base_score"]).strip("[]"))
+    return builder.build(int(learner["learner_model_param"]["num_feature"]), aggregation="sum",
+                         base_score=base_score, source=type(model).__name__)
+
+
+def _export_catboost(model):
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = os.path.join(tmp_dir, "model.json")
+        model.save_model(path, format="json")
+        with open(path) as f:
+            dump = json.load(f)
+
+    if dump["features_info"].get("categorical_features"):
+        raise ValueError("CatBoost models with categorical features are not supported")
+    flat_index = [feature["flat_feature_index"] for feature in dump["features_info"]["float_features"]]
+
+    builder = _TreeBuilder()
+    for tree in dump["oblivious_trees"]:
+        splits = tree["splits"]
+        depth = len(splits)
+        if len(tree["leaf_values"]) != 2 ** depth:
+            raise ValueError("Only single-output CatBoost models are supported")
+
+        # Expand the oblivious tree into a complete binary tree in heap order.
+        # Split k sets bit k of the leaf index when x > border, i.e. goes right.
+        n_internal = 2 ** depth - 1
+        feature = np.zeros(2 * n_internal + 1, dtype=np.int64)
+        threshold = np.zeros(2 * n_internal + 1, dtype=np.float32)
+        left = np.full(2 * n_internal + 1, LEAF)
+        right = np.full(2 * n_internal + 1, LEAF)
+        value = np.zeros(2 * n_internal + 1)
+
+        for node in range(n_internal):
+            level = int(np.log2(node + 1))
+            split = splits[level]
+            if split["split_type"] != "FloatFeature":
+                raise ValueError(f"Unsupported CatBoost split type: {split['split_type']}")
+            feature[node] = flat_index[split["float_feature_index"]]
+            threshold[node] = split["border"]
+            left[node] = 2 * node + 1
+            right[node] = 2 * node + 2
+
+        for position in range(2 ** depth):
+            # Path bits from the root are the leaf index bits, lowest bit first
+            node = 0
+            for level in range(depth):
+                node = 2 * node + 1 + ((position >> level) & 1)
+            value[node] = tree["leaf_values"][position]
+
+        builder.add_tree(feature, threshold, left, right, value, depth)
+
+    scale, bias = dump.get("scale_and_bias", [1.0, [0.0]])
+    bias = bias[0] if isinstance(bias, list) else bias
+    return builder.build(len(flat_index), aggregation="sum", base_score=bias, scale=scale,
+                         source=type(model).__name__)
+
+
+def export_tree_ensemble(model) -> TreeEnsemble:
+    """
+    Flatten a fitted tree model into a TreeEnsemble
+
+    Args:
+        model: DecisionTree, RandomForest, GradientBoosting or AdaBoost regressor,
+            XGBRegressor or CatBoostRegressor
+
+    Raises:
+        ValueError: If the model type or configuration is not supported
+
+    Returns:
+        TreeEnsemble: NumPy-only equivalent of the model
+    """
+    name = type(model).__name__
+    if name == "XGBRegressor":
+        engine = _export_xgboost(model)
+    elif name == "CatBoostRegressor":
+        engine = _export_catboost(model)
+    else:
+        engine = _export_sklearn(model)
+
+    if engine is None:
+        raise ValueError(f"{name} is not a supported tree ensemble")
+
+    logger.info(f"Exported {name} to a NumPy tree ensemble with {engine.n_trees} trees "
+                f"and {len(engine.feature)} nodes")
+    return engine
+
+
+def verify_tree_ensemble(engine: TreeEnsemble, model, X, rtol: float = 1e-5, atol: float = 1e-4):
+    """
+    Check the exported ensemble against the original model's predictions
+
+    Raises:
+        ValueError: If any prediction differs beyond the tolerance
+    """
+    expected = np.asarray(model.predict(X), dtype=np.float64).ravel()
+    actual = engine.predict(X)
+    if not np.allclose(actual, expected, rtol=rtol, atol=atol):
+        max_error = float(np.max(np.abs(actual - expected)))
+        raise ValueError(f"Tree ensemble deviates from {engine.source} by up to {max_error}")
+    return float(np.max(np.abs(actual - expected))) if len(expected) else 0.0
@@ -0,0 +1,72 @@
+import sys
+import os
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from src.student_performance.components.data_transformation import DataTransformation
+from src.student_performance.entity.config_entity import DataTransformationConfig, PredictionConfig
+from src.student_performance.utils.common import save_bin
+
+
+def make_student_frame(n_rows=200, seed=0):
+    """Synthetic rows shaped like data.csv, including the target column"""
+    rng = np.random.default_rng(seed)
+    scores = lambda: rng.integers(40, 100, n_rows)
+    return pd.DataFrame({
+        "gender": rng.choice(["male", "female"], n_rows),
+        "part_time_job": rng.choice(["Yes", "No"], n_rows),
+        "extracurricular_activities": rng.choice(["Yes", "No"], n_rows),
+        "career_aspiration": rng.choice(["Doctor", "Lawyer", "Unknown"], n_rows),
+        "race_ethnicity": rng.choice(["group A", "group B", "group C"], n_rows),
+        "parental_level_of_education": rng.choice(["high school", "bachelor's degree"], n_rows),
+        "lunch": rng.choice(["standard", "free/reduced"], n_rows),
+        "test_preparation_course": rng.choice(["none", "completed"], n_rows),
+        "absence_days": rng.integers(0, 10, n_rows),
+        "weekly_self_study_hours": rng.integers(0, 40, n_rows),
+        "history_score": scores(),
+        "physics_score": scores(),
+        "chemistry_score": scores(),
+        "biology_score": scores(),
+        "english_score": scores(),
+        "geography_score": scores(),
+        "writing_score": scores(),
+        "reading_score": scores(),
+        "math_score": scores(),
+    })
+
+
+@pytest.fixture
+def prediction_config(tmp_path):
+    """Fit a preprocessor and a small model on synthetic data and save both"""
+    from sklearn.linear_model import LinearRegression
+
+    df = make_student_frame()
+    transformation = DataTransformation(DataTransformationConfig(
+        root_dir=tmp_path,
+        data_path=tmp_path / "data.csv",
+        preprocessor_obj_file_path=tmp_path / "preprocessor.pkl"
+    ))
+    preprocessor = transformation.get_data_transformer_object()
+    X = preprocessor.fit_transform(df.drop(columns=["math_score"]))
+    model = LinearRegression().fit(X, df["math_score"])
+
+    save_bin(preprocessor, tmp_path / "preprocessor.pkl")
+    save_bin(model, tmp_path / "model.pkl")
+    return PredictionConfig(
+        model_path=tmp_path / "model.pkl",
+        preprocessor_path=tmp_path / "preprocessor.pkl",
+        mmap_mode="c",
+        max_batch_size=100,
+        micro_batching={"enabled": False, "max_batch_size": 8, "window_ms": 5, "latency_target_ms": 50},
+        cache={"enabled": True, "max_entries": 100, "ttl_seconds": None},
+        warmup={"rounds": 1, "records": [{
+            "gender": "female", "race_ethnicity": "group B", "parental_level_of_education": "high school",
+            "lunch": "standard", "test_preparation_course": "none", "reading_score": 72, "writing_score": 74
+        }]},
+        logging={"async_enabled": False, "queue_size": 100, "sample_rates": {}}
+    )
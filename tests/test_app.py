@@ -0,0 +1,173 @@
+import dataclasses
+import os
+import threading
+
+import numpy as np
+import pytest
+
+import app as serving
+from src.student_performance.pipeline.micro_batching import MicroBatcher
+from src.student_performance.pipeline.prediction_pipeline import PredictPipeline, PredictionRecord
+
+
+def test_ready_reports_503_until_warm_up_completes(prediction_config, monkeypatch):
+    monkeypatch.setattr(serving, "predict_pipeline", PredictPipeline(config=prediction_config))
+    monkeypatch.setattr(serving, "readiness", dict(serving.readiness, ready=False, started=True))
+    client = serving.app.test_client()
+
+    assert client.get('/ready').status_code == 503
+    assert client.get('/health').status_code == 200
+
+    serving.readiness['started'] = False
+    assert serving.warm_up()
+
+    response = client.get('/ready')
+    body = response.get_json()
+    assert response.status_code == 200
+    assert body['ready'] and body['error'] is None
+    # Two forms, the JSON API and the batch API for the single configured record
+    assert body['warmup_requests'] == 4
+    assert 'started' not in body
+
+
+def test_metrics_endpoint_reports_route_stages(prediction_config, monkeypatch):
+    monkeypatch.setattr(serving, "predict_pipeline", PredictPipeline(config=prediction_config))
+    client = serving.app.test_client()
+    record = prediction_config.warmup["records"][0]
+
+    assert client.post('/api/predict', json=record).status_code == 200
+    response = client.get('/metrics')
+    text = response.get_data(as_text=True)
+
+    assert response.status_code == 200
+    assert response.content_type.startswith('text/plain')
+    assert 'student_performance_requests_total{route="/api/predict",status="200"}' in text
+    for stage in ('parse', 'predict', 'render', 'folded_predict'):
+        assert f'route="/api/predict",stage="{stage}"' in text
+
+
+def test_metrics_endpoint_reports_the_prediction_cache(prediction_config, monkeypatch):
+    monkeypatch.setattr(serving, "predict_pipeline", PredictPipeline(config=prediction_config))
+    client = serving.app.test_client()
+    record = prediction_config.warmup["records"][0]
+
+    for _ in range(3):
+        assert client.post('/api/predict', json=record).status_code == 200
+    text = client.get('/metrics').get_data(as_text=True)
+
+    assert 'student_performance_prediction_cache_lookups_total{result="hit"} 2' in text
+    assert 'student_performance_prediction_cache_lookups_total{result="miss"} 1' in text
+    assert 'student_performance_prediction_cache_entries 1' in text
+    for name in ('evictions', 'expirations', 'invalidations'):
+        assert f'student_performance_prediction_cache_{name}_total 0' in text
+
+
+def test_metrics_endpoint_reports_the_artifact_cache(prediction_config, monkeypatch):
+    pipeline = PredictPipeline(config=prediction_config)
+    monkeypatch.setattr(serving, "predict_pipeline", pipeline)
+    serving.artifact_cache.clear()
+    client = serving.app.test_client()
+
+    _, _, version = pipeline.load_artifacts()
+    before = serving.artifact_cache.stats()
+    assert client.post('/api/predict', json=prediction_config.warmup["records"][0]).status_code == 200
+    text = client.get('/metrics').get_data(as_text=True)
+
+    assert f'student_performance_artifact_cache_lookups_total{{result="hit"}} {before["hits"] + 1}' in text
+    assert f'student_performance_artifact_cache_reloads_total {before["reloads"]}' in text
+    assert f'student_performance_artifact_cache_version_info{{version="{version}"}} 1' in text
+    assert 'student_performance_artifact_cache_last_reload_seconds ' in text
+
+
+def batching_config(prediction_config, **settings):
+    micro_batching = dict(prediction_config.micro_batching, enabled=True, **settings)
+    return PredictPipeline(config=dataclasses.replace(prediction_config, micro_batching=micro_batching))
+
+
+def test_forked_workers_get_their_own_micro_batcher(prediction_config, monkeypatch):
+    monkeypatch.setattr(serving, "predict_pipeline", batching_config(prediction_config))
+    monkeypatch.setattr(serving, "micro_batcher_pid", None)
+    record = prediction_config.warmup["records"][0]
+    parent_batcher = serving.get_micro_batcher()
+
+    pid = os.fork()
+    if pid == 0:
+        # Child: the inherited batcher has no worker thread, so a fresh one must serve the request
+        try:
+            response = serving.app.test_client().post('/api/predict', json=record)
+            ok = response.status_code == 200 and serving.get_micro_batcher() is not parent_batcher
+            os._exit(0 if ok else 1)
+        except BaseException:
+            os._exit(2)
+    _, status = os.waitpid(pid, 0)
+
+    assert os.waitstatus_to_exitcode(status) == 0
+    assert serving.get_micro_batcher() is parent_batcher
+
+
+def test_metrics_endpoint_reports_micro_batching(prediction_config, monkeypatch):
+    monkeypatch.setattr(serving, "predict_pipeline", batching_config(prediction_config, max_batch_size=8))
+    monkeypatch.setattr(serving, "micro_batcher_pid", None)
+    monkeypatch.setattr(serving, "micro_batcher", None)
+    client = serving.app.test_client()
+    assert 'micro_batch' not in client.get('/metrics').get_data(as_text=True)
+
+    for _ in range(3):
+        assert client.post('/api/predict', json=prediction_config.warmup["records"][0]).status_code == 200
+    text = client.get('/metrics').get_data(as_text=True)
+
+    # Sequential requests each make a batch of one
+    assert 'student_performance_micro_batch_size_bucket{le="1"} 3' in text
+    assert 'student_performance_micro_batch_size_bucket{le="8"} 3' in text
+    assert 'student_performance_micro_batch_size_count 3' in text
+    assert 'student_performance_micro_batch_queue_delay_seconds_total ' in text
+    assert 'student_performance_micro_batch_window_seconds ' in text
+
+
+def test_micro_batch_timeout_falls_back_to_direct_scoring(prediction_config, monkeypatch):
+    pipeline = batching_config(prediction_config, timeout_ms=50)
+    monkeypatch.setattr(serving, "predict_pipeline", pipeline)
+    monkeypatch.setattr(serving, "micro_batcher_pid", os.getpid())
+    # A batcher whose worker never answers, like one inherited across fork
+    monkeypatch.setattr(serving, "micro_batcher", MicroBatcher(lambda records: threading.Event().wait()))
+    record = prediction_config.warmup["records"][0]
+
+    response = serving.app.test_client().post('/api/predict', json=record)
+
+    assert response.status_code == 200
+    assert response.get_json()['prediction'] == pytest.approx(
+        pipeline.predict_record(PredictionRecord.from_mapping(record)))
+
+
+def test_warm_up_bypasses_the_prediction_cache_and_leaves_no_metrics(prediction_config, monkeypatch):
+    config = dataclasses.replace(prediction_config, warmup=dict(prediction_config.warmup, rounds=3))
+    pipeline = PredictPipeline(config=config)
+    monkeypatch.setattr(serving, "predict_pipeline", pipeline)
+    monkeypatch.setattr(serving, "readiness", dict(serving.readiness, ready=False, started=False))
+
+    assert serving.warm_up()
+
+    # Three single-record paths and the batch of one, every round, none answered from the cache
+    assert serving.readiness['warmup_requests'] == 12
+    assert pipeline.prediction_cache.stats()["hits"] == 0
+    assert pipeline.prediction_cache.stats()["size"] == 0
+    assert 'requests_total{route="/api/predict"' not in serving.metrics.render()
+
+
+def test_explain_on_a_non_linear_model_still_returns_the_prediction(prediction_config, monkeypatch):
+    from sklearn.tree import DecisionTreeRegressor
+    from src.student_performance.utils.common import load_bin, save_bin
+
+    linear = load_bin(prediction_config.model_path)
+    X = np.random.default_rng(0).normal(size=(50, linear.coef_.shape[0]))
+    save_bin(DecisionTreeRegressor(max_depth=3).fit(X, X[:, 0]), prediction_config.model_path)
+    monkeypatch.setattr(serving, "predict_pipeline", PredictPipeline(config=prediction_config))
+    record = prediction_config.warmup["records"][0]
+
+    response = serving.app.test_client().post('/api/predict?explain=true', json=record)
+
+    body = response.get_json()
+    assert response.status_code == 200 and body['success']
+    assert isinstance(body['prediction'], float)
+    assert 'contributions' not in body
+    assert 'DecisionTreeRegressor' in body['contributions_unavailable']
@@ -0,0 +1,41 @@
+import queue
+import logging
+
+import pytest
+
+from src.student_performance.utils.async_logging import LazyQueueHandler, SamplingFilter
+
+
+def make_record(level, msg="Prediction result: %s", args=(71.5,)):
+    return logging.LogRecord("studentPerformanceLogger.serving", level, __file__, 1, msg, args, None)
+
+
+def test_sampling_filter_keeps_every_nth_info_and_all_warnings():
+    sampler = SamplingFilter(0.25)
+
+    kept = [sampler.filter(make_record(logging.INFO)) for _ in range(100)]
+    assert sum(kept) == 25
+    assert sampler.dropped == 75
+    assert all(sampler.filter(make_record(logging.WARNING)) for _ in range(10))
+    assert all(sampler.filter(make_record(logging.ERROR)) for _ in range(10))
+
+    with pytest.raises(ValueError):
+        SamplingFilter(0)
+
+
+def test_lazy_queue_handler_defers_formatting_and_drops_only_info_when_full():
+    log_queue = queue.Queue(maxsize=1)
+    handler = LazyQueueHandler(log_queue)
+
+    handler.handle(make_record(logging.INFO))
+    queued = log_queue.get_nowait()
+    # Arguments are still unmerged; the listener thread formats them
+    assert queued.msg == "Prediction result: %s" and queued.args == (71.5,)
+
+    handler.handle(make_record(logging.INFO))
+    handler.handle(make_record(logging.INFO))
+    assert handler.dropped == 1
+
+    log_queue.get_nowait()
+    handler.handle(make_record(logging.ERROR, "failed", ()))
+    assert log_queue.get_nowait().levelno == logging.ERROR
@@ -0,0 +1,72 @@
+import csv
+import json
+
+import pandas as pd
+import pytest
+
+from src.student_performance.pipeline.bulk_scoring_pipeline import BulkScoringPipeline
+from src.student_performance.pipeline.prediction_pipeline import PredictPipeline
+
+
+def make_requests(n_rows):
+    return [{
+        "gender": ["male", "female"][i % 2],
+        "race_ethnicity": "group B",
+        "parental_level_of_education": "high school",
+        "lunch": "standard",
+        "test_preparation_course": "none",
+        "reading_score": i % 101,
+        "writing_score": 60
+    } for i in range(n_rows)]
+
+
+class TestBulkScoringPipeline:
+    @pytest.mark.parametrize("workers", [1, 2])
+    def test_jsonl_scoring_preserves_input_order(self, tmp_path, prediction_config, workers):
+        requests = make_requests(250)
+        requests[7] = {"gender": "male"}
+        input_path = tmp_path / "requests.jsonl"
+        input_path.write_text("\n".join(json.dumps(r) for r in requests) + "\n")
+        output_path = tmp_path / "predictions.jsonl"
+
+        report = BulkScoringPipeline(config=prediction_config, chunk_size=32, workers=workers).run(
+            input_path, output_path)
+
+        results = [json.loads(line) for line in output_path.read_text().splitlines()]
+        assert report["rows"] == 250
+        assert report["errors"] == 1
+        assert [r["index"] for r in results] == list(range(250))
+        assert not results[7]["success"]
+
+        expected = PredictPipeline(config=prediction_config).predict_batch(requests[:5])
+        assert [r["prediction"] for r in results[:5]] == pytest.approx([r["prediction"] for r in expected])
+
+    def test_malformed_jsonl_lines_become_error_rows(self, tmp_path, prediction_config):
+        lines = [json.dumps(r) for r in make_requests(10)]
+        lines[3] = '{"gender": "male", "reading_score": '
+        input_path = tmp_path / "requests.jsonl"
+        input_path.write_text("\n".join(lines) + "\n")
+        output_path = tmp_path / "predictions.jsonl"
+
+        report = BulkScoringPipeline(config=prediction_config, chunk_size=4, workers=1).run(
+            input_path, output_path)
+
+        results = [json.loads(line) for line in output_path.read_text().splitlines()]
+        assert report["rows"] == 10 and report["errors"] == 1
+        assert [r["index"] for r in results] == list(range(10))
+        assert not results[3]["success"]
+        assert results[3]["error"].startswith("Malformed JSON on line 4")
+        assert all(r["success"] for i, r in enumerate(results) if i != 3)
+
+    def test_csv_to_csv(self, tmp_path, prediction_config):
+        input_path = tmp_path / "requests.csv"
+        pd.DataFrame(make_requests(40)).to_csv(input_path, index=False)
+        output_path = tmp_path / "predictions.csv"
+
+        report = BulkScoringPipeline(config=prediction_config, chunk_size=16, workers=1).run(
+            input_path, output_path)
+
+        with open(output_path) as f:
+            rows = list(csv.DictReader(f))
+        assert report["rows"] == len(rows) == 40
+        assert all(row["error"] == "" for row in rows)
@@ -0,0 +1,88 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.student_performance.components.data_ingestion import DataIngestion
+from src.student_performance.components.data_transformation import DataTransformation
+from src.student_performance.entity.config_entity import DataIngestionConfig, DataTransformationConfig
+from src.student_performance.utils.columnar_store import (PartitionedWriter, hash_split_mask, iter_table_chunks,
+                                                          read_table, write_table)
+
+from conftest import make_student_frame
+
+DTYPES = {"gender": "category", "test_preparation_course": "category", "absence_days": "int64"}
+
+
+def student_frame(n_rows):
+    df = make_student_frame(n_rows)
+    df.insert(0, "id", np.arange(1, n_rows + 1))
+    return df
+
+
+def test_xlsx_source_is_streamed_into_partitions(tmp_path):
+    source = tmp_path / "data.xlsx"
+    df = student_frame(45)
+    df.to_excel(source, index=False)
+    config = DataIngestionConfig(root_dir=tmp_path, source_URL=str(source), local_data_file=str(source),
+                                 unzip_dir=tmp_path, data_file=tmp_path / "data.parquet",
+                                 column_dtypes=DTYPES, chunk_rows=10)
+
+    assert DataIngestion(config).convert_to_store() is None
+    assert len(list((tmp_path / "data.parquet").glob("part-*.parquet"))) == 5
+
+    stored = read_table(tmp_path / "data.parquet")
+    assert isinstance(stored["gender"].dtype, pd.CategoricalDtype)
+    pd.testing.assert_frame_equal(stored.astype(str), df.astype(str), check_dtype=False)
+
+
+@pytest.mark.parametrize("suffix,chunk_rows", [(".csv", None), (".csv", 10), (".parquet", None), (".parquet", 10)])
+def test_non_excel_sources_keep_their_format_through_the_local_copy(tmp_path, suffix, chunk_rows):
+    source = tmp_path / "source" / f"students{suffix}"
+    source.parent.mkdir()
+    df = student_frame(25)
+    write_table(df, source)
+    root = tmp_path / "artifacts"
+    # The configured local copy is named data.xlsx, as in config.yaml
+    config = DataIngestionConfig(root_dir=root, source_URL=str(source), local_data_file=root / "data.xlsx",
+                                 unzip_dir=root, data_file=root / "data.parquet",
+                                 column_dtypes=DTYPES, chunk_rows=chunk_rows)
+
+    DataIngestion(config).initiate_data_ingestion()
+
+    assert (root / f"data{suffix}").exists() and not (root / "data.xlsx").exists()
+    stored = read_table(root / "data.parquet")
+    pd.testing.assert_frame_equal(stored.astype(str), df.astype(str), check_dtype=False)
+
+
+def test_parts_share_one_schema_when_a_chunk_is_all_null(tmp_path):
+    first = pd.DataFrame({"grade": pd.Categorical([None, None]), "hours": [1.0, 2.0]})
+    second = pd.DataFrame({"grade": pd.Categorical(["A", "B"]), "hours": [1.5, 3.0]})
+    with PartitionedWriter(tmp_path / "table.parquet") as writer:
+        writer.write(first)
+        writer.write(second)
+
+    stored = read_table(tmp_path / "table.parquet")
+    assert stored["grade"].astype(object).where(stored["grade"].notna(), None).tolist() == [None, None, "A", "B"]
+    assert [len(chunk) for chunk in iter_table_chunks(tmp_path / "table.parquet", 1)] == [1, 1, 1, 1]
+
+
+def test_hash_split_is_stable_across_chunkings_and_appends(tmp_path):
+    df = student_frame(1000)
+    data_path = write_table(df, tmp_path / "data.parquet")
+    split = {"method": "hash", "key_column": "id", "test_size": 0.2, "seed": 42}
+
+    test_ids = []
+    for chunk_rows, root in ((1000, "whole"), (37, "chunked")):
+        config = DataTransformationConfig(root_dir=tmp_path / root, data_path=data_path,
+                                          preprocessor_obj_file_path=tmp_path / "preprocessor.pkl",
+                                          chunk_rows=chunk_rows, split=split)
+        (tmp_path / root).mkdir()
+        train_path, test_path = DataTransformation(config).hash_split_to_store(split)
+        test_ids.append(set(read_table(test_path)["id"]))
+        assert len(read_table(train_path)) + len(test_ids[-1]) == 1000
+
+    assert test_ids[0] == test_ids[1]
+    assert 150 < len(test_ids[0]) < 250
+    # Appending new students never moves existing ones between train and test
+    grown = student_frame(1500)
+    assert set(grown["id"][hash_split_mask(grown, 0.2, "id")]) >= test_ids[0]
@@ -0,0 +1,66 @@
+import dataclasses
+
+import pandas as pd
+
+from src.student_performance.components.data_ingestion import DataIngestion
+from src.student_performance.entity.config_entity import DataIngestionConfig
+from src.student_performance.utils import columnar_store
+from src.student_performance.utils.columnar_store import read_table, write_table
+
+from conftest import make_student_frame
+
+DTYPES = {"gender": "category", "career_aspiration": "category", "absence_days": "int64"}
+
+
+def test_parquet_round_trip_keeps_schema_types(tmp_path):
+    df = make_student_frame(50)
+    path = write_table(df, tmp_path / "data.parquet", dtypes=DTYPES)
+
+    stored = read_table(path)
+    assert isinstance(stored["gender"].dtype, pd.CategoricalDtype)
+    assert str(stored["absence_days"].dtype) == "int64"
+    assert stored["gender"].astype(str).tolist() == df["gender"].astype(str).tolist()
+    assert list(read_table(path, columns=["math_score"]).columns) == ["math_score"]
+    assert not list(tmp_path.glob(".*tmp*"))
+
+
+def test_conversion_is_skipped_while_the_source_is_unchanged(tmp_path, monkeypatch):
+    source = tmp_path / "data.csv"
+    make_student_frame(40).to_csv(source, index=False)
+    config = DataIngestionConfig(root_dir=tmp_path, source_URL=str(source), local_data_file=str(source),
+                                 unzip_dir=tmp_path, data_file=tmp_path / "data.parquet", column_dtypes=DTYPES)
+    ingestion = DataIngestion(config)
+
+    writes = []
+    real_write = columnar_store.write_table
+    monkeypatch.setattr("src.student_performance.components.data_ingestion.write_table",
+                        lambda *args, **kwargs: writes.append(args[1]) or real_write(*args, **kwargs))
+
+    first = ingestion.convert_to_store()
+    second = ingestion.convert_to_store()
+    assert len(writes) == 1
+    assert isinstance(second["career_aspiration"].dtype, pd.CategoricalDtype)
+    pd.testing.assert_frame_equal(first, second)
+
+    make_student_frame(41).to_csv(source, index=False)
+    assert len(ingestion.convert_to_store()) == 41
+    assert len(writes) == 2
+
+
+def test_schema_changes_rebuild_an_unchanged_source(tmp_path):
+    source = tmp_path / "data.csv"
+    make_student_frame(40).to_csv(source, index=False)
+    config = DataIngestionConfig(root_dir=tmp_path, source_URL=str(source), local_data_file=str(source),
+                                 unzip_dir=tmp_path, data_file=tmp_path / "data.parquet", column_dtypes=DTYPES)
+    DataIngestion(config).convert_to_store()
+
+    dtypes = {"gender": "category", "absence_days": "float64"}
+    DataIngestion(dataclasses.replace(config, column_dtypes=dtypes)).convert_to_store()
+
+    stored = read_table(tmp_path / "data.parquet")
+    assert not isinstance(stored["career_aspiration"].dtype, pd.CategoricalDtype)
+    assert str(stored["absence_days"].dtype) == "float64"
+
+    # Streaming into parts is a different layout too
+    DataIngestion(dataclasses.replace(config, column_dtypes=dtypes, chunk_rows=15)).convert_to_store()
+    assert len(list((tmp_path / "data.parquet").iterdir())) == 3
@@ -0,0 +1,50 @@
+import os
+
+import joblib
+import numpy as np
+import pytest
+
+from src.student_performance.utils.common import load_bin, save_bin
+
+
+@pytest.mark.parametrize("mmap_mode", ["r", "c"])
+def test_load_bin_memory_maps_uncompressed_arrays(tmp_path, mmap_mode):
+    path = tmp_path / "model.joblib"
+    weights = np.arange(1000, dtype="float64")
+    save_bin({"weights": weights, "name": "tree"}, path)
+
+    loaded = load_bin(path, mmap_mode=mmap_mode)
+
+    assert isinstance(loaded["weights"], np.memmap)
+    assert loaded["weights"].filename == str(path)
+    np.testing.assert_array_equal(loaded["weights"], weights)
+    assert loaded["name"] == "tree"
+    # Without mmap_mode the arrays are ordinary in-memory copies
+    assert not isinstance(load_bin(path)["weights"], np.memmap)
+
+
+def test_compressed_files_load_as_copies(tmp_path):
+    path = tmp_path / "model.joblib"
+    save_bin(np.ones(100), path, compress=3)
+
+    with pytest.warns(UserWarning, match="compressed"):
+        assert not isinstance(load_bin(path, mmap_mode="r"), np.memmap)
+
+
+def test_an_interrupted_save_keeps_the_existing_file(tmp_path, monkeypatch):
+    path = tmp_path / "model.joblib"
+    save_bin(np.zeros(10), path)
+    before = path.read_bytes()
+
+    def dump_then_fail(value, filename, compress):
+        with open(filename, "wb") as f:
+            f.write(b"half a pickle")
+        raise KeyboardInterrupt
+
+    monkeypatch.setattr(joblib, "dump", dump_then_fail)
+    with pytest.raises(KeyboardInterrupt):
+        save_bin(np.ones(10), path)
+
+    assert path.read_bytes() == before
+    assert os.listdir(tmp_path) == ["model.joblib"]
+    np.testing.assert_array_equal(load_bin(path), np.zeros(10))
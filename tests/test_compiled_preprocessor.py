@@ -0,0 +1,46 @@
+import numpy as np
+import pytest
+
+from conftest import make_student_frame
+from src.student_performance.pipeline.prediction_pipeline import PredictPipeline
+from src.student_performance.utils.common import load_bin
+from src.student_performance.utils.compiled_preprocessor import CompiledPreprocessor
+
+
+class TestCompiledPreprocessor:
+    def test_matches_sklearn_transform(self, prediction_config):
+        preprocessor = load_bin(prediction_config.preprocessor_path)
+        frame = make_student_frame(n_rows=300, seed=1).drop(columns=["math_score"])
+        compiled = CompiledPreprocessor.from_column_transformer(preprocessor)
+
+        assert compiled.verify(preprocessor, frame) <= 1e-9
+
+    def test_verify_checks_a_bounded_sample(self, prediction_config, monkeypatch):
+        preprocessor = load_bin(prediction_config.preprocessor_path)
+        frame = make_student_frame(n_rows=300, seed=1).drop(columns=["math_score"])
+        compiled = CompiledPreprocessor.from_column_transformer(preprocessor)
+        checked = []
+        transform_records = compiled.transform_records
+        monkeypatch.setattr(compiled, "transform_records",
+                            lambda records: checked.append(len(records)) or transform_records(records))
+
+        assert compiled.verify(preprocessor, frame, max_rows=50) <= 1e-9
+        assert compiled.verify(preprocessor, frame, max_rows=None) <= 1e-9
+        assert checked == [50, 300]
+
+    def test_missing_and_unknown_values(self, prediction_config):
+        preprocessor = load_bin(prediction_config.preprocessor_path)
+        frame = make_student_frame(n_rows=5, seed=2).drop(columns=["math_score"])
+        frame.loc[0, "absence_days"] = np.nan
+        frame.loc[1, "gender"] = None
+        frame.loc[2, "career_aspiration"] = "Astronaut"
+        compiled = CompiledPreprocessor.from_column_transformer(preprocessor)
+
+        assert compiled.verify(preprocessor, frame) <= 1e-9
+
+    def test_predict_record_matches_dataframe_path(self, prediction_config):
+        pipeline = PredictPipeline(config=prediction_config)
+        frame = make_student_frame(n_rows=10, seed=3).drop(columns=["math_score"])
+
+        fast = [pipeline.predict_record(record) for record in frame.to_dict("records")]
+        assert fast == pytest.approx(list(pipeline.predict(frame)))
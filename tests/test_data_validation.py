@@ -0,0 +1,88 @@
+import json
+
+import numpy as np
+import pandas as pd
+
+from src.student_performance.components.data_validation import DataValidation
+from src.student_performance.constants import SCHEMA_FILE_PATH
+from src.student_performance.entity.config_entity import DataValidationConfig
+from src.student_performance.utils.common import read_yaml
+from src.student_performance.utils.columnar_store import write_table
+
+from conftest import make_student_frame
+
+COLUMNS = {"gender": "object", "absence_days": "int64", "math_score": "int64", "weekly_self_study_hours": "float64"}
+DOMAINS = {"gender": ["male", "female"], "part_time_job": ["Yes", "No"]}
+RULES = {"score_range": {"columns": ["math_score"], "min": 0, "max": 100},
+         "absence_days_range": {"columns": ["absence_days"], "min": 0, "max": 5}}
+
+
+def validate(tmp_path, df, chunk_rows, columns=COLUMNS, delta=None):
+    data_path = write_table(df, tmp_path / "data.parquet", dtypes={"gender": "category"})
+    config = DataValidationConfig(root_dir=tmp_path, STATUS_FILE=str(tmp_path / "status.txt"), unzip_data_dir=data_path,
+                                  all_schema=columns, domain_values=DOMAINS, validation_rules=RULES,
+                                  report_file=tmp_path / "report.json", chunk_rows=chunk_rows)
+    status = DataValidation(config).validate_all_columns(delta=delta)
+    return status, json.loads((tmp_path / "report.json").read_text())
+
+
+def test_violations_are_counted_per_rule_across_chunks(tmp_path):
+    df = make_student_frame(120)
+    df["absence_days"] = np.arange(120) % 8
+    df.loc[[3, 50, 110], "gender"] = "unknown"
+    df.loc[[7, 90], "math_score"] = 140
+
+    status, report = validate(tmp_path, df, chunk_rows=25)
+
+    assert status is False
+    assert (tmp_path / "status.txt").read_text().strip() == "Validation status: False"
+    assert report["rows"] == 120
+    assert report["violations"]["domain:gender"]["violations"] == 3
+    assert report["violations"]["domain:gender"]["examples"] == ["unknown"]
+    assert report["violations"]["score_range:math_score"]["violations"] == 2
+    # absence_days 6 and 7 occur 15 times each
+    assert report["violations"]["absence_days_range:absence_days"]["violations"] == 30
+    assert set(report["violations"]) == {"domain:gender", "score_range:math_score", "absence_days_range:absence_days"}
+
+
+def test_clean_data_passes_and_missing_columns_fail(tmp_path):
+    df = make_student_frame(60)
+    df["absence_days"] = 1
+    assert validate(tmp_path, df, chunk_rows=1000)[0] is True
+
+    status, report = validate(tmp_path, df, chunk_rows=1000, columns={**COLUMNS, "id": "int64"})
+    assert status is False
+    assert report["missing_columns"] == ["id"]
+
+
+def test_schema_domains_are_strings():
+    # Unquoted Yes/No would load as booleans and reject every row
+    schema = read_yaml(SCHEMA_FILE_PATH)
+    assert schema.DOMAIN_VALUE.part_time_job == ["Yes", "No"]
+    assert all("columns" in rule for rule in schema.VALIDATION_RULES.values())
+
+
+def test_empty_data_fails(tmp_path):
+    status, report = validate(tmp_path, make_student_frame(10).head(0), chunk_rows=1000)
+    assert status is False
+    assert report["rows"] == 0 and report["missing_columns"] == []
+
+    config = DataValidationConfig(root_dir=tmp_path, STATUS_FILE=str(tmp_path / "status.txt"),
+                                  unzip_data_dir=tmp_path / "unused.parquet", all_schema=COLUMNS,
+                                  report_file=tmp_path / "report.json")
+    assert DataValidation(config).validate_all_columns(pd.DataFrame()) is False
+    assert json.loads((tmp_path / "report.json").read_text())["missing_columns"] == list(COLUMNS)
+
+
+def test_the_rows_of_an_incremental_delta_are_reported_on_their_own(tmp_path):
+    df = make_student_frame(50)
+    df["absence_days"] = 1
+    df.loc[[2, 45], "math_score"] = 140
+    delta_file = write_table(df.tail(10), tmp_path / "delta.parquet")
+
+    status, report = validate(tmp_path, df, chunk_rows=20, delta={"new": 10, "delta_file": str(delta_file)})
+
+    assert status is False
+    assert report["violations"]["score_range:math_score"]["violations"] == 2
+    assert report["delta"]["rows"] == 10
+    assert report["delta"]["violations"]["score_range:math_score"]["violations"] == 1
@@ -0,0 +1,56 @@
+import numpy as np
+import pytest
+from sklearn.ensemble import GradientBoostingRegressor
+from sklearn.linear_model import Ridge
+from sklearn.metrics import r2_score
+from sklearn.model_selection import GridSearchCV
+from sklearn.tree import DecisionTreeRegressor
+
+from src.student_performance.utils.common import evaluate_models
+
+
+def make_models():
+    return {
+        "Decision Tree": DecisionTreeRegressor(random_state=0),
+        "Ridge": Ridge(),
+        "Gradient Boosting": GradientBoostingRegressor(random_state=0),
+    }
+
+
+PARAMS = {
+    "Decision Tree": {"max_depth": [2, 4, 8], "criterion": ["squared_error", "poisson"]},
+    "Ridge": {"alpha": [0.1, 1.0, 10.0]},
+    "Gradient Boosting": {"n_estimators": [10, 30], "learning_rate": [0.1, 0.3]},
+}
+
+
+def serial_report(X_train, y_train, X_test, y_test, models, param):
+    # The original one-model-at-a-time GridSearchCV loop
+    report = {}
+    for name, model in models.items():
+        gs = GridSearchCV(model, param[name], cv=3)
+        gs.fit(X_train, y_train)
+        model.set_params(**gs.best_params_)
+        model.fit(X_train, y_train)
+        report[name] = r2_score(y_test, model.predict(X_test))
+    return report
+
+
+@pytest.mark.parametrize("n_jobs", [1, 2])
+def test_parallel_search_matches_serial_grid_search(n_jobs):
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(240, 5))
+    # Negative targets make every poisson candidate fail, as GridSearchCV tolerates
+    y = X @ np.array([3.0, -2.0, 0.5, 0.0, 1.0]) + rng.normal(scale=0.5, size=240)
+    X_train, X_test, y_train, y_test = X[:180], X[180:], y[:180], y[180:]
+
+    expected = serial_report(X_train, y_train, X_test, y_test, make_models(), PARAMS)
+    models = make_models()
+    report = evaluate_models(X_train, y_train, X_test, y_test, models, PARAMS, n_jobs=n_jobs)
+
+    assert list(report) == list(expected)
+    assert report == pytest.approx(expected, rel=1e-12)
+    # The refitted best estimators are handed back for the trainer to save
+    assert models["Gradient Boosting"].n_estimators_ in (10, 30)
+    assert hasattr(models["Ridge"], "coef_")
+    assert models["Decision Tree"].criterion == "squared_error"
@@ -0,0 +1,42 @@
+import numpy as np
+import pytest
+from sklearn.linear_model import ElasticNet
+
+from conftest import make_student_frame
+from src.student_performance.pipeline.prediction_pipeline import PredictPipeline
+from src.student_performance.utils.common import load_bin
+from src.student_performance.utils.folded_linear import FoldedLinearModel
+
+
+class TestFoldedLinearModel:
+    def test_matches_preprocessor_and_model(self, prediction_config):
+        preprocessor = load_bin(prediction_config.preprocessor_path)
+        model = load_bin(prediction_config.model_path)
+        frame = make_student_frame(n_rows=200, seed=4).drop(columns=["math_score"])
+        frame.loc[0, "absence_days"] = np.nan
+        frame.loc[1, "career_aspiration"] = "Astronaut"
+
+        folded = FoldedLinearModel.from_pipeline(preprocessor, model)
+
+        expected = model.predict(preprocessor.transform(frame))
+        assert folded.predict_records(frame.to_dict("records")) == pytest.approx(list(expected))
+
+    def test_elastic_net(self, prediction_config):
+        preprocessor = load_bin(prediction_config.preprocessor_path)
+        df = make_student_frame(n_rows=200, seed=5)
+        X = preprocessor.transform(df.drop(columns=["math_score"]))
+        model = ElasticNet(alpha=0.2, l1_ratio=0.1).fit(X, df["math_score"])
+
+        folded = FoldedLinearModel.from_pipeline(preprocessor, model)
+        records = df.drop(columns=["math_score"]).to_dict("records")
+        assert folded.predict_records(records) == pytest.approx(list(model.predict(X)))
+
+    def test_contributions_sum_to_prediction(self, prediction_config):
+        pipeline = PredictPipeline(config=prediction_config)
+        record = make_student_frame(n_rows=1, seed=6).drop(columns=["math_score"]).to_dict("records")[0]
+
+        explanation = pipeline.explain_record(record)
+        total = explanation["intercept"] + sum(explanation["contributions"].values())
+
+        assert len(explanation["contributions"]) == 18
+        assert total == pytest.approx(pipeline.predict_record(record))
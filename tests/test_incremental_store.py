@@ -0,0 +1,114 @@
+import dataclasses
+import json
+
+import numpy as np
+import pandas as pd
+
+from src.student_performance.components.data_ingestion import DataIngestion
+from src.student_performance.entity.config_entity import DataIngestionConfig
+from src.student_performance.utils.columnar_store import iter_frame_chunks, read_table, write_table
+from src.student_performance.utils.incremental_store import IncrementalStore
+
+from conftest import make_student_frame
+
+DTYPES = {"gender": "category", "weekly_self_study_hours": "float64"}
+
+
+def students(n):
+    # Prefixes of one frame, so a longer source extends a shorter one
+    df = make_student_frame(200).head(n)
+    df.insert(0, "id", np.arange(n))
+    df["weekly_self_study_hours"] = df["weekly_self_study_hours"].astype(float)
+    return df.astype({"gender": "category"})
+
+
+def append(tmp_path, df, chunk_rows=40):
+    store = IncrementalStore(tmp_path / "data.parquet", tmp_path / "index.parquet", key_column="id")
+    return store.append(iter_frame_chunks(df, chunk_rows), delta_path=tmp_path / "delta.parquet")
+
+
+def stored(path):
+    return read_table(path).sort_values("id").reset_index(drop=True)
+
+
+def test_only_new_and_changed_rows_are_appended(tmp_path):
+    df = students(100)
+    first = append(tmp_path, df)
+    assert (first["new"], first["changed"], first["rows"]) == (100, 0, 100)
+
+    # Same data again: nothing is written
+    parts = sorted(p.name for p in (tmp_path / "data.parquet").iterdir())
+    assert append(tmp_path, df)["unchanged"] == 100
+    assert sorted(p.name for p in (tmp_path / "data.parquet").iterdir()) == parts
+    assert read_table(tmp_path / "delta.parquet").empty
+
+    grown = students(130)
+    grown.loc[[5, 60], "math_score"] = 1
+    summary = append(tmp_path, grown)
+
+    assert (summary["new"], summary["changed"], summary["unchanged"], summary["rows"]) == (30, 2, 98, 130)
+    assert sorted(read_table(tmp_path / "delta.parquet")["id"]) == [5, 60] + list(range(100, 130))
+    pd.testing.assert_frame_equal(stored(tmp_path / "data.parquet"), grown, check_categorical=False)
+
+
+def test_keys_missing_from_the_source_are_kept_and_duplicates_keep_the_last_row(tmp_path):
+    append(tmp_path, students(50))
+    update = students(50).iloc[[10, 10, 20]].copy()
+    update.iloc[1, update.columns.get_loc("math_score")] = 7
+
+    summary = append(tmp_path, update)
+
+    assert (summary["changed"], summary["unchanged"], summary["rows"]) == (1, 1, 50)
+    data = stored(tmp_path / "data.parquet")
+    assert data.loc[10, "math_score"] == 7 and len(data) == 50
+
+
+def test_parts_left_by_an_interrupted_run_are_discarded(tmp_path):
+    df = students(60)
+    append(tmp_path, df)
+    write_table(students(5), tmp_path / "data.parquet" / "part-00099.parquet")
+
+    assert append(tmp_path, df)["unchanged"] == 60
+    assert not (tmp_path / "data.parquet" / "part-00099.parquet").exists()
+    assert len(read_table(tmp_path / "data.parquet")) == 60
+
+
+def test_incremental_ingestion_publishes_the_delta(tmp_path):
+    source = tmp_path / "source.csv"
+    students(80).to_csv(source, index=False)
+    incremental = {"enabled": True, "key_column": "id", "index_file": str(tmp_path / "index.parquet"),
+                   "delta_file": str(tmp_path / "delta.parquet")}
+    config = DataIngestionConfig(root_dir=tmp_path, source_URL=str(source), local_data_file=source,
+                                 unzip_dir=tmp_path, data_file=tmp_path / "data.parquet",
+                                 column_dtypes=DTYPES, incremental=incremental)
+
+    assert DataIngestion(config).convert_to_store() is None
+    students(90).to_csv(source, index=False)
+    DataIngestion(config).convert_to_store()
+
+    assert len(read_table(tmp_path / "data.parquet")) == 90
+    assert sorted(read_table(tmp_path / "delta.parquet")["id"]) == list(range(80, 90))
+
+    # Unchanged source: the previous delta and summary are not left behind
+    DataIngestion(config).convert_to_store()
+    summary = json.loads((tmp_path / "delta_summary.json").read_text())
+    assert (summary["new"], summary["changed"], summary["unchanged"], summary["rows"]) == (0, 0, 90, 90)
+    delta = read_table(tmp_path / "delta.parquet")
+    assert delta.empty and list(delta.columns) == list(students(1).columns)
+
+
+def test_a_schema_change_rebuilds_the_incremental_store(tmp_path):
+    source = tmp_path / "source.csv"
+    students(80).to_csv(source, index=False)
+    incremental = {"enabled": True, "key_column": "id", "index_file": str(tmp_path / "index.parquet"),
+                   "delta_file": str(tmp_path / "delta.parquet")}
+    config = DataIngestionConfig(root_dir=tmp_path, source_URL=str(source), local_data_file=source,
+                                 unzip_dir=tmp_path, data_file=tmp_path / "data.parquet",
+                                 column_dtypes=DTYPES, incremental=incremental)
+    DataIngestion(config).convert_to_store()
+
+    DataIngestion(dataclasses.replace(config, column_dtypes={**DTYPES, "absence_days": "float64"})).convert_to_store()
+
+    data = read_table(tmp_path / "data.parquet")
+    assert len(data) == 80 and str(data["absence_days"].dtype) == "float64"
+    assert len(read_table(tmp_path / "delta.parquet")) == 80
@@ -0,0 +1,17 @@
+import sys
+import subprocess
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+
+
+def test_serving_imports_leave_heavy_packages_unloaded():
+    script = (
+        "import sys, app\n"
+        "heavy = ('sklearn', 'scipy', 'pandas', 'joblib', 'xgboost', 'catboost', 'mlflow')\n"
+        "print('heavy=' + ','.join(name for name in heavy if name in sys.modules))\n"
+    )
+    result = subprocess.run([sys.executable, "-c", script], cwd=ROOT, capture_output=True, text=True)
+
+    assert result.returncode == 0, result.stderr
+    assert "heavy=\n" in result.stdout
@@ -0,0 +1,64 @@
+import gc
+import threading
+
+from src.student_performance.utils.metrics import LatencyMetrics
+
+
+def test_metrics_merge_thread_shards_into_prometheus_text():
+    metrics = LatencyMetrics(prefix="test", buckets=(0.01, 0.1))
+
+    def handle(status):
+        start = metrics.start_request("/api/predict")
+        metrics.observe_stage("predict", 0.05)
+        metrics.end_request("/api/predict", start, status)
+
+    threads = [threading.Thread(target=handle, args=(200,)) for _ in range(4)]
+    threads.append(threading.Thread(target=handle, args=(500,)))
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    metrics.observe_stage("predict", 5.0)
+
+    text = metrics.render()
+    assert 'test_requests_total{route="/api/predict",status="200"} 4' in text
+    assert 'test_requests_total{route="/api/predict",status="500"} 1' in text
+    assert 'test_request_errors_total{route="/api/predict"} 1' in text
+    assert 'test_requests_in_flight{route="/api/predict"} 0' in text
+    assert 'test_stage_duration_seconds_bucket{route="/api/predict",stage="predict",le="0.01"} 0' in text
+    assert 'test_stage_duration_seconds_bucket{route="/api/predict",stage="predict",le="0.1"} 5' in text
+    assert 'test_stage_duration_seconds_count{route="/api/predict",stage="predict"} 5' in text
+    # Stages timed outside a request are attributed to the background route
+    assert 'test_stage_duration_seconds_bucket{route="background",stage="predict",le="+Inf"} 1' in text
+
+
+def test_mark_error_counts_handled_failures():
+    metrics = LatencyMetrics(prefix="test")
+    start = metrics.start_request("/predictdata")
+    metrics.mark_error()
+    metrics.end_request("/predictdata", start, 200)
+
+    assert 'test_request_errors_total{route="/predictdata"} 1' in metrics.render()
+
+
+def test_shards_of_finished_threads_are_folded_and_dropped():
+    metrics = LatencyMetrics(prefix="test", buckets=(0.01, 0.1))
+
+    def handle():
+        start = metrics.start_request("/predict")
+        metrics.end_request("/predict", start, 200)
+
+    # One thread per request, as under the Flask development server
+    for _ in range(50):
+        thread = threading.Thread(target=handle)
+        thread.start()
+        thread.join()
+    gc.collect()
+
+    assert len(metrics._shards) <= 1
+    text = metrics.render()
+    assert 'test_requests_total{route="/predict",status="200"} 50' in text
+    assert 'test_requests_in_flight{route="/predict"} 0' in text
+
+    metrics.reset()
+    assert 'test_requests_total{route="/predict"' not in metrics.render()
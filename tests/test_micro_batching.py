@@ -0,0 +1,44 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from src.student_performance.pipeline.micro_batching import MicroBatcher
+from src.student_performance.pipeline.prediction_pipeline import CustomData, PredictPipeline
+
+
+def make_record(reading_score):
+    return CustomData(
+        gender="female",
+        race_ethnicity="group C",
+        parental_level_of_education="high school",
+        lunch="standard",
+        test_preparation_course="completed",
+        reading_score=reading_score,
+        writing_score=70
+    )
+
+
+class TestMicroBatcher:
+    def test_coalesced_predictions_match_direct_calls(self, prediction_config):
+        pipeline = PredictPipeline(config=prediction_config)
+        batcher = MicroBatcher(pipeline.predict_records, max_batch_size=8, window_ms=20, latency_target_ms=1000)
+        records = [make_record(score) for score in range(50, 82)]
+
+        with ThreadPoolExecutor(max_workers=16) as pool:
+            results = list(pool.map(lambda r: batcher.predict(r.to_prediction_record(), timeout=10), records))
+
+        expected = [pipeline.predict(r.get_data_as_data_frame())[0] for r in records]
+        assert results == pytest.approx(expected)
+
+        stats = batcher.stats()
+        assert stats["requests"] == len(records)
+        assert stats["batches"] < len(records)
+        assert max(stats["batch_size_histogram"]) <= 8
+
+    def test_errors_propagate_to_every_waiter(self):
+        def failing_predict(records):
+            raise RuntimeError("model unavailable")
+
+        batcher = MicroBatcher(failing_predict, window_ms=1)
+        with pytest.raises(RuntimeError, match="model unavailable"):
+            batcher.predict({"reading_score": 1}, timeout=10)
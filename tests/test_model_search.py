@@ -0,0 +1,132 @@
+import numpy as np
+import pytest
+from sklearn.base import clone
+from sklearn.ensemble import AdaBoostRegressor, GradientBoostingRegressor, RandomForestRegressor
+from sklearn.linear_model import Ridge
+from sklearn.model_selection import ParameterGrid
+from sklearn.tree import DecisionTreeRegressor
+
+from src.student_performance.utils.model_search import (SuccessiveHalvingSearch, fit_estimator, staged_predictions,
+                                                       staging_groups)
+
+
+def make_data():
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(300, 4))
+    y = X @ np.array([2.0, -1.0, 0.5, 0.0]) + rng.normal(scale=0.3, size=300)
+    return X[:240], y[:240], X[240:], y[240:]
+
+
+PARAMS = {
+    "Decision Tree": {"max_depth": [1, 2, 3, 4, 6, 8, 10, 12, 14]},
+    "Ridge": {"alpha": [0.01, 1.0, 1000.0, 100000.0]},
+}
+
+
+@pytest.mark.parametrize("n_jobs", [1, 2])
+def test_halving_prunes_trials_and_refits_the_winner(n_jobs):
+    X_train, y_train, X_test, y_test = make_data()
+    models = {"Decision Tree": DecisionTreeRegressor(random_state=0), "Ridge": Ridge()}
+
+    search = SuccessiveHalvingSearch(cv_folds=5, n_trials=6, timeout=None, n_jobs=n_jobs)
+    report, stats = search.run(X_train, y_train, X_test, y_test, models, PARAMS)
+
+    assert search._rungs() == [1, 3, 5]
+    # n_trials caps the sampled tree grid; the small ridge grid is searched whole
+    assert stats["Decision Tree"]["trials"] == 6
+    assert stats["Ridge"]["trials"] == 4
+    # 4 trials x 1 fold, then 2 survivors x 2 more folds, then 1 x 2 more
+    assert stats["Ridge"]["fits"] == 4 + 4 + 2
+    assert stats["Ridge"]["best_params"]["alpha"] in (0.01, 1.0)
+    assert models["Ridge"].alpha == stats["Ridge"]["best_params"]["alpha"]
+    assert report["Ridge"] > 0.9
+    assert all(s["trials_per_second"] > 0 and not s["timed_out"] for s in stats.values())
+
+
+def test_search_times_count_each_models_own_fits():
+    X_train, y_train, X_test, y_test = make_data()
+    models = {"Random Forest": RandomForestRegressor(random_state=0), "Ridge": Ridge()}
+    params = {"Random Forest": {"n_estimators": [200], "max_depth": [4, 8]}, "Ridge": PARAMS["Ridge"]}
+
+    _, stats = SuccessiveHalvingSearch(cv_folds=3, n_trials=4, timeout=None, n_jobs=1).run(
+        X_train, y_train, X_test, y_test, models, params)
+
+    forest, ridge = stats["Random Forest"], stats["Ridge"]
+    # Ridge's times do not include the forest's slow fits
+    assert 0 < ridge["seconds_to_best"] <= ridge["fit_seconds"] < forest["fit_seconds"] / 10
+    assert 0 < ridge["best_fit_seconds"] <= ridge["seconds_to_best"]
+    assert ridge["trials_per_second"] > forest["trials_per_second"]
+
+
+def test_timeout_returns_best_so_far():
+    X_train, y_train, X_test, y_test = make_data()
+    models = {"Ridge": Ridge()}
+
+    search = SuccessiveHalvingSearch(cv_folds=5, n_trials=10, timeout=1e-9, n_jobs=1)
+    report, stats = search.run(X_train, y_train, X_test, y_test, models, PARAMS)
+
+    assert stats["Ridge"]["timed_out"]
+    assert stats["Ridge"]["fits"] == 1
+    assert stats["Ridge"]["best_params"] == {"alpha": 0.01}
+    assert "Ridge" in report and hasattr(models["Ridge"], "coef_")
+
+
+@pytest.mark.parametrize("model", [
+    GradientBoostingRegressor(random_state=0, subsample=0.8),
+    RandomForestRegressor(random_state=0),
+    AdaBoostRegressor(random_state=0),
+])
+def test_staged_predictions_match_separate_fits(model):
+    X_train, y_train, X_test, _ = make_data()
+    sizes = [4, 8, 16]
+
+    fitted = clone(model).set_params(n_estimators=max(sizes)).fit(X_train, y_train)
+    staged = staged_predictions(fitted, X_test, sizes)
+
+    for size in sizes:
+        separate = clone(model).set_params(n_estimators=size).fit(X_train, y_train)
+        np.testing.assert_allclose(staged[size], separate.predict(X_test), rtol=1e-10)
+
+
+def test_staging_groups_share_fits_across_n_estimators():
+    candidates = list(ParameterGrid({"n_estimators": [8, 16, 32], "learning_rate": [0.1, 0.5]}))
+
+    groups = staging_groups(GradientBoostingRegressor(), candidates)
+    assert sorted(len(group) for group in groups) == [3, 3]
+    assert all(len({candidates[i]["learning_rate"] for i in group}) == 1 for group in groups)
+    assert len(staging_groups(Ridge(), [{"alpha": 1.0}, {"alpha": 2.0}])) == 2
+
+
+def test_early_stopping_rounds_are_reported_and_reused_for_refit():
+    X_train, y_train, X_test, y_test = make_data()
+    models = {"Gradient Boosting": GradientBoostingRegressor(random_state=0)}
+    params = {"Gradient Boosting": {"n_estimators": [500], "learning_rate": [0.3]}}
+
+    search = SuccessiveHalvingSearch(cv_folds=3, n_trials=5, n_jobs=1,
+                                     early_stopping={"validation_fraction": 0.2, "patience": 5})
+    report, stats = search.run(X_train, y_train, X_test, y_test, models, params)
+
+    rounds = stats["Gradient Boosting"]["best_rounds"]
+    assert rounds is not None and rounds < 500
+    # The final model is refitted for exactly the chosen rounds, without a validation hold-out
+    assert models["Gradient Boosting"].n_estimators_ == rounds
+    assert models["Gradient Boosting"].n_iter_no_change is None
+    assert report["Gradient Boosting"] > 0.8
+
+
+def test_gradient_boosting_keeps_its_best_round_not_the_patience_window():
+    from sklearn.model_selection import train_test_split
+
+    X_train, y_train, _, _ = make_data()
+    early_stopping = {"validation_fraction": 0.2, "patience": 10, "random_state": 0}
+    model = GradientBoostingRegressor(n_estimators=500, learning_rate=0.5, random_state=0)
+
+    rounds = fit_estimator(model, X_train, y_train, early_stopping)
+
+    # The split fit_estimator holds out, replayed on a full-length fit
+    X_fit, X_val, y_fit, y_val = train_test_split(X_train, y_train, test_size=0.2, random_state=0)
+    full = clone(model).set_params(n_estimators=500).fit(X_fit, y_fit)
+    losses = [np.mean((y_val - pred) ** 2) for pred in full.staged_predict(X_val)]
+    assert rounds == int(np.argmin(losses[:rounds + 10])) + 1 < 500
+    assert model.n_estimators_ == rounds and len(model.estimators_) == rounds
+    np.testing.assert_allclose(model.predict(X_val), list(full.staged_predict(X_val))[rounds - 1])
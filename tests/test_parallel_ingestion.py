@@ -0,0 +1,114 @@
+import json
+
+import numpy as np
+import pandas as pd
+
+from src.student_performance.components.data_ingestion import DataIngestion, resolve_sources
+from src.student_performance.entity.config_entity import DataIngestionConfig
+from src.student_performance.constants import SCHEMA_FILE_PATH
+from src.student_performance.utils.columnar_store import read_table
+from src.student_performance.utils.common import read_yaml
+
+from conftest import make_student_frame
+
+DTYPES = {"gender": "category", "math_score": "int64"}
+
+
+def school(n, first_id, seed):
+    df = make_student_frame(n, seed=seed)
+    df.insert(0, "id", np.arange(first_id, first_id + n))
+    return df
+
+
+def write_workbook(path, sheets):
+    with pd.ExcelWriter(path) as writer:
+        for name, df in sheets.items():
+            df.to_excel(writer, sheet_name=name, index=False)
+
+
+def ingest(tmp_path, source_URL, **kwargs):
+    root = tmp_path / "artifacts"
+    root.mkdir(exist_ok=True)
+    config = DataIngestionConfig(root_dir=root, source_URL=source_URL, local_data_file=root / "data.xlsx",
+                                 unzip_dir=root, data_file=root / "data.parquet", column_dtypes=DTYPES,
+                                 n_jobs=2, **kwargs)
+    DataIngestion(config).initiate_data_ingestion()
+    return root
+
+
+def test_sheets_are_concatenated_and_bad_sources_are_isolated(tmp_path):
+    schools = tmp_path / "schools"
+    schools.mkdir()
+    north_a, north_b, south = school(30, 0, 1), school(20, 30, 2), school(25, 50, 3)
+    south["weekly_self_study_hours"] = south["weekly_self_study_hours"] + 0.5
+    write_workbook(schools / "north.xlsx", {"year_1": north_a, "year_2": north_b,
+                                            "notes": pd.DataFrame({"note": ["ignore me"]})})
+    write_workbook(schools / "south.xlsx", {"students": south})
+    (schools / "broken.xlsx").write_bytes(b"not a workbook")
+    (schools / "~$north.xlsx").write_bytes(b"lock file")
+
+    assert [p.name for p in resolve_sources(schools)] == ["broken.xlsx", "north.xlsx", "south.xlsx"]
+    assert resolve_sources(schools / "s*.xlsx") == [schools / "south.xlsx"]
+
+    root = ingest(tmp_path, str(schools / "*.xlsx"))
+
+    data = read_table(root / "data.parquet").sort_values("id").reset_index(drop=True)
+    assert data["id"].tolist() == list(range(75))
+    # Integer hours in one school and fractional in another are stored as float
+    assert data["weekly_self_study_hours"].dtype == "float64"
+    assert data["weekly_self_study_hours"].iloc[50:].tolist() == south["weekly_self_study_hours"].tolist()
+
+    report = json.loads((root / "ingestion_report.json").read_text())
+    statuses = {entry["source"].split("/")[-1]: entry["status"] for entry in report["sources"]}
+    assert statuses == {"broken.xlsx": "failed", "north.xlsx[year_1]": "ok", "north.xlsx[year_2]": "ok",
+                        "north.xlsx[notes]": "inconsistent", "south.xlsx[students]": "ok"}
+    assert (report["rows"], report["accepted"], report["rejected"]) == (75, 3, 2)
+    assert all(entry["seconds"] is not None for entry in report["sources"])
+    assert not list(root.glob(".sources.tmp.*"))
+
+
+def test_sources_feed_incremental_ingestion(tmp_path):
+    schools = tmp_path / "schools"
+    schools.mkdir()
+    school(10, 0, 1).to_csv(schools / "a.csv", index=False)
+    school(15, 10, 2).to_csv(schools / "b.csv", index=False)
+    incremental = {"enabled": True, "key_column": "id", "index_file": str(tmp_path / "index.parquet"),
+                   "delta_file": str(tmp_path / "delta.parquet")}
+
+    ingest(tmp_path, str(schools), incremental=incremental)
+    school(5, 25, 3).to_csv(schools / "c.csv", index=False)
+    root = ingest(tmp_path, str(schools), incremental=incremental)
+
+    assert len(read_table(root / "data.parquet")) == 30
+    assert sorted(read_table(tmp_path / "delta.parquet")["id"]) == list(range(25, 30))
+
+
+def test_a_glob_matching_one_csv_is_read_as_csv(tmp_path):
+    schools = tmp_path / "schools"
+    schools.mkdir()
+    school(12, 0, 1).to_csv(schools / "only.csv", index=False)
+
+    root = ingest(tmp_path, str(schools / "*.csv"))
+
+    assert (root / "data.csv").exists()
+    assert read_table(root / "data.parquet")["id"].tolist() == list(range(12))
+
+
+def test_sources_are_checked_against_the_schema_not_the_first_sheet(tmp_path):
+    schools = tmp_path / "schools"
+    schools.mkdir()
+    info = pd.DataFrame({"key": ["exported"], "value": ["2024-06-01"]})
+    first, second = school(40, 0, 1), school(30, 40, 2)
+    first["notes"] = "extra"
+    write_workbook(schools / "export.xlsx", {"Info": info, "year_1": first, "year_2": second})
+    schema_columns = dict(read_yaml(SCHEMA_FILE_PATH).COLUMNS)
+
+    root = ingest(tmp_path, str(schools), schema_columns=schema_columns)
+
+    data = read_table(root / "data.parquet")
+    assert list(data.columns) == list(schema_columns)
+    assert sorted(data["id"]) == list(range(70))
+    report = json.loads((root / "ingestion_report.json").read_text())
+    statuses = {entry["source"].split("/")[-1]: entry["status"] for entry in report["sources"]}
+    assert statuses == {"export.xlsx[Info]": "inconsistent", "export.xlsx[year_1]": "ok",
+                        "export.xlsx[year_2]": "ok"}
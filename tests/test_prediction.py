@@ -0,0 +1,143 @@
+import os
+import sys
+import threading
+
+import pandas as pd
+import pytest
+
+from src.student_performance.pipeline.prediction_pipeline import CustomData, PredictionRecord, PredictPipeline
+from src.student_performance.utils.artifact_cache import ArtifactCache, artifact_cache
+from src.student_performance.utils.common import load_bin, save_bin
+
+
+def sample_data():
+    return CustomData(
+        gender="female",
+        race_ethnicity="group B",
+        parental_level_of_education="bachelor's degree",
+        lunch="standard",
+        test_preparation_course="none",
+        reading_score=72,
+        writing_score=74
+    )
+
+
+class TestArtifactCache:
+    def test_loads_once_and_counts_hits(self, prediction_config):
+        cache = ArtifactCache()
+        first = cache.get(prediction_config.model_path, prediction_config.preprocessor_path)
+        second = cache.get(prediction_config.model_path, prediction_config.preprocessor_path)
+
+        assert first is second
+        assert cache.stats()["reloads"] == 1
+        assert cache.stats()["hits"] == 1
+
+    def test_reloads_when_artifact_changes(self, prediction_config):
+        cache = ArtifactCache()
+        first = cache.get(prediction_config.model_path, prediction_config.preprocessor_path)
+
+        model = load_bin(prediction_config.model_path)
+        model.intercept_ += 1.0
+        save_bin(model, prediction_config.model_path)
+        stat = os.stat(prediction_config.model_path)
+        os.utime(prediction_config.model_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+
+        second = cache.get(prediction_config.model_path, prediction_config.preprocessor_path)
+        assert second.version != first.version
+        assert cache.stats()["reloads"] == 2
+
+    def test_touch_without_content_change_keeps_version(self, prediction_config):
+        cache = ArtifactCache()
+        first = cache.get(prediction_config.model_path, prediction_config.preprocessor_path)
+        stat = os.stat(prediction_config.model_path)
+        os.utime(prediction_config.model_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+
+        second = cache.get(prediction_config.model_path, prediction_config.preprocessor_path)
+        assert second is first
+        assert cache.stats()["reloads"] == 1
+
+    def test_concurrent_hits_are_all_counted(self, prediction_config):
+        cache = ArtifactCache()
+        cache.get(prediction_config.model_path, prediction_config.preprocessor_path)
+        # Switch threads as often as possible to interleave the counter updates
+        interval = sys.getswitchinterval()
+        sys.setswitchinterval(1e-6)
+
+        def lookups():
+            for _ in range(200):
+                cache.get(prediction_config.model_path, prediction_config.preprocessor_path)
+
+        threads = [threading.Thread(target=lookups) for _ in range(8)]
+        try:
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        finally:
+            sys.setswitchinterval(interval)
+
+        assert cache.stats()["hits"] + cache.stats()["misses"] == 8 * 200 + 1
+
+
+class TestPredictPipeline:
+    def test_predict_uses_shared_cache(self, prediction_config):
+        artifact_cache.clear()
+        pipeline = PredictPipeline(config=prediction_config)
+        preds = pipeline.predict(sample_data().get_data_as_data_frame())
+
+        assert preds.shape == (1,)
+        assert PredictPipeline(config=prediction_config).load_artifacts() is pipeline.load_artifacts()
+
+
+class TestBatchPrediction:
+    def test_batch_matches_single_predictions(self, prediction_config):
+        pipeline = PredictPipeline(config=prediction_config)
+        record = {
+            "gender": "male",
+            "race_ethnicity": "group A",
+            "parental_level_of_education": "high school",
+            "lunch": "free/reduced",
+            "test_preparation_course": "completed",
+            "reading_score": 55,
+            "writing_score": 60
+        }
+        single = pipeline.predict(sample_data().get_data_as_data_frame())[0]
+
+        results = pipeline.predict_batch([vars(sample_data()), record, {"gender": "male"}])
+
+        assert results[0]["prediction"] == pytest.approx(single)
+        assert results[1]["success"]
+        assert not results[2]["success"]
+        assert "Missing required fields" in results[2]["error"]
+
+    def test_batch_rejects_out_of_range_scores(self, prediction_config):
+        pipeline = PredictPipeline(config=prediction_config)
+        record = dict(vars(sample_data()), reading_score=140)
+
+        results = pipeline.predict_batch([record])
+        assert results == [{"index": 0, "error": "Scores must be between 0 and 100", "success": False}]
+
+
+class TestPredictionRecord:
+    def test_defaults_match_custom_data(self):
+        record = PredictionRecord.from_mapping(vars(sample_data()))
+
+        assert record.as_dict() == sample_data().get_data_as_dict()
+        assert record.get("weekly_self_study_hours") == 5
+        assert record.get("history_score") == 72
+        assert record.get("student_id") is None
+
+    def test_form_field_aliases(self):
+        form = dict(vars(sample_data()))
+        form["ethnicity"] = form.pop("race_ethnicity")
+
+        record = PredictionRecord.from_mapping(form, aliases={"race_ethnicity": "ethnicity"})
+        assert record.race_ethnicity == "group B"
+
+    def test_predict_records_matches_dataframe_path(self, prediction_config):
+        pipeline = PredictPipeline(config=prediction_config)
+        records = [PredictionRecord.from_mapping(dict(vars(sample_data()), reading_score=score))
+                   for score in (10, 50, 90)]
+
+        expected = pipeline.predict(pd.DataFrame([record.as_dict() for record in records]))
+        assert pipeline.predict_records(records) == pytest.approx(list(expected))
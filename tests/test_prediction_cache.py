@@ -0,0 +1,53 @@
+from src.student_performance.pipeline.prediction_pipeline import PredictionRecord, PredictPipeline
+from src.student_performance.utils.prediction_cache import PredictionCache
+
+
+def make_record(reading_score):
+    return PredictionRecord.from_mapping({
+        "gender": "male",
+        "race_ethnicity": "group A",
+        "parental_level_of_education": "high school",
+        "lunch": "standard",
+        "test_preparation_course": "none",
+        "reading_score": reading_score,
+        "writing_score": "60"
+    })
+
+
+class TestPredictionCache:
+    def test_lru_eviction(self):
+        cache = PredictionCache(max_entries=2)
+        cache.put("v1", "a", 1.0)
+        cache.put("v1", "b", 2.0)
+        cache.get("v1", "a")
+        cache.put("v1", "c", 3.0)
+
+        assert cache.get("v1", "b") is None
+        assert cache.get("v1", "a") == 1.0
+        assert cache.stats()["evictions"] == 1
+
+    def test_version_change_invalidates(self):
+        cache = PredictionCache(max_entries=10)
+        cache.put("v1", "a", 1.0)
+
+        assert cache.get("v2", "a") is None
+        assert cache.stats()["invalidations"] == 1
+
+    def test_ttl_expiry(self):
+        cache = PredictionCache(max_entries=10, ttl_seconds=0)
+        cache.put("v1", "a", 1.0)
+
+        assert cache.get("v1", "a") is None
+        assert cache.stats()["expirations"] == 1
+
+
+class TestPipelineCaching:
+    def test_equivalent_inputs_share_an_entry(self, prediction_config):
+        pipeline = PredictPipeline(config=prediction_config)
+        first = pipeline.predict_records([make_record(70), make_record("70.0")])
+        second = pipeline.predict_record(make_record(70.0))
+
+        assert first[0] == first[1] == second
+        stats = pipeline.prediction_cache.stats()
+        assert stats["size"] == 1
+        assert stats["hits"] == 1
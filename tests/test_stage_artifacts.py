@@ -0,0 +1,66 @@
+import threading
+
+import numpy as np
+import pytest
+from sklearn.linear_model import LinearRegression
+
+from src.student_performance.components.data_transformation import DataTransformation
+from src.student_performance.components.model_evaluation import ModelEvaluation
+from src.student_performance.entity.config_entity import DataTransformationConfig, ModelEvaluationConfig
+from src.student_performance.utils.columnar_store import read_table
+from src.student_performance.utils.stage_artifacts import StageArtifacts, handed_over, publish
+
+from conftest import make_student_frame
+
+
+def test_writes_run_in_the_background_and_failures_surface_on_wait():
+    release = threading.Event()
+    written = []
+
+    with StageArtifacts() as artifacts:
+        value = publish(artifacts, "frame", [1, 2], persist=lambda: (release.wait(5), written.append("frame")))
+        assert value == [1, 2] and handed_over(artifacts, "frame") == [1, 2]
+        assert written == []
+        release.set()
+        artifacts.wait()
+        assert written == ["frame"]
+
+        artifacts.put("broken", None, persist=lambda: 1 / 0)
+        with pytest.raises(ZeroDivisionError):
+            artifacts.wait()
+
+    # Without a hand-off the write happens immediately
+    publish(None, "frame", [3], persist=lambda: written.append("standalone"))
+    assert written == ["frame", "standalone"]
+    assert handed_over(None, "frame") is None
+
+
+def test_transformation_and_evaluation_use_handed_over_objects(tmp_path, monkeypatch):
+    df = make_student_frame(200)
+    df.insert(0, "id", np.arange(200))
+    split = {"method": "hash", "key_column": "id", "test_size": 0.2, "seed": 42}
+    config = DataTransformationConfig(root_dir=tmp_path, data_path=tmp_path / "missing.parquet",
+                                      preprocessor_obj_file_path=tmp_path / "preprocessor.pkl", split=split)
+
+    with StageArtifacts() as artifacts:
+        train_arr, test_arr, _ = DataTransformation(config).initiate_data_transformation_from_config(
+            df=df, artifacts=artifacts)
+        artifacts.wait()
+
+        # The split and preprocessor still reach disk for DVC and standalone runs
+        assert len(read_table(tmp_path / "test.parquet")) == len(test_arr)
+        assert (tmp_path / "preprocessor.pkl").exists()
+
+        model = LinearRegression().fit(train_arr[:, :-1], train_arr[:, -1])
+        evaluation = ModelEvaluation(ModelEvaluationConfig(
+            root_dir=tmp_path, test_data_path=tmp_path / "nowhere.parquet", model_path=tmp_path / "nowhere.pkl",
+            all_params={}, metric_file_name=tmp_path / "metrics.json", target_column="math_score", mlflow_uri=""))
+        monkeypatch.setattr("src.student_performance.components.model_evaluation.load_bin",
+                            lambda *args, **kwargs: pytest.fail("evaluation reloaded a pickle"))
+
+        scores = evaluation.evaluate_model(test_data=artifacts.get("test_df"), model=model,
+                                           preprocessor=artifacts.get("preprocessor"))
+
+    expected = model.predict(test_arr[:, :-1])
+    assert scores["r2"] == pytest.approx(1 - ((test_arr[:, -1] - expected) ** 2).sum()
+                                         / ((test_arr[:, -1] - test_arr[:, -1].mean()) ** 2).sum())
@@ -0,0 +1,130 @@
+import pytest
+from box import ConfigBox
+
+from src.student_performance.pipeline import training_pipeline
+from src.student_performance.utils.stage_artifacts import publish
+from src.student_performance.utils.stage_cache import StageCache, StageSpec
+
+
+def make_stage(tmp_path):
+    dep = tmp_path / "data.csv"
+    out = tmp_path / "train.csv"
+    dep.write_text("a,b\n1,2\n")
+    out.write_text("a\n1\n")
+    spec = StageSpec(name="transform", deps=(str(dep),), config_sections=("transform",),
+                     params_sections=("model_evaluation",), outs=(str(out),))
+    return spec, dep, out
+
+
+def test_stage_is_skipped_only_while_inputs_and_outputs_are_unchanged(tmp_path):
+    spec, dep, out = make_stage(tmp_path)
+    config = ConfigBox({"transform": {"test_size": 0.2}, "other": {"x": 1}})
+    params = ConfigBox({"model_evaluation": {"random_state": 42}})
+    cache = StageCache(tmp_path / "stage_cache")
+
+    fingerprint = cache.fingerprint(spec, config, params)
+    assert cache.lookup(spec, fingerprint) is None
+    cache.record(spec, fingerprint, result={"rows": 1})
+
+    assert cache.lookup(spec, fingerprint)["result"] == {"rows": 1}
+    # Sections the stage does not read do not affect its fingerprint
+    config.other.x = 2
+    assert cache.fingerprint(spec, config, params) == fingerprint
+
+    config.transform.test_size = 0.3
+    assert cache.fingerprint(spec, config, params) != fingerprint
+    config.transform.test_size = 0.2
+
+    dep.write_text("a,b\n1,3\n")
+    assert cache.fingerprint(spec, config, params) != fingerprint
+
+
+def test_modified_output_invalidates_the_stage(tmp_path):
+    spec, _, out = make_stage(tmp_path)
+    config, params = ConfigBox({"transform": {}}), ConfigBox({"model_evaluation": {}})
+    cache = StageCache(tmp_path / "stage_cache")
+    fingerprint = cache.fingerprint(spec, config, params)
+    cache.record(spec, fingerprint)
+
+    out.write_text("tampered\n")
+    assert cache.lookup(spec, fingerprint) is None
+
+    cache.record(spec, fingerprint)
+    cache.invalidate("transform")
+    assert cache.lookup(spec, fingerprint) is None
+
+
+class FakeConfig:
+    """Stands in for ConfigurationManager: one config section per stage"""
+    def __init__(self, tmp_path, sections):
+        self.config = ConfigBox(sections)
+        self.params = ConfigBox({})
+        self.tmp_path = tmp_path
+
+    def get_stage_cache_config(self):
+        return ConfigBox({"root_dir": self.tmp_path / "stage_cache"})
+
+
+def stub_pipeline(tmp_path, monkeypatch, sections, fail_evaluation=False):
+    """Stage mains that write one file each in the background, as the real ones do"""
+    paths = {name: tmp_path / f"{name}.out" for name in training_pipeline.STAGE_ORDER}
+    runs = []
+
+    def stage(name, dep=None):
+        def main(self, *args):
+            config, artifacts = args[-2], args[-1]
+            runs.append(name)
+            if name == "model_evaluation" and fail_evaluation:
+                raise RuntimeError("evaluation failed")
+            value = f"{config.config[name]}:{dep.read_text() if dep else ''}"
+            publish(artifacts, name, value, persist=lambda: paths[name].write_text(value))
+            if name == "data_transformation":
+                publish(artifacts, "arrays", (None, None))
+            return (0.5, "model", {}) if name == "model_trainer" else None
+        return main
+
+    producers = {"data_validation": "data_ingestion", "data_transformation": "data_ingestion",
+                 "model_trainer": "data_transformation", "model_evaluation": "model_trainer"}
+    specs = {}
+    for name, cls in zip(training_pipeline.STAGE_ORDER, (
+            training_pipeline.DataIngestionTrainingPipeline, training_pipeline.DataValidationTrainingPipeline,
+            training_pipeline.DataTransformationTrainingPipeline, training_pipeline.ModelTrainerTrainingPipeline,
+            training_pipeline.ModelEvaluationTrainingPipeline)):
+        dep = paths[producers[name]] if name in producers else None
+        monkeypatch.setattr(cls, "main", stage(name, dep))
+        specs[name] = StageSpec(name=name, deps=(str(dep),) if dep else (), config_sections=(name,),
+                                outs=(str(paths[name]),))
+
+    monkeypatch.setattr(training_pipeline, "ConfigurationManager", lambda: FakeConfig(tmp_path, sections))
+    monkeypatch.setattr(training_pipeline, "build_stage_specs", lambda config: specs)
+    return runs
+
+
+def test_completed_stages_are_kept_when_a_later_stage_fails(tmp_path, monkeypatch):
+    sections = {name: {"v": 1} for name in training_pipeline.STAGE_ORDER}
+    runs = stub_pipeline(tmp_path, monkeypatch, sections, fail_evaluation=True)
+    with pytest.raises(RuntimeError, match="evaluation failed"):
+        training_pipeline.CompleteTrainingPipeline().run_pipeline()
+    assert runs == list(training_pipeline.STAGE_ORDER)
+
+    runs = stub_pipeline(tmp_path, monkeypatch, sections)
+    training_pipeline.CompleteTrainingPipeline().run_pipeline()
+    assert runs == ["model_evaluation"]
+
+
+def test_only_stages_whose_inputs_changed_rerun(tmp_path, monkeypatch):
+    sections = {name: {"v": 1} for name in training_pipeline.STAGE_ORDER}
+    stub_pipeline(tmp_path, monkeypatch, sections)
+    training_pipeline.CompleteTrainingPipeline().run_pipeline()
+
+    # Validation writes nothing the later stages read
+    sections["data_validation"]["v"] = 2
+    runs = stub_pipeline(tmp_path, monkeypatch, sections)
+    assert training_pipeline.CompleteTrainingPipeline().run_pipeline()["executed_stages"] == ["data_validation"]
+    assert runs == ["data_validation"]
+
+    # A changed transformation output reruns the stages that read it
+    sections["data_transformation"]["v"] = 2
+    runs = stub_pipeline(tmp_path, monkeypatch, sections)
+    training_pipeline.CompleteTrainingPipeline().run_pipeline()
+    assert runs == ["data_transformation", "model_trainer", "model_evaluation"]
@@ -0,0 +1,85 @@
+import os
+import pickle
+import subprocess
+import sys
+
+import numpy as np
+import pytest
+from catboost import CatBoostRegressor
+from sklearn.ensemble import AdaBoostRegressor, GradientBoostingRegressor, RandomForestRegressor
+from sklearn.linear_model import LinearRegression
+from sklearn.tree import DecisionTreeRegressor
+from xgboost import XGBRegressor
+
+from src.student_performance.components.model_trainer import ModelTrainer
+from src.student_performance.entity.config_entity import ModelTrainerConfig
+from src.student_performance.utils.artifact_cache import ArtifactCache
+from src.student_performance.utils.common import load_bin
+from src.student_performance.utils.tree_engine import export_tree_ensemble, verify_tree_ensemble
+
+
+def make_features(n_rows, seed):
+    rng = np.random.default_rng(seed)
+    X = rng.normal(size=(n_rows, 28))
+    # One-hot style columns after scaling take only two values
+    X[:, 10:] = (X[:, 10:] > 0) * 1.7
+    y = 3 * X[:, 0] + 2 * X[:, 12] - X[:, 3] + rng.normal(size=n_rows)
+    return X, y
+
+
+@pytest.mark.parametrize("model", [
+    DecisionTreeRegressor(random_state=0),
+    RandomForestRegressor(n_estimators=20, random_state=0),
+    GradientBoostingRegressor(n_estimators=40, subsample=0.8, random_state=0),
+    AdaBoostRegressor(n_estimators=20, random_state=0),
+    XGBRegressor(n_estimators=40, max_depth=4),
+    CatBoostRegressor(iterations=40, depth=5, verbose=False, random_seed=0, allow_writing_files=False),
+], ids=lambda model: type(model).__name__)
+def test_parity_with_original_model(model):
+    X_train, y_train = make_features(400, seed=0)
+    X_test, _ = make_features(300, seed=1)
+    model.fit(X_train, y_train)
+
+    engine = pickle.loads(pickle.dumps(export_tree_ensemble(model)))
+
+    assert verify_tree_ensemble(engine, model, X_test) < 1e-4
+    assert verify_tree_ensemble(engine, model, X_train) < 1e-4
+
+
+def test_rejects_non_tree_models():
+    X, y = make_features(50, seed=0)
+    with pytest.raises(ValueError):
+        export_tree_ensemble(LinearRegression().fit(X, y))
+
+
+def test_trainer_always_leaves_a_tree_model_file(tmp_path, prediction_config):
+    X, y = make_features(100, seed=0)
+    config = ModelTrainerConfig(root_dir=tmp_path, train_data_path=None, test_data_path=None, model_name="model.pkl",
+                                target_column="math_score", expected_accuracy=0.6, model_config={})
+    trainer = ModelTrainer(config)
+    engine_path = tmp_path / "tree_model.pkl"
+
+    assert trainer.export_tree_engine(DecisionTreeRegressor(random_state=0).fit(X, y), X) == str(engine_path)
+    assert load_bin(engine_path) is not None
+
+    # A linear winner replaces the previous engine with an empty file rather than leaving it
+    assert trainer.export_tree_engine(LinearRegression().fit(X, y), X) is None
+    assert load_bin(engine_path) is None
+    with pytest.raises(ValueError, match="holds no model"):
+        ArtifactCache().get(engine_path, prediction_config.preprocessor_path)
+
+
+def test_loading_engine_does_not_import_boosting_libraries(tmp_path):
+    X, y = make_features(200, seed=0)
+    engine_path = tmp_path / "tree_model.pkl"
+    with open(engine_path, "wb") as f:
+        pickle.dump(export_tree_ensemble(XGBRegressor(n_estimators=5).fit(X, y)), f)
+
+    script = (
+        "import pickle, sys, numpy as np\n"
+        f"engine = pickle.load(open({str(engine_path)!r}, 'rb'))\n"
+        "engine.predict(np.zeros((1, 28)))\n"
+        "assert 'xgboost' not in sys.modules and 'catboost' not in sys.modules\n"
+    )
+    root = os.path.join(os.path.dirname(__file__), "..")
+    subprocess.run([sys.executable, "-c", script], check=True, cwd=root)